@@ -3,7 +3,7 @@
 Este módulo contém a lógica principal a chamada dos outros modulos.
 """
 import argparse
-from funcs.parser import parse_config_and_run
+from funcs.parser import parse_config_and_run, parse_configs_and_run
 from interface.InteractivePlot import run
 
 if __name__ == "__main__":
@@ -13,18 +13,23 @@ if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="SuUAV Application")
     parser.add_argument('--run', action='store_true', help="Start the application with the run configuration")
     parser.add_argument('--setup', action='store_true', help="Start the setup with the setup configuration")
-    parser.add_argument('-i', '--input', type=str, help="Path to the input file for setup or run")
+    parser.add_argument('-i', '--input', type=str, nargs='+', help="Path to the input file for setup or run (run accepts several configuration files)")
+    parser.add_argument('-j', '--jobs', type=int, default=1, help="Number of processes used to run several configuration files")
 
     args = parser.parse_args()
 
     if args.setup:
         if args.input:
-            run(args.input)
+            run(args.input[0])
         else:
             print("Error: --input argument is required for --setup")
     elif args.run:
         if args.input:
-            parse_config_and_run(args.input)
+            if len(args.input) == 1:
+                parse_config_and_run(args.input[0])
+            else:
+                # Arquivos com os mesmos traços os carregam uma única vez
+                parse_configs_and_run(args.input, args.jobs)
         else:
             print("Error: --input argument is required for --run")
     else:
@@ -0,0 +1,125 @@
+"""Compara a exportação XML em streaming com a exportação antiga baseada em ElementTree.
+
+A exportação antiga (reproduzida aqui) parseia o arquivo de origem inteiro com ET.parse,
+remove os elementos carregados, recria-os com ET.SubElement e grava a árvore completa.
+A nova (Simulation.export_timesteps_to_xml) grava cada timestep assim que ele é lido.
+O script mede o tempo e o pico de memória de cada uma e verifica que os dois arquivos
+têm os mesmos timesteps, elementos e atributos (a indentação é diferente).
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.export_xml example.xml
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+from typing import Callable, Tuple
+from src.Simulation import Simulation
+from src.utils.traceReader import open_trace
+
+
+def legacy_export(simulation: Simulation, new_xml_path: str):
+    """
+    Exportação anterior ao streaming: árvore completa do arquivo de origem em memória.
+
+    Parâmetros:
+    - simulation (Simulation): Simulação exportada.
+    - new_xml_path (str): Caminho do arquivo XML de saída.
+    """
+    with open_trace(simulation.base.trace_path) as trace_file:
+        tree = ET.parse(trace_file)
+    root = tree.getroot()
+
+    for timestep in root.findall("timestep"):
+        time = timestep.attrib["time"]
+        if (simulation.base.begin is not None and float(time) < simulation.base.begin) or (
+            simulation.base.end is not None and float(time) > simulation.base.end
+        ):
+            root.remove(timestep)
+            continue
+        for element in list(timestep):
+            if element.tag in simulation.base.kinds:
+                timestep.remove(element)
+
+        time_key = simulation.base.time_grid.key(time)
+        if time_key is None:
+            root.remove(timestep)
+            continue
+        time_key -= 1
+        if time_key <= simulation.timestep_total:
+            for tag, attributes in simulation.timestep_elements(time_key):
+                ET.SubElement(timestep, tag, attributes)
+    tree.write(new_xml_path, encoding="utf-8", xml_declaration=True)
+
+
+def measure(export: Callable[[], None]) -> Tuple[float, int]:
+    """
+    Mede o tempo e o pico de memória alocada por uma exportação. O pico é medido numa
+    segunda execução, já que o tracemalloc deixa o código bem mais lento.
+
+    Parâmetros:
+    - export (Callable[[], None]): Função que faz a exportação.
+
+    Retorna:
+    - Tuple[float, int]: Segundos e bytes do pico de memória.
+    """
+    start = time.perf_counter()
+    export()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    export()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return elapsed, peak
+
+
+def same_content(first_path: str, second_path: str) -> bool:
+    """
+    Verifica se dois arquivos FCD têm os mesmos timesteps, elementos e atributos, na mesma ordem.
+
+    Parâmetros:
+    - first_path (str): Caminho do primeiro arquivo.
+    - second_path (str): Caminho do segundo arquivo.
+
+    Retorna:
+    - bool: True se o conteúdo for igual.
+    """
+    first = ET.parse(first_path).getroot()
+    second = ET.parse(second_path).getroot()
+    if first.attrib != second.attrib or len(first) != len(second):
+        return False
+    for first_timestep, second_timestep in zip(first, second):
+        if first_timestep.attrib != second_timestep.attrib:
+            return False
+        first_elements = [(element.tag, element.attrib) for element in first_timestep]
+        second_elements = [(element.tag, element.attrib) for element in second_timestep]
+        if first_elements != second_elements:
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="XML export benchmark")
+    parser.add_argument("trace_path", nargs="?", default="example.xml", help="FCD file to read")
+    args = parser.parse_args()
+
+    simulation = Simulation(args.trace_path)
+    simulation.create_drone_circular((-73.986478, 40.744406), 40)
+    simulation.create_drone_static((-73.983754, 40.745802))
+
+    with tempfile.TemporaryDirectory() as directory:
+        legacy_path = os.path.join(directory, "legacy.xml")
+        streaming_path = os.path.join(directory, "streaming.xml")
+        results = [
+            ("ElementTree", measure(lambda: legacy_export(simulation, legacy_path))),
+            ("streaming", measure(lambda: simulation.export_timesteps_to_xml(streaming_path))),
+        ]
+        for name, (elapsed, peak) in results:
+            print(f"{name:>11}: {elapsed:6.2f}s, peak {peak / 2**20:7.1f} MiB")
+        print("same content:", same_content(legacy_path, streaming_path))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""Compara o leitor rápido do fcd-export com o parser genérico de XML.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.fast_scanner example.xml
+"""
+import argparse
+import time
+import xml.etree.ElementTree as ET
+from src.utils.fcdScanner import scan_fcd_columns
+from src.utils.traceColumns import timesteps_to_columns
+from src.utils.traceReader import iter_timesteps
+
+# Atributos numéricos de cada veículo
+FLOAT_ATTRIBUTES = ("x", "y", "angle", "speed", "pos", "slope")
+
+
+def parse_with_elementtree(trace_path: str) -> int:
+    """
+    Leitura original: ET.parse do arquivo inteiro e float() de cada atributo.
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo XML de traços.
+
+    Retorna:
+    - int: Número de amostras de veículos lidas.
+    """
+    samples = 0
+    root = ET.parse(trace_path).getroot()
+    for timestep in root:
+        for vehicle in timestep:
+            if vehicle.tag == "vehicle":
+                values = [float(vehicle.attrib[name]) for name in FLOAT_ATTRIBUTES]
+                samples += 1
+    return samples
+
+
+def parse_with_iterparse(trace_path: str) -> int:
+    """
+    Leitura em streaming com iterparse para a representação colunar.
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo XML de traços.
+
+    Retorna:
+    - int: Número de amostras de veículos lidas.
+    """
+    columns, _ = timesteps_to_columns(iter_timesteps(trace_path))
+    return len(columns["time"])
+
+
+def parse_with_fast_scanner(trace_path: str) -> int:
+    """
+    Leitura com o leitor rápido baseado em expressões regulares.
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo XML de traços.
+
+    Retorna:
+    - int: Número de amostras de veículos lidas.
+    """
+    columns, _ = scan_fcd_columns(trace_path)
+    return len(columns["time"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fast FCD scanner benchmark")
+    parser.add_argument("trace_path", nargs="?", default="example.xml", help="FCD file to read")
+    parser.add_argument("-r", "--repeat", type=int, default=3, help="Number of runs of each reader")
+    args = parser.parse_args()
+
+    readers = [
+        ("ET.parse", parse_with_elementtree),
+        ("iterparse", parse_with_iterparse),
+        ("fast scanner", parse_with_fast_scanner),
+    ]
+    baseline = None
+    for name, reader in readers:
+        best = float("inf")
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            samples = reader(args.trace_path)
+            best = min(best, time.perf_counter() - start)
+        baseline = baseline or best
+        print(f"{name:>14}: {best:.3f} s ({samples} samples, {baseline / best:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
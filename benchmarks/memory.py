@@ -0,0 +1,100 @@
+"""Mede a memória por amostra das representações dos traços carregados.
+
+Compara o Timestep original (com __dict__ por instância), o Timestep com __slots__
+e o FleetStore colunar, todos construídos a partir das mesmas amostras.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.memory example.xml
+"""
+import argparse
+import gc
+import tracemalloc
+from typing import Callable, Dict
+from src.FleetStore import FleetStore
+from src.Vehicle import ELEMENT_KINDS, Timestep
+from src.utils.traceColumns import FLOAT_COLUMNS, timesteps_to_columns
+from src.utils.traceReader import iter_timesteps
+
+
+class LegacyTimestep:
+    """
+    Timestep como era antes de __slots__: mesmos atributos, guardados no __dict__ de cada instância.
+    """
+
+    def __init__(self, time, x, y, angle, speed, pos, lane, slope, lanes):
+        self._time = time
+        self._x = x
+        self._y = y
+        self._angle = angle
+        self._speed = speed
+        self._pos = pos
+        self._lane = lanes[lane]  # A faixa era guardada como string em cada amostra
+        self._slope = slope
+
+
+def build_timesteps(columns: Dict, timestep_class: type) -> Dict[int, Dict[int, object]]:
+    """
+    Cria um dicionário de Timesteps por veículo, como o Vehicle faz com add_timestep.
+
+    Parâmetros:
+    - columns (Dict[str, np.ndarray]): Colunas dos traços.
+    - timestep_class (type): Classe usada para cada amostra.
+
+    Retorna:
+    - Dict[int, Dict[int, object]]: Timesteps de cada veículo, indexados pelo tempo.
+    """
+    lanes = columns["lanes"].tolist()
+    vehicles: Dict[int, Dict[int, object]] = {}
+    rows = zip(
+        columns["time"].tolist(),
+        columns["vehicle"].tolist(),
+        *(columns[name].tolist() for name in FLOAT_COLUMNS),
+        columns["lane"].tolist(),
+    )
+    for time, index, x, y, angle, speed, pos, slope, lane in rows:
+        vehicles.setdefault(index, {})[time] = timestep_class(time, x, y, angle, speed, pos, lane, slope, lanes)
+    return vehicles
+
+
+def measure(build: Callable[[], object]) -> int:
+    """
+    Mede a memória alocada (e ainda em uso) por uma função de construção.
+
+    Parâmetros:
+    - build (Callable[[], object]): Função que constrói a representação.
+
+    Retorna:
+    - int: Bytes em uso pela representação construída.
+    """
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del result
+    return size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory per sample benchmark")
+    parser.add_argument("trace_path", nargs="?", default="example.xml", help="FCD file to read")
+    args = parser.parse_args()
+
+    columns, _ = timesteps_to_columns(iter_timesteps(args.trace_path, kinds=ELEMENT_KINDS))
+    samples = len(columns["time"])
+    print(f"{samples} samples")
+
+    representations = [
+        ("Timestep (__dict__)", lambda: build_timesteps(columns, LegacyTimestep)),
+        ("Timestep (__slots__)", lambda: build_timesteps(columns, Timestep)),
+        ("FleetStore", lambda: FleetStore({name: values.copy() for name, values in columns.items()})),
+    ]
+    baseline = None
+    for name, build in representations:
+        size = measure(build)
+        baseline = baseline or size
+        print(f"{name:>21}: {size / samples:7.1f} bytes/sample ({baseline / size:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
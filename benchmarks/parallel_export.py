@@ -0,0 +1,54 @@
+"""Compara a exportação XML em paralelo com a exportação em sequência.
+
+Exporta a mesma simulação (com um drone circular e um drone seguidor) em sequência e com
+vários processos (Simulation.export_timesteps_to_xml com workers > 1), mede o tempo de cada
+uma e verifica que os dois arquivos são idênticos byte a byte, para cada valor de geo.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.parallel_export example.xml --workers 4
+"""
+import argparse
+import filecmp
+import os
+import tempfile
+import time
+from src.Simulation import Simulation
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Parallel XML export benchmark")
+    parser.add_argument("trace_path", nargs="?", default="example.xml", help="FCD file to read")
+    parser.add_argument("--workers", type=int, default=4, help="Number of processes")
+    parser.add_argument("--begin", type=float, default=None, help="Start of the time window")
+    parser.add_argument("--end", type=float, default=None, help="End of the time window")
+    parser.add_argument("--decimate", type=int, default=1, help="Keep one of every N steps")
+    parser.add_argument("--persons", action="store_true", help="Load persons and containers")
+    args = parser.parse_args()
+
+    simulation = Simulation(
+        args.trace_path, begin=args.begin, end=args.end, decimate=args.decimate, include_persons=args.persons
+    )
+    simulation.create_drone_circular((-73.986478, 40.744406), 40)
+    vehicle_id = next(iter(simulation.vehicleList))
+    simulation.create_drone_following(simulation.vehicleList[vehicle_id].id(), 10)
+
+    identical = True
+    with tempfile.TemporaryDirectory() as directory:
+        for geo in (1, 0, 2):
+            serial_path = os.path.join(directory, f"serial{geo}.xml")
+            parallel_path = os.path.join(directory, f"parallel{geo}.xml")
+            start = time.perf_counter()
+            simulation.export_timesteps_to_xml(serial_path, geo)
+            serial = time.perf_counter() - start
+            start = time.perf_counter()
+            simulation.export_timesteps_to_xml(parallel_path, geo, workers=args.workers)
+            parallel = time.perf_counter() - start
+            same = filecmp.cmp(serial_path, parallel_path, shallow=False)
+            identical = identical and same
+            print(f"geo {geo}: serial {serial:6.2f}s, {args.workers} workers {parallel:6.2f}s, identical: {same}")
+    if not identical:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
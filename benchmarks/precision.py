@@ -0,0 +1,67 @@
+"""Mede o erro e a memória do modo de precisão float32 das trajetórias.
+
+Carrega o arquivo em float64 e em float32, compara a posição de todas as amostras
+e falha se o erro máximo de posição passar do limite (em metros).
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.precision example.xml
+"""
+import argparse
+import numpy as np
+from src.FleetStore import FleetStore, VALUE_COLUMNS
+from src.creating_drones import earth_radius
+from src.utils.traceColumns import timesteps_to_columns
+from src.utils.traceReader import iter_timesteps
+
+# Erro máximo de posição aceito em float32, em metros
+MAX_POSITION_ERROR: float = 0.01
+
+
+def position_error(reference: FleetStore, compact: FleetStore, decoded: bool) -> float:
+    """
+    Calcula o maior erro de posição, em metros, entre dois armazenamentos com as mesmas amostras.
+
+    Parâmetros:
+    - reference (FleetStore): Armazenamento em float64.
+    - compact (FleetStore): Armazenamento em float32.
+    - decoded (bool): Se True, compara os valores lidos pelo Timestep (arredondados);
+      caso contrário, os valores float32 brutos somados à origem.
+
+    Retorna:
+    - float: Erro máximo em metros.
+    """
+    if decoded:
+        positions = [compact.timestep(row) for row in range(len(compact.time))]
+        x = np.array([timestep.x() for timestep in positions])
+        y = np.array([timestep.y() for timestep in positions])
+    else:
+        x = compact.origin[0] + compact.x.astype(np.float64)
+        y = compact.origin[1] + compact.y.astype(np.float64)
+    # Aproximação equiretangular, suficiente para distâncias milimétricas
+    dy = np.radians(y - reference.y) * earth_radius
+    dx = np.radians(x - reference.x) * earth_radius * np.cos(np.radians(reference.y))
+    return float(np.max(np.hypot(dx, dy))) if len(dx) else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="float32 trajectory precision benchmark")
+    parser.add_argument("trace_path", nargs="?", default="example.xml", help="FCD file to read")
+    args = parser.parse_args()
+
+    columns, _ = timesteps_to_columns(iter_timesteps(args.trace_path))
+    reference = FleetStore(columns, "float64")
+    compact = FleetStore(columns, "float32")
+
+    for name, store in (("float64", reference), ("float32", compact)):
+        size = sum(getattr(store, column).nbytes for column in VALUE_COLUMNS)
+        print(f"{name}: {size / max(len(store.time), 1):.1f} bytes/sample in value columns")
+
+    raw_error = position_error(reference, compact, decoded=False)
+    decoded_error = position_error(reference, compact, decoded=True)
+    print(f"max position error: {raw_error * 1000:.3f} mm raw, {decoded_error * 1000:.3f} mm decoded")
+    assert raw_error <= MAX_POSITION_ERROR, f"float32 position error {raw_error} m above {MAX_POSITION_ERROR} m"
+    assert decoded_error <= MAX_POSITION_ERROR, f"float32 position error {decoded_error} m above {MAX_POSITION_ERROR} m"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Mede a memória própria de cada cenário rodado sobre traços compartilhados.
+
+Carrega os traços uma vez (TraceBase) e roda vários cenários com drones em processos
+criados com fork (run_scenarios). Cada cenário informa a memória privada do seu processo
+(páginas escritas por ele), que deve ficar pequena e constante em relação à da base.
+Requer Linux (/proc/self/smaps_rollup).
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.scenarios example.xml --scenarios 8 --workers 4
+"""
+import argparse
+import time
+from src.Simulation import Simulation
+from src.TraceBase import TraceBase, run_scenarios
+
+
+def private_memory() -> int:
+    """
+    Retorna a memória privada (não compartilhada com outros processos) do processo atual.
+
+    Retorna:
+    - int: Bytes privados.
+    """
+    total = 0
+    with open("/proc/self/smaps_rollup") as smaps:
+        for line in smaps:
+            if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                total += int(line.split()[1]) * 1024
+    return total
+
+
+def scenario(index: int):
+    """
+    Cria um cenário com um drone estático e um drone circular em posições diferentes.
+
+    Parâmetros:
+    - index (int): Índice do cenário.
+
+    Retorna:
+    - Callable[[TraceBase], Tuple[int, int, int]]: Função que roda o cenário e retorna
+      a memória privada antes e depois da exportação e o número de elementos exportados.
+    """
+    def run(base: TraceBase):
+        before = private_memory()
+        simulation = Simulation(base)
+        simulation.create_drone_static((-73.98 + index * 1e-4, 40.745))
+        simulation.create_drone_circular((-73.986478, 40.744406 + index * 1e-4), 40)
+        elements = sum(len(simulation.timestep_elements(time_key)) for time_key in range(simulation.timestep_total + 1))
+        return before, private_memory(), elements
+
+    return run
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared trace scenarios benchmark")
+    parser.add_argument("trace_path", nargs="?", default="example.xml", help="FCD file to read")
+    parser.add_argument("--scenarios", type=int, default=8, help="Number of scenarios")
+    parser.add_argument("--workers", type=int, default=4, help="Number of processes")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    base = TraceBase(args.trace_path)
+    print(f"base loaded in {time.perf_counter() - start:.2f}s, {len(base.fleet)} vehicles")
+
+    start = time.perf_counter()
+    results = run_scenarios(base, [scenario(index) for index in range(args.scenarios)], args.workers)
+    print(f"{args.scenarios} scenarios in {time.perf_counter() - start:.2f}s")
+    for index, (before, after, elements) in enumerate(results):
+        print(f"scenario {index}: {elements} elements, private memory {before / 2**20:.1f} -> {after / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,59 @@
 import configparser
 from ast import literal_eval
+from functools import partial
 from typing import Dict, Any, List, Tuple, Optional
 from src.Simulation import Simulation  # Importa a classe Simulation
+from src.TraceBase import TraceBase, run_scenarios
+
+def read_trace_options(config: configparser.ConfigParser) -> Dict[str, Any]:
+    """
+    Lê da seção 'Simulation' as opções de leitura dos traços (argumentos de TraceBase).
+
+    Args:
+        config (configparser.ConfigParser): Configuração lida.
+
+    Returns:
+        Dict[str, Any]: Opções de leitura, indexadas pelo nome do argumento.
+
+    Raises:
+        ValueError: Se a seção 'Simulation' não for encontrada no arquivo de configuração.
+    """
+    if "Simulation" not in config:
+        raise ValueError("Section 'Simulation' not found in the configuration file.")
+    section = config["Simulation"]
+    return {
+        # Vários arquivos (um por instância do SUMO) podem ser separados por vírgulas e são mesclados por timestep
+        "trace_path": [path.strip() for path in section["trace_path"].split(",")],
+        "use_cache": section.getboolean("cache", fallback=True),  # Valor padrão: True
+        "workers": section.getint("workers", fallback=1),  # Valor padrão: 1 (leitura sequencial)
+        "begin": section.getfloat("begin", fallback=None),  # Valor padrão: início do arquivo
+        "end": section.getfloat("end", fallback=None),  # Valor padrão: fim do arquivo
+        "bbox": literal_eval(section.get("bbox", fallback="None")),  # Valor padrão: sem caixa
+        "fast_scan": section.getboolean("fast_scan", fallback=False),  # Valor padrão: False
+        "step_length": section.getfloat("step_length", fallback=None),  # Valor padrão: detectado no arquivo
+        "decimate": section.getint("decimate", fallback=1),  # Valor padrão: 1 (todos os passos)
+        "include_persons": section.getboolean("persons", fallback=False),  # Valor padrão: False
+        "follow": section.getboolean("follow", fallback=False),  # Valor padrão: False
+        "precision": section.get("precision", fallback="float64"),  # Valor padrão: "float64"
+    }
+
+
+def create_simulation(config: configparser.ConfigParser, base: TraceBase) -> Simulation:
+    """
+    Cria uma simulação sobre traços já carregados, com as demais opções da seção 'Simulation'.
+
+    Args:
+        config (configparser.ConfigParser): Configuração lida.
+        base (TraceBase): Traços carregados (ver read_trace_options).
+
+    Returns:
+        Simulation: Simulação criada.
+    """
+    section = config["Simulation"]
+    poll_interval: float = section.getfloat("poll_interval", fallback=1.0)  # Valor padrão: 1.0
+    idle_timeout: Optional[float] = section.getfloat("idle_timeout", fallback=60.0)  # Valor padrão: 60.0
+    return Simulation(base, poll_interval=poll_interval, idle_timeout=idle_timeout)
+
 
 def parse_config_and_run(config_file: str) -> None:
     """
@@ -17,12 +69,55 @@ def parse_config_and_run(config_file: str) -> None:
     config.read(config_file)
 
     # Inicializa a simulação
-    if "Simulation" in config:
-        trace_path: str = config["Simulation"]["trace_path"]
-        simulation: Simulation = Simulation(trace_path)
-    else:
-        raise ValueError("Section 'Simulation' not found in the configuration file.")
+    base = TraceBase(**read_trace_options(config))
+    run_config(config, create_simulation(config, base))
+
+
+def parse_configs_and_run(config_files: List[str], workers: int = 1) -> None:
+    """
+    Executa vários arquivos de configuração (cenários), carregando uma única vez os traços
+    compartilhados pelos arquivos com as mesmas opções de leitura. Com workers > 1 os
+    cenários de cada grupo rodam em processos que compartilham os traços (ver run_scenarios).
+
+    Args:
+        config_files (List[str]): Caminhos dos arquivos de configuração.
+        workers (int): Número de processos.
 
+    Raises:
+        ValueError: Se a seção 'Simulation' não for encontrada em algum arquivo de configuração.
+    """
+    groups: Dict[str, Tuple[Dict[str, Any], List[configparser.ConfigParser]]] = {}
+    for config_file in config_files:
+        config = configparser.ConfigParser()
+        config.read(config_file)
+        options = read_trace_options(config)
+        groups.setdefault(repr(sorted(options.items())), (options, []))[1].append(config)
+
+    for options, configs in groups.values():
+        base = TraceBase(**options)
+        scenarios = [partial(_run_scenario_config, config) for config in configs]
+        run_scenarios(base, scenarios, workers)
+
+
+def _run_scenario_config(config: configparser.ConfigParser, base: TraceBase) -> None:
+    """
+    Executa um cenário (arquivo de configuração) sobre traços já carregados.
+
+    Args:
+        config (configparser.ConfigParser): Configuração lida.
+        base (TraceBase): Traços carregados.
+    """
+    run_config(config, create_simulation(config, base))
+
+
+def run_config(config: configparser.ConfigParser, simulation: Simulation) -> None:
+    """
+    Executa as seções do arquivo de configuração (drones, exportações etc.) sobre uma simulação.
+
+    Args:
+        config (configparser.ConfigParser): Configuração lida.
+        simulation (Simulation): Simulação sobre a qual as seções são executadas.
+    """
     # Itera sobre as seções no arquivo de configuração
     for section in config.sections():
         if section.startswith("DroneCircular"):
@@ -97,11 +192,35 @@ def parse_config_and_run(config_file: str) -> None:
         elif section == "ExportXML":
             # Exporta a simulação para um arquivo XML
             new_xml_path: str = config[section]["new_xml_path"]
+            # 1: geográficas, 0: Cartesianas a partir dos valores mínimos, 2: UTM
             geo: int = config[section].getint("geo", fallback=1)  # Valor padrão: 1
+            # Se 1, grava apenas os drones, para serem mesclados com o arquivo original
+            only_vants: int = config[section].getint("only_vants", fallback=0)  # Valor padrão: 0
+            # Número de processos que gravam o arquivo (1 grava em sequência)
+            workers: int = config[section].getint("workers", fallback=1)  # Valor padrão: 1
 
-            simulation.export_timesteps_to_xml(new_xml_path, geo)
+            simulation.export_timesteps_to_xml(new_xml_path, geo, only_vants, workers)
             print(f"Simulation exported to {new_xml_path}.")
 
+        elif section == "ExportNs2":
+            # Exporta a mobilidade para um arquivo TCL do ns-2 (Ns2MobilityHelper do ns-3)
+            ns2_path: str = config[section]["ns2_path"]
+            nodes_path: Optional[str] = config[section].get("nodes_path", fallback=None)  # Valor padrão: None
+            # 0: Cartesianas a partir dos valores mínimos, 2: UTM
+            geo: int = config[section].getint("geo", fallback=0)  # Valor padrão: 0
+            # Se 1, grava apenas os drones, como sobreposição a um arquivo com os veículos
+            only_vants: int = config[section].getint("only_vants", fallback=0)  # Valor padrão: 0
+
+            simulation.export_to_ns2(ns2_path, nodes_path, geo, only_vants)
+            print(f"Mobility exported to {ns2_path}.")
+
+        elif section == "ExportArrays":
+            # Exporta as amostras como arquivos .npy, para análise sem parsear o XML
+            array_directory: str = config[section]["array_directory"]
+
+            simulation.export_to_arrays(array_directory)
+            print(f"Arrays exported to {array_directory}.")
+
         elif section.startswith("ChangeLegend"):
             # Altera a legenda da simulação
             old_legend: str = config[section]["old_legend"]
@@ -1,11 +1,10 @@
 import matplotlib.pyplot as plt
-import xml.etree.ElementTree as ET
 import contextily as cx
 from shapely.geometry import Polygon
 import geopandas as gpd
 import configparser
 from matplotlib.widgets import Button, RadioButtons
-import os
+from src.utils.traceReader import iter_timesteps, strip_trace_extension
 
 # Labels para interface em português
 label_dict = {
@@ -33,8 +32,8 @@ class InteractivePlot:
             xml_file (str): Caminho do arquivo XML.
         """
         self.xml_file = xml_file
-        # Remove a extensão .xml do caminho do arquivo
-        self.base_file_path = os.path.splitext(xml_file)[0]
+        # Remove a extensão .xml (e a de compactação, se houver) do caminho do arquivo
+        self.base_file_path = strip_trace_extension(xml_file)
         self.x_coords, self.y_coords = self.extract_coordinates(xml_file)
         self.min_x, self.max_x = min(self.x_coords), max(self.x_coords)
         self.min_y, self.max_y = min(self.y_coords), max(self.y_coords)
@@ -49,20 +48,18 @@ class InteractivePlot:
         Extrai as coordenadas dos veículos de um arquivo XML.
 
         Args:
-            xml_file (str): Caminho do arquivo XML.
+            xml_file (str): Caminho do arquivo XML (opcionalmente compactado com gzip, bzip2 ou xz).
 
         Returns:
             tuple: Duas listas contendo as coordenadas x e y dos veículos.
         """
-        tree = ET.parse(xml_file)
-        root = tree.getroot()
         x_coords = []
         y_coords = []
 
-        for timestep in root.findall("timestep"):
-            for vehicle in timestep.findall("vehicle"):
-                x_coords.append(float(vehicle.get("x")))
-                y_coords.append(float(vehicle.get("y")))
+        for _, elements in iter_timesteps(xml_file):
+            for _, vehicle in elements:
+                x_coords.append(float(vehicle["x"]))
+                y_coords.append(float(vehicle["y"]))
 
         return x_coords, y_coords
 
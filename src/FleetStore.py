@@ -0,0 +1,334 @@
+import numpy as np
+from typing import Dict, List, Optional, Tuple
+from src.Vehicle import Timestep, Vehicle, vehicle_key
+from src.utils.activeIndex import ActiveIndex
+
+# Colunas com um valor por amostra, além do índice do veículo
+SAMPLE_COLUMNS = ("time", "x", "y", "angle", "speed", "pos", "slope", "lane")
+
+# Colunas de valores reais e precisões aceitas para elas
+VALUE_COLUMNS = ("x", "y", "angle", "speed", "pos", "slope")
+PRECISIONS = ("float64", "float32")
+
+# Casas decimais das coordenadas do FCD do SUMO; x e y em float32 são arredondados para elas ao serem lidos
+FCD_DECIMALS = 6
+
+
+class FleetStore:
+    """
+    Armazenamento colunar das amostras de todos os veículos lidos de um arquivo de traços.
+
+    As amostras ficam em arrays NumPy contíguos, ordenadas por veículo e, dentro de cada veículo,
+    por tempo: as amostras do veículo i ocupam as linhas offsets[i]:offsets[i + 1]. Os objetos
+    Vehicle criados por vehicles() são apenas visões sobre esses arrays; um Timestep só é
+    construído quando solicitado.
+
+    Atributos:
+    - time (np.ndarray): Chave de tempo de cada amostra (int64).
+    - x, y, angle, speed, pos, slope (np.ndarray): Valores de cada amostra (float64, ou float32 com x e y
+      guardados como deslocamentos a partir de `origin`).
+    - lane (np.ndarray): Índice da faixa de cada amostra em `lanes` (int32).
+    - lanes (List[str]): Tabela de faixas.
+    - ids, types, kinds (List[str]): ID, tipo e tag de cada veículo.
+    - offsets (List[int]): Início das amostras de cada veículo (com o total no final).
+    - precision (str): Precisão dos valores ("float64" ou "float32").
+    - origin (Tuple[float, float]): Longitude e latitude mínimas, subtraídas de x e y em float32.
+    """
+
+    def __init__(self, columns: Dict[str, np.ndarray], precision: str = "float64") -> None:
+        """
+        Cria o armazenamento a partir da representação colunar (ver src.utils.traceColumns).
+
+        As colunas só são copiadas se não estiverem ordenadas por veículo ou se a precisão for
+        float32; colunas float64 já ordenadas (por exemplo, abertas com mmap do cache) são usadas diretamente.
+
+        Em float32, x e y são guardados como deslocamentos a partir da longitude e latitude mínimas
+        do cenário, o que limita o erro de posição a milímetros, e são arredondados para as casas
+        decimais do FCD ao serem lidos. Os demais valores são lidos pela menor representação decimal
+        do float32 (ex.: 118.27 em vez de 118.26999664...).
+
+        Parâmetros:
+        - columns (Dict[str, np.ndarray]): Dicionário de colunas.
+        - precision (str): Precisão dos valores ("float64" ou "float32").
+
+        Lança:
+        - ValueError: Se a precisão não for aceita.
+        """
+        if precision not in PRECISIONS:
+            raise ValueError(f"Unsupported precision '{precision}', expected one of {PRECISIONS}.")
+        vehicle = columns["vehicle"]
+        self.ids: List[str] = columns["ids"].tolist()
+        self.types: List[str] = columns["types"].tolist()
+        self.kinds: List[str] = columns["kinds"].tolist()
+        self.lanes: List[str] = columns["lanes"].tolist()
+
+        # np.asarray descarta a subclasse memmap (cujo acesso por índice é lento) sem copiar os dados
+        columns = {name: np.asarray(columns[name]) for name in SAMPLE_COLUMNS}
+        if len(vehicle) > 1 and np.any(vehicle[1:] < vehicle[:-1]):
+            # Ordenação estável: as amostras de cada veículo continuam em ordem de tempo
+            order = np.argsort(vehicle, kind="stable")
+            columns = {name: values[order] for name, values in columns.items()}
+        self.precision: str = precision
+        self.origin: Tuple[float, float] = (0.0, 0.0)
+        self._decimals: Optional[int] = None
+        if precision == "float32":
+            if len(columns["x"]):
+                self.origin = (float(columns["x"].min()), float(columns["y"].min()))
+            columns["x"] = columns["x"] - self.origin[0]
+            columns["y"] = columns["y"] - self.origin[1]
+            for name in VALUE_COLUMNS:
+                columns[name] = columns[name].astype(np.float32)
+            self._decimals = FCD_DECIMALS
+        self.time: np.ndarray = columns["time"]
+        self.x: np.ndarray = columns["x"]
+        self.y: np.ndarray = columns["y"]
+        self.angle: np.ndarray = columns["angle"]
+        self.speed: np.ndarray = columns["speed"]
+        self.pos: np.ndarray = columns["pos"]
+        self.slope: np.ndarray = columns["slope"]
+        self.lane: np.ndarray = columns["lane"]
+
+        counts = np.bincount(vehicle, minlength=len(self.ids))
+        self.offsets: List[int] = [0] + np.cumsum(counts).tolist()
+        # Tempos da primeira e da última amostra de cada veículo (veículos sem amostras ficam com [0, -1])
+        offsets = np.array(self.offsets, dtype=np.int64)
+        present = np.flatnonzero(counts)
+        first_time = np.zeros(len(self.ids), dtype=np.int64)
+        last_time = np.full(len(self.ids), -1, dtype=np.int64)
+        first_time[present] = self.time[offsets[present]]
+        last_time[present] = self.time[offsets[present + 1] - 1]
+        self._first_time: List[int] = first_time.tolist()
+        self._last_time: List[int] = last_time.tolist()
+        # Índices construídos sob demanda (ver key_index e active_index)
+        self._key_index: Optional[Dict[str, int]] = None
+        self._active_index: Optional[ActiveIndex] = None
+        self._min_positions: Optional[Tuple[List[float], List[float]]] = None
+
+    def __len__(self) -> int:
+        """
+        Retorna o número de veículos do armazenamento.
+
+        Retorna:
+        - int: Número de veículos.
+        """
+        return len(self.ids)
+
+    def keys(self) -> List[str]:
+        """
+        Retorna as chaves de todos os veículos do armazenamento (ver vehicle_key), na ordem dos índices.
+
+        Retorna:
+        - List[str]: Chaves dos veículos.
+        """
+        return [vehicle_key(kind, vehicle_id) for kind, vehicle_id in zip(self.kinds, self.ids)]
+
+    def key_index(self) -> Dict[str, int]:
+        """
+        Retorna o índice de cada veículo do armazenamento, indexado pela chave (ver vehicle_key).
+
+        Retorna:
+        - Dict[str, int]: Dicionário de chaves para índices.
+        """
+        if self._key_index is None:
+            self._key_index = {key: index for index, key in enumerate(self.keys())}
+        return self._key_index
+
+    def active_index(self) -> ActiveIndex:
+        """
+        Retorna o índice dos veículos ativos em cada intervalo de tempo, com os índices dos veículos do armazenamento.
+
+        Retorna:
+        - ActiveIndex: Índice de veículos ativos.
+        """
+        if self._active_index is None:
+            self._active_index = ActiveIndex([self.time_range(index) for index in range(len(self.ids))])
+        return self._active_index
+
+    def vehicles(self) -> Dict[str, Vehicle]:
+        """
+        Cria as visões Vehicle de todos os veículos do armazenamento.
+
+        Retorna:
+        - Dict[str, Vehicle]: Dicionário com os veículos, indexados pela chave (ver vehicle_key).
+        """
+        vehicles = {}
+        for index, attributes in enumerate(zip(self.ids, self.types, self.kinds)):
+            vehicle = Vehicle(*attributes, store=self, index=index)
+            vehicles[vehicle.key()] = vehicle
+        return vehicles
+
+    def row(self, index: int, time: int) -> Optional[int]:
+        """
+        Localiza a amostra de um veículo em um determinado tempo.
+
+        Parâmetros:
+        - index (int): Índice do veículo.
+        - time (int): Tempo da amostra.
+
+        Retorna:
+        - Optional[int]: Linha da amostra, ou None se o veículo não estiver presente nesse tempo.
+        """
+        first = self._first_time[index]
+        if time < first or time > self._last_time[index]:
+            return None
+        start = self.offsets[index]
+        stop = self.offsets[index + 1]
+        # Caso comum: amostras em tempos consecutivos, acessadas diretamente pelo deslocamento
+        row = start + time - first
+        if row < stop and self.time[row] == time:
+            return row
+        row = start + int(np.searchsorted(self.time[start:stop], time))
+        if row < stop and self.time[row] == time:
+            return row
+        return None
+
+    def time_range(self, index: int) -> Optional[Tuple[int, int]]:
+        """
+        Retorna os tempos da primeira e da última amostra de um veículo.
+
+        Parâmetros:
+        - index (int): Índice do veículo.
+
+        Retorna:
+        - Optional[Tuple[int, int]]: Tempos (primeiro, último), ou None se o veículo não tiver amostras.
+        """
+        if self.offsets[index] == self.offsets[index + 1]:
+            return None
+        return self._first_time[index], self._last_time[index]
+
+    def timestep(self, row: int) -> Timestep:
+        """
+        Constrói o Timestep de uma amostra.
+
+        Parâmetros:
+        - row (int): Linha da amostra.
+
+        Retorna:
+        - Timestep: Estado do veículo na amostra.
+        """
+        if self._decimals is not None:
+            decimals = self._decimals
+            return Timestep(
+                int(self.time[row]),
+                round(self.origin[0] + float(self.x[row]), decimals),
+                round(self.origin[1] + float(self.y[row]), decimals),
+                float(str(self.angle[row])),
+                float(str(self.speed[row])),
+                float(str(self.pos[row])),
+                int(self.lane[row]),
+                float(str(self.slope[row])),
+                self.lanes,
+            )
+        return Timestep(
+            int(self.time[row]),
+            float(self.x[row]),
+            float(self.y[row]),
+            float(self.angle[row]),
+            float(self.speed[row]),
+            float(self.pos[row]),
+            int(self.lane[row]),
+            float(self.slope[row]),
+            self.lanes,
+        )
+
+    def rows(self, index: int) -> range:
+        """
+        Retorna as linhas de todas as amostras de um veículo, em ordem de tempo.
+
+        Parâmetros:
+        - index (int): Índice do veículo.
+
+        Retorna:
+        - range: Linhas das amostras.
+        """
+        return range(self.offsets[index], self.offsets[index + 1])
+
+    def positions(self, index: int) -> List[Tuple[int, float, float]]:
+        """
+        Retorna as posições de um veículo em todas as suas amostras, lidas diretamente das colunas.
+
+        Parâmetros:
+        - index (int): Índice do veículo.
+
+        Retorna:
+        - List[Tuple[int, float, float]]: Tuplas (tempo, x, y), em ordem de tempo.
+        """
+        start, stop = self.offsets[index], self.offsets[index + 1]
+        times = self.time[start:stop].tolist()
+        xs = self.x[start:stop].tolist()
+        ys = self.y[start:stop].tolist()
+        if self._decimals is not None:
+            # Mesma decodificação de timestep
+            origin_x, origin_y = self.origin
+            xs = [round(origin_x + x, self._decimals) for x in xs]
+            ys = [round(origin_y + y, self._decimals) for y in ys]
+        return list(zip(times, xs, ys))
+
+    def samples(self, index: int, names: Tuple[str, ...] = ("time", "x", "y", "speed", "angle")) -> Dict[str, np.ndarray]:
+        """
+        Retorna colunas das amostras de um veículo, em ordem de tempo, decodificadas como em to_columns.
+
+        Parâmetros:
+        - index (int): Índice do veículo.
+        - names (Tuple[str, ...]): Colunas desejadas (ver SAMPLE_COLUMNS).
+
+        Retorna:
+        - Dict[str, np.ndarray]: Dicionário de colunas (em float64, visões dos arrays, sem cópia).
+        """
+        start, stop = self.offsets[index], self.offsets[index + 1]
+        columns = {name: getattr(self, name)[start:stop] for name in names}
+        if self._decimals is not None:
+            for name, values in columns.items():
+                if name in ("x", "y"):
+                    origin = self.origin[0] if name == "x" else self.origin[1]
+                    columns[name] = np.round(origin + values.astype(np.float64), self._decimals)
+                elif name in VALUE_COLUMNS:
+                    # Menor representação decimal de cada float32 (ver timestep)
+                    columns[name] = values.astype(str).astype(np.float64)
+        return columns
+
+    def min_positions(self) -> Tuple[List[float], List[float]]:
+        """
+        Retorna a menor coordenada x e a menor coordenada y de cada veículo (inf para veículos sem amostras).
+
+        Retorna:
+        - Tuple[List[float], List[float]]: Menores x e menores y, na ordem dos índices dos veículos.
+        """
+        if self._min_positions is None:
+            counts = np.diff(np.array(self.offsets, dtype=np.int64))
+            present = np.flatnonzero(counts)
+            starts = np.array(self.offsets[:-1], dtype=np.int64)[present]
+            minimums = []
+            for values, origin in ((self.x, self.origin[0]), (self.y, self.origin[1])):
+                minimum = np.full(len(self.ids), np.inf)
+                if len(present):
+                    minimum[present] = np.minimum.reduceat(values, starts)
+                minimum = minimum.tolist()
+                if self._decimals is not None:
+                    # Mesma decodificação de timestep (o arredondamento preserva a ordem)
+                    minimum = [round(origin + value, self._decimals) for value in minimum]
+                minimums.append(minimum)
+            self._min_positions = (minimums[0], minimums[1])
+        return self._min_positions
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        """
+        Converte o armazenamento de volta para a representação colunar (em float64), na ordem por veículo.
+
+        Retorna:
+        - Dict[str, np.ndarray]: Dicionário de colunas.
+        """
+        counts = np.diff(np.array(self.offsets, dtype=np.int64))
+        columns = {name: getattr(self, name) for name in SAMPLE_COLUMNS}
+        if self._decimals is not None:
+            columns["x"] = np.round(self.origin[0] + self.x.astype(np.float64), self._decimals)
+            columns["y"] = np.round(self.origin[1] + self.y.astype(np.float64), self._decimals)
+            for name in ("angle", "speed", "pos", "slope"):
+                # Menor representação decimal de cada float32 (ver timestep)
+                columns[name] = columns[name].astype(str).astype(np.float64)
+        columns["vehicle"] = np.repeat(np.arange(len(self.ids), dtype=np.int32), counts)
+        columns["ids"] = np.array(self.ids, dtype=str)
+        columns["types"] = np.array(self.types, dtype=str)
+        columns["kinds"] = np.array(self.kinds, dtype=str)
+        columns["lanes"] = np.array(self.lanes, dtype=str)
+        return columns
@@ -1,16 +1,50 @@
-import xml.etree.ElementTree as ET
 from xml.dom import minidom
+import copy
+import csv
 import math
-from typing import Dict, List, Tuple, Optional
-from src.Vehicle import Vehicle
+import multiprocessing
+import os
+import shutil
+import tempfile
+import warnings
+import numpy as np
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, Optional, Union
+from src.TraceBase import TraceBase
+from src.Vehicle import ELEMENT_KINDS, Vehicle, vehicle_key
+from src.VehicleMap import Entry, VehicleMap
 from src.videomaker import generate_video_with_vector_coordinates_image
 from src.creating_drones import (
-    create_drone_following_object,
-    create_drone_static_point,
-    create_drone_generic_pattern,
+    FollowingDroneBuilder,
+    PatternDroneBuilder,
+    StaticDroneBuilder,
     meters_to_geo,
 )
-from src.utils.conversionMeters import convert_coordinates
+from src.utils.conversionMeters import (
+    convert_coordinates,
+    format_meters,
+    latlon_to_utm_array,
+    latlon_to_xy_array,
+    longitude_to_utm_zone,
+    project_elements,
+)
+from src.utils.arrayBundle import write_array_bundle
+from src.utils.ns2Writer import Ns2Writer, format_seconds
+from src.utils.symbolTable import SymbolTable
+from src.utils.traceReader import (
+    TimeGrid,
+    element_lane,
+    element_type,
+    find_timestep_offsets,
+    follow_timesteps,
+    in_bbox,
+    is_compressed,
+    iter_timesteps,
+    iter_timesteps_in_range,
+    read_root_tag,
+    split_timestep_ranges,
+    trim_timestep_offsets,
+)
+from src.utils.traceWriter import TraceWriter, format_time
 
 
 class Simulation:
@@ -19,64 +53,198 @@ class Simulation:
     Permite a leitura de um arquivo XML de traços, criação de drones e exportação de resultados.
     """
 
-    def __init__(self, trace_path: str):
+    def __init__(
+        self,
+        trace: Union[str, List[str], TraceBase],
+        poll_interval: float = 1.0,
+        idle_timeout: Optional[float] = 60.0,
+        **options: Any,
+    ):
         """
-        Inicializa a simulação com base no caminho do arquivo XML de traços.
+        Inicializa a simulação sobre os traços de um arquivo XML.
 
         Parâmetros:
-        - trace_path (str): Caminho do arquivo XML contendo os traços da simulação.
+        - trace (Union[str, List[str], TraceBase]): Traços já carregados, compartilhados com outras simulações,
+          ou o caminho (ou a lista de caminhos) do arquivo XML, carregado com as opções em `options`.
+        - poll_interval (float): Intervalo, em segundos, entre verificações de novos dados no modo follow.
+        - idle_timeout (Optional[float]): Tempo máximo, em segundos, sem novos dados no modo follow.
+        - options (Any): Opções de leitura do TraceBase (ex.: begin, end, decimate, include_persons), usadas apenas
+          quando `trace` é um caminho.
+
+        Lança:
+        - ValueError: Se opções de leitura forem passadas junto com um TraceBase.
         """
-        self.vehicleList: Dict[str, Vehicle] = {}  # Dicionário com todos os veículos
+        if isinstance(trace, TraceBase):
+            if options:
+                raise ValueError("Trace loading options cannot be combined with an already loaded TraceBase.")
+            base = trace
+        else:
+            base = TraceBase(trace, **options)
+        # Traços carregados, compartilhados e nunca alterados pela simulação; as opções de leitura
+        # (janela, grade de tempo, tags lidas, ...) são lidas sempre a partir dela
+        self.base: TraceBase = base
+        # Dicionário com todos os veículos: os da base (só viram objetos Vehicle quando acessados)
+        # e as alterações desta simulação (ver VehicleMap)
+        self.vehicleList: VehicleMap = VehicleMap(base.fleet)
         self.typeList: Dict[str, str] = {}  # Dicionário com tipos de veículos
         self.typeList["VANT"] = "UAV"  # Define o tipo "VANT" como "UAV"
-        self.timestep_total: int = 0  # Total de intervalos de tempo
-        self.trace_path: str = trace_path  # Caminho do arquivo XML
+        for vehicle_type in base.types:
+            self.typeList.setdefault(vehicle_type, vehicle_type)
+        self.timestep_total: int = base.timestep_total  # Total de intervalos de tempo
+        self.lanes: SymbolTable = SymbolTable()  # Faixas das amostras lidas no modo follow
         self.droneNumber: int = 0  # Contador de drones criados
-        self.read_xml(trace_path)  # Lê o arquivo XML
+        self.droneBuilders: Dict[str, Callable[[int], Vehicle]] = {}  # Funções que estendem cada drone
+        self.following: bool = base.follow  # Define se o arquivo ainda deve ser acompanhado (modo follow)
+        self.poll_interval: float = poll_interval  # Intervalo entre verificações no modo follow
+        self.idle_timeout: Optional[float] = idle_timeout  # Espera máxima por novos dados no modo follow
+
+    def _reload_base(self, name: str, trace_paths: List[str], load: Callable[[TraceBase], Any]) -> Any:
+        """
+        Recarrega os traços da simulação com um dos leitores do TraceBase, para os métodos de leitura
+        que ficavam na Simulation. A base atual, possivelmente compartilhada, não é alterada: os traços
+        são lidos numa nova base com as mesmas opções, que passa a ser a desta simulação. Os veículos
+        adicionados à simulação (drones, por exemplo) são mantidos; os da base anterior, não.
+
+        Parâmetros:
+        - name (str): Nome do método obsoleto, usado no aviso.
+        - trace_paths (List[str]): Arquivos lidos, relidos depois pela exportação.
+        - load (Callable[[TraceBase], Any]): Função que lê os traços na nova base.
+
+        Retorna:
+        - Any: O retorno de `load`.
+        """
+        warnings.warn(
+            f"Simulation.{name} is deprecated; load traces with TraceBase.{name} instead.",
+            DeprecationWarning,
+            stacklevel=3,
+        )
+        base = copy.copy(self.base)
+        base.trace_paths = list(trace_paths)
+        base.trace_path = base.trace_paths[0]
+        base.fleet = None
+        base.types = []
+        base.timestep_total = 0
+        base.merged_timesteps = []
+        result = load(base)
+        if base.fleet is not None:
+            base.freeze()
+
+        old_keys = self.base.fleet.key_index() if self.base.fleet is not None else {}
+        added = [(key, self.vehicleList[key]) for key in self.vehicleList if key not in old_keys]
+        self.base = base
+        self.vehicleList = VehicleMap(base.fleet)
+        for key, vehicle in added:
+            self.vehicleList[key] = vehicle
+        for vehicle_type in base.types:
+            self.typeList.setdefault(vehicle_type, vehicle_type)
+        self.timestep_total = base.timestep_total
+        self.refresh_drones()
+        return result
+
+    def load_trace(self, trace_path: str):
+        """
+        Obsoleto: use TraceBase.load_trace (ver _reload_base).
+
+        Parâmetros:
+        - trace_path (str): Caminho do arquivo XML.
+        """
+        self._reload_base("load_trace", [trace_path], lambda base: base.load_trace(trace_path))
 
     def read_xml(self, trace_path: str):
         """
-        Lê o arquivo XML e popula a lista de veículos.
+        Obsoleto: use TraceBase.read_xml (ver _reload_base).
+
+        Parâmetros:
+        - trace_path (str): Caminho do arquivo XML.
+        """
+        self._reload_base("read_xml", [trace_path], lambda base: base.read_xml(trace_path))
+
+    def read_xml_merged(self, trace_paths: List[str]):
+        """
+        Obsoleto: use TraceBase.read_xml_merged (ver _reload_base).
+
+        Parâmetros:
+        - trace_paths (List[str]): Caminhos dos arquivos XML.
+        """
+        self._reload_base("read_xml_merged", trace_paths, lambda base: base.read_xml_merged(trace_paths))
+
+    def read_xml_fast(self, trace_path: str) -> bool:
+        """
+        Obsoleto: use TraceBase.read_xml_fast (ver _reload_base).
 
         Parâmetros:
         - trace_path (str): Caminho do arquivo XML.
+
+        Retorna:
+        - bool: True se o arquivo foi lido; False se o parser genérico deve ser usado.
+        """
+        return self._reload_base("read_xml_fast", [trace_path], lambda base: base.read_xml_fast(trace_path))
+
+    def read_xml_parallel(self, trace_path: str, workers: int):
+        """
+        Obsoleto: use TraceBase.read_xml_parallel (ver _reload_base).
+
+        Parâmetros:
+        - trace_path (str): Caminho do arquivo XML.
+        - workers (int): Número de processos.
         """
-        outputxml = ET.parse(trace_path)
-        timestepList = outputxml.getroot()
-        for timestep in timestepList:
-            timeInstant = timestep.attrib["time"]
-            self.timestep_total = int(float(timeInstant))
-            for timestepVehicleData in timestep:
-                if timestepVehicleData.tag == "vehicle":
-                    vehicleData = timestepVehicleData.attrib
-                    vehicleId = vehicleData["id"]
-                    vehicleX = vehicleData["x"]
-                    vehicleY = vehicleData["y"]
-                    vehicleAngle = vehicleData["angle"]
-                    vehicleType = vehicleData["type"]
-                    vehicleSpeed = vehicleData["speed"]
-                    vehiclePos = vehicleData["pos"]
-                    vehicleLane = vehicleData["lane"]
-                    vehicleSlope = vehicleData["slope"]
-                    if vehicleId not in self.vehicleList.keys():
-                        self.vehicleList[vehicleId] = Vehicle(vehicleId, vehicleType)
-                        if vehicleType not in self.typeList:
-                            self.typeList[vehicleType] = vehicleType
-                    self.vehicleList[vehicleId].add_timestep(
-                        str(float(timeInstant) + 1),  # Offset para garantir IDs únicos
-                        vehicleX,
-                        vehicleY,
-                        vehicleAngle,
-                        vehicleSpeed,
-                        vehiclePos,
-                        vehicleLane,
-                        vehicleSlope,
-                    )
-        self.timestep_total += 1
+        self._reload_base("read_xml_parallel", [trace_path], lambda base: base.read_xml_parallel(trace_path, workers))
+
+    def active_entries(self, time_key: int) -> List[Entry]:
+        """
+        Obsoleto: use VehicleMap.active_entries em vehicleList.
+
+        Parâmetros:
+        - time_key (int): Intervalo de tempo.
+
+        Retorna:
+        - List[Entry]: Entradas dos veículos ativos, na ordem dos veículos da simulação.
+        """
+        warnings.warn(
+            "Simulation.active_entries is deprecated; use Simulation.vehicleList.active_entries instead.",
+            DeprecationWarning,
+            stacklevel=2,
+        )
+        return self.vehicleList.active_entries(time_key)
+
+    def add_timestep_elements(self, timeKey: int, elements: List[Tuple[str, Dict[str, str]]]):
+        """
+        Adiciona à simulação os elementos de um timestep do arquivo XML.
+
+        Parâmetros:
+        - timeKey (int): Chave do timestep (ver TimeGrid).
+        - elements (List[Tuple[str, Dict[str, str]]]): Elementos do timestep como (tag, atributos).
+        """
+        for tag, vehicleData in elements:
+            vehicleId = vehicleData["id"]
+            vehicleX = vehicleData["x"]
+            vehicleY = vehicleData["y"]
+            vehicleAngle = vehicleData["angle"]
+            vehicleType = element_type(tag, vehicleData)
+            vehicleSpeed = vehicleData["speed"]
+            vehiclePos = vehicleData["pos"]
+            vehicleLane = element_lane(vehicleData)
+            vehicleSlope = vehicleData["slope"]
+            vehicleKey = vehicle_key(tag, vehicleId)
+            if vehicleKey not in self.vehicleList.keys():
+                self.vehicleList[vehicleKey] = Vehicle(vehicleId, vehicleType, tag, lanes=self.lanes)
+                if vehicleType not in self.typeList:
+                    self.typeList[vehicleType] = vehicleType
+            self.vehicleList[vehicleKey].add_timestep(
+                timeKey,
+                vehicleX,
+                vehicleY,
+                vehicleAngle,
+                vehicleSpeed,
+                vehiclePos,
+                vehicleLane,
+                vehicleSlope,
+            )
+        self.vehicleList.invalidate()  # Os períodos de presença dos veículos mudaram
 
     def getVehicleById(self, id: str) -> Vehicle:
         """
-        Retorna um veículo pelo ID.
+        Retorna um veículo pelo ID (ou pela chave, no caso de pessoas e contêineres; ver vehicle_key).
 
         Parâmetros:
         - id (str): ID do veículo.
@@ -101,20 +269,10 @@ class Simulation:
         - limits_map (Union[List[Tuple[float, float]], int]): Limites do mapa. Se 0, calcula automaticamente.
         - only_vants (int): Define se apenas drones devem ser incluídos no vídeo.
         """
+        if self.following:
+            self.follow_trace()
         video_directory += ".mp4"
-        names = list(self.typeList.keys())
-        vector_coordinates = [[] for _ in names]
-        for vehicle_id in self.vehicleList.keys():
-            coordinates = []
-            vehicle_object = self.vehicleList[vehicle_id]
-            for i in range(int(float(self.timestep_total) + 1)):
-                timestep = vehicle_object.get_timestep(i)
-                if timestep is None:
-                    coordinates.append((0, 0))
-                else:
-                    coordinates.append((timestep.x(), timestep.y()))
-            index_in_vector_coordinates = names.index(vehicle_object.type())
-            vector_coordinates[index_in_vector_coordinates].append(coordinates)
+        vector_coordinates = self.vector_with_all_coordinates()
         names = list(self.typeList.values())
 
         generate_video_with_vector_coordinates_image(
@@ -130,44 +288,487 @@ class Simulation:
         """
         return self.timestep_total
 
-    def export_timesteps_to_xml(self, new_xml_path: str, geo: int = 1):
+    def export_timesteps_to_xml(self, new_xml_path: str, geo: int = 1, only_vants: int = 0, workers: int = 1):
         """
         Exporta os intervalos de tempo para um arquivo XML.
 
         Parâmetros:
         - new_xml_path (str): Caminho do arquivo XML de saída.
         - geo (int): Define se as coordenadas devem ser mantidas geográficas. Se 0 converte para valores maiores que 0.
+          Se 2 converte para coordenadas UTM (Easting, Northing) na zona da menor longitude dos veículos.
+        - only_vants (int): Se 1, exporta apenas os drones (ver export_uavs_to_xml).
+        - workers (int): Número de processos que gravam o arquivo (ver export_timesteps_parallel).
+          Usado apenas com um único arquivo de traços não compactado, fora do modo follow.
+
+        O arquivo de origem é percorrido em streaming e cada timestep é gravado assim que é lido,
+        com os elementos carregados na simulação regravados a partir dela; os demais (ex.: pessoas
+        e contêineres, se não carregados) são copiados como estão no arquivo original. A memória
+        usada não depende do tamanho dos traços. Com geo = 0, a origem da conversão é calculada a
+        partir das amostras em memória e as coordenadas já são gravadas em metros. No modo follow,
+        o arquivo é exportado incrementalmente enquanto é acompanhado (ver follow_trace) e, como a
+        origem só é conhecida no final, a conversão (geo = 0 ou 2) é feita depois, sobre o arquivo gravado.
+        Com vários arquivos de traços, são exportados os timesteps mesclados, apenas com os
+        elementos carregados na simulação.
         """
-        tree = ET.parse(self.trace_path)
-        root = tree.getroot()
-
-        for timestep in root.findall("timestep"):
-            time = timestep.attrib["time"]
-            for vehicle in timestep.findall("vehicle"):
-                timestep.remove(vehicle)
-
-            if int(float(time)) <= self.timestep_total:
-                for vehicle_id, vehicle_obj in self.vehicleList.items():
-                    if vehicle_obj.is_present(int(float(time))):
-                        timestep_vehicle = vehicle_obj.get_timestep(int(float(time)))
-                        ET.SubElement(
-                            timestep,
-                            "vehicle",
-                            {
-                                "id": vehicle_obj.id(),
-                                "x": str(timestep_vehicle.x()),
-                                "y": str(timestep_vehicle.y()),
-                                "angle": str(timestep_vehicle.angle()),
-                                "type": vehicle_obj.type(),
-                                "speed": str(timestep_vehicle.speed()),
-                                "pos": str(timestep_vehicle.pos()),
-                                "lane": timestep_vehicle.lane(),
-                                "slope": str(timestep_vehicle.slope()),
-                            },
-                        )
-        tree.write(new_xml_path, encoding="utf-8", xml_declaration=True)
-        if geo == 0:
-            convert_coordinates(new_xml_path, new_xml_path)
+        if only_vants == 1:
+            self.export_uavs_to_xml(new_xml_path, geo)
+            return
+        if self.following:
+            self.follow_trace(new_xml_path)
+            if geo in (0, 2):
+                convert_coordinates(new_xml_path, new_xml_path, utm=geo == 2)
+            return
+
+        convert = self.element_converter(geo)
+        if len(self.base.trace_paths) > 1:
+            # Vários arquivos: não há um arquivo de origem único, então os timesteps mesclados são escritos
+            with TraceWriter(new_xml_path) as writer:
+                for time_instant, time_key in self.base.merged_timesteps:
+                    writer.write_timestep(time_instant, convert(self.timestep_elements(time_key - 1)))
+            return
+
+        if workers > 1 and not is_compressed(self.base.trace_path) and "fork" in multiprocessing.get_all_start_methods():
+            self.export_timesteps_parallel(new_xml_path, convert, workers)
+            return
+
+        with TraceWriter(new_xml_path, read_root_tag(self.base.trace_path)) as writer:
+            # Timesteps fora da janela de tempo lida não são exportados
+            timesteps = iter_timesteps(self.base.trace_path, self.base.begin, self.base.end, kinds=None)
+            for time_instant, elements in self.export_timesteps(timesteps, convert):
+                writer.write_timestep(time_instant, elements)
+
+    def export_timesteps(
+        self,
+        timesteps: Iterable[Tuple[str, List[Tuple[str, Dict[str, str]]]]],
+        convert: Callable[[List[Tuple[str, Dict[str, str]]]], List[Tuple[str, Dict[str, str]]]],
+    ) -> Iterator[Tuple[str, List[Tuple[str, Dict[str, str]]]]]:
+        """
+        Monta os timesteps exportados a partir dos timesteps do arquivo de origem: os elementos
+        carregados na simulação são substituídos pelos da simulação e os demais são mantidos.
+
+        Parâmetros:
+        - timesteps (Iterable): Pares (tempo, elementos) lidos do arquivo de origem, com todos os elementos.
+        - convert (Callable): Conversão das coordenadas (ver element_converter).
+
+        Retorna:
+        - Iterator: Pares (tempo, elementos) a serem gravados.
+        """
+        for time_instant, elements in timesteps:
+            time_key = self.base.time_grid.key(time_instant)
+            if time_key is None:
+                continue  # Passo descartado pela dizimação
+            time_key -= 1
+            elements = [(tag, attributes) for tag, attributes in elements if tag not in self.base.kinds]
+            if time_key <= self.timestep_total:
+                elements.extend(self.timestep_elements(time_key))
+            yield time_instant, convert(elements)
+
+    def export_timesteps_parallel(
+        self,
+        new_xml_path: str,
+        convert: Callable[[List[Tuple[str, Dict[str, str]]]], List[Tuple[str, Dict[str, str]]]],
+        workers: int,
+    ):
+        """
+        Exporta os timesteps em paralelo, com o mesmo resultado, byte a byte, de export_timesteps_to_xml.
+
+        O arquivo de origem é dividido em intervalos contíguos de timesteps (ver split_timestep_ranges);
+        cada intervalo é lido e gravado num fragmento temporário por um processo criado com fork, que
+        herda a simulação sem serializá-la, e os fragmentos são copiados em ordem para o arquivo final,
+        entre a abertura e o fechamento da raiz.
+
+        Parâmetros:
+        - new_xml_path (str): Caminho do arquivo XML de saída.
+        - convert (Callable): Conversão das coordenadas (ver element_converter).
+        - workers (int): Número de processos.
+        """
+        global _export_simulation, _export_convert
+        offsets, stop = find_timestep_offsets(self.base.trace_path)
+        offsets, stop = trim_timestep_offsets(self.base.trace_path, offsets, stop, self.base.begin, self.base.end)
+        # Mais intervalos que processos equilibram melhor a carga
+        ranges = split_timestep_ranges(offsets, stop, workers * 4)
+        # Índices construídos sob demanda são criados antes do fork, para não serem refeitos em cada processo
+        self.vehicleList.active_entries(0)
+
+        part_directory = tempfile.mkdtemp(prefix=".export-", dir=os.path.dirname(os.path.abspath(new_xml_path)))
+        jobs = [
+            (os.path.join(part_directory, f"{index}.part"), start, end)
+            for index, (start, end) in enumerate(ranges)
+        ]
+        _export_simulation, _export_convert = self, convert
+        try:
+            if jobs:
+                with multiprocessing.get_context("fork").Pool(min(workers, len(jobs))) as pool:
+                    pool.map(_export_range, jobs, chunksize=1)
+            with TraceWriter(new_xml_path, read_root_tag(self.base.trace_path)) as writer:
+                for part_path, _, _ in jobs:
+                    writer.append_part(part_path)
+        finally:
+            _export_simulation, _export_convert = None, None
+            shutil.rmtree(part_directory, ignore_errors=True)
+
+    def export_uavs_to_xml(self, new_xml_path: str, geo: int = 1):
+        """
+        Exporta apenas os drones (veículos do tipo "VANT") para um arquivo FCD, sem regravar os
+        veículos do arquivo de traços.
+
+        O arquivo tem a mesma raiz do arquivo de origem e os drones aparecem nos mesmos timesteps
+        e com os mesmos atributos da exportação completa (export_timesteps_to_xml), então pode ser
+        mesclado por tempo com o arquivo original ao ser consumido. Timesteps sem drones não são gravados.
+        O tamanho do arquivo depende apenas dos drones, não do tamanho dos traços.
+
+        Parâmetros:
+        - new_xml_path (str): Caminho do arquivo XML de saída.
+        - geo (int): Conversão das coordenadas, como em export_timesteps_to_xml. Com geo = 0 ou 2, a
+          origem (ou a zona) é a da exportação completa, calculada com todos os veículos.
+        """
+        if self.following:
+            self.follow_trace()
+        convert = self.element_converter(geo)
+        uavs = self.uav_entries()
+        with TraceWriter(new_xml_path, read_root_tag(self.base.trace_path)) as writer:
+            for time_key in range(self.last_sample_key() + 1):
+                elements = self.timestep_elements(time_key, uavs)
+                if elements:
+                    seconds = float(self.sample_seconds(np.array([time_key]))[0])
+                    writer.write_timestep(format_time(seconds), convert(elements))
+
+    def uav_entries(self) -> List[Entry]:
+        """
+        Retorna as entradas dos drones (veículos do tipo "VANT"), na ordem dos veículos.
+
+        Retorna:
+        - List[Entry]: Entradas dos drones.
+        """
+        vehicles = self.vehicleList
+        return [entry for entry in vehicles.entries() if vehicles.entry_info(entry)[1] == "VANT"]
+
+    def sample_seconds(self, times: np.ndarray) -> np.ndarray:
+        """
+        Converte os intervalos de tempo das amostras para o tempo, em segundos, do timestep em que
+        são gravadas na exportação XML: o intervalo k é gravado no timestep de chave k + 1 (ver
+        export_timesteps_to_xml), então os drones, cujas amostras começam no intervalo 0, começam
+        no primeiro timestep. As demais exportações usam a mesma correspondência.
+
+        Parâmetros:
+        - times (np.ndarray): Intervalos de tempo das amostras.
+
+        Retorna:
+        - np.ndarray: Tempos em segundos.
+        """
+        return self.base.time_grid.seconds(times + 1)
+
+    def last_sample_key(self) -> int:
+        """
+        Retorna o último intervalo de tempo das amostras exportadas: o XML grava os timesteps de
+        chave 1 a timestep_total, com as amostras dos intervalos 0 a timestep_total - 1 (ver
+        sample_seconds). As demais exportações usam o mesmo limite, para terminar no mesmo timestep.
+
+        Retorna:
+        - int: Último intervalo de tempo exportado.
+        """
+        return self.timestep_total - 1
+
+    def element_converter(self, geo: int) -> Callable[[List[Tuple[str, Dict[str, str]]]], List[Tuple[str, Dict[str, str]]]]:
+        """
+        Retorna a conversão das coordenadas dos elementos de um timestep usada na exportação XML.
+
+        Parâmetros:
+        - geo (int): 1 mantém as coordenadas geográficas; 0 e 2 convertem para metros (ver coordinate_projection).
+
+        Retorna:
+        - Callable: Função que recebe e retorna os elementos de um timestep como (tag, atributos).
+        """
+        if geo not in (0, 2):
+            return lambda elements: elements
+        project = self.coordinate_projection(geo)
+        return lambda elements: project_elements(elements, project)
+
+    def cartesian_origin(self, kinds: Tuple[str, ...] = ("vehicle",)) -> Tuple[float, float]:
+        """
+        Retorna a origem da conversão para coordenadas Cartesianas (geo = 0): a menor longitude
+        e a menor latitude entre as amostras dos elementos exportados, isto é, até last_sample_key
+        (a mesma origem que convert_coordinates calcularia sobre o XML exportado).
+
+        Parâmetros:
+        - kinds (Tuple[str, ...]): Tags dos elementos convertidos (no XML, apenas <vehicle>).
+
+        Retorna:
+        - Tuple[float, float]: Longitude e latitude mínimas.
+        """
+        vehicles = self.vehicleList
+        last_key = self.last_sample_key()
+        min_lon = min_lat = float("inf")
+        for entry in vehicles.entries():
+            if vehicles.entry_info(entry)[2] not in kinds:
+                continue  # Ex.: pessoas e contêineres não são convertidos no XML
+            x, y = vehicles.entry_min_position(entry, last_key)
+            min_lon = min(min_lon, x)
+            min_lat = min(min_lat, y)
+        return min_lon, min_lat
+
+    def coordinate_projection(
+        self, geo: int, kinds: Tuple[str, ...] = ("vehicle",)
+    ) -> Callable[[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]]:
+        """
+        Retorna a conversão de coordenadas geográficas para metros usada nas exportações.
+
+        Parâmetros:
+        - geo (int): 0 para coordenadas Cartesianas a partir dos valores mínimos, 2 para UTM na zona da menor longitude.
+        - kinds (Tuple[str, ...]): Tags dos elementos convertidos, usadas para calcular a origem (ou a zona).
+
+        Retorna:
+        - Callable: Função que recebe arrays de latitudes e longitudes e retorna arrays de x e y em metros.
+        """
+        min_lon, min_lat = self.cartesian_origin(kinds)
+        if geo == 2:
+            # Uma única zona para todo o arquivo, para que as coordenadas sejam contínuas
+            zone = longitude_to_utm_zone(min_lon) if math.isfinite(min_lon) else 1  # Sem veículos: nada é convertido
+            return lambda lat, lon: latlon_to_utm_array(lat, lon, zone)
+        return lambda lat, lon: latlon_to_xy_array(lat, lon, min_lat, min_lon)
+
+    def export_to_ns2(self, ns2_path: str, nodes_path: Optional[str] = None, geo: int = 0, only_vants: int = 0):
+        """
+        Exporta a mobilidade dos veículos para um arquivo TCL do ns-2 (ver Ns2Writer), que o ns-3
+        lê com o Ns2MobilityHelper, sem passar pelo XML.
+
+        Os nós são numerados na ordem dos veículos da simulação (os sem amostras são ignorados), de
+        modo que a numeração é a mesma a cada exportação do mesmo cenário. As posições são lidas
+        diretamente das amostras em memória, um veículo por vez, e a velocidade de cada setdest é a
+        necessária para chegar à amostra seguinte no tempo dela. Os tempos são os da exportação XML
+        (ver sample_seconds).
+
+        Com only_vants = 1, apenas os drones são gravados, com os mesmos números de nó da exportação
+        completa: o arquivo serve de sobreposição a um arquivo com os veículos do mesmo cenário.
+
+        Parâmetros:
+        - ns2_path (str): Caminho do arquivo TCL de saída.
+        - nodes_path (Optional[str]): Caminho do CSV com o número, o ID e o tipo de cada nó gravado. Se None, não é gravado.
+        - geo (int): 0 para coordenadas Cartesianas a partir dos valores mínimos, 2 para UTM.
+        - only_vants (int): Se 1, grava apenas os drones (veículos do tipo "VANT").
+
+        Lança:
+        - ValueError: Se geo não for 0 nem 2 (o ns-2 usa coordenadas em metros).
+        """
+        if geo not in (0, 2):
+            raise ValueError("ns-2 export needs coordinates in meters (geo = 0 or 2).")
+        if self.following:
+            self.follow_trace()
+        vehicles = self.vehicleList
+        project = self.coordinate_projection(geo, ELEMENT_KINDS)
+        last_key = self.last_sample_key()
+        node = -1
+        nodes: List[Tuple[int, str, str]] = []
+
+        with Ns2Writer(ns2_path) as writer:
+            for entry in vehicles.entries():
+                # A numeração considera todos os veículos, mesmo os que não são gravados
+                time_range = vehicles.entry_time_range(entry)
+                if time_range is None or time_range[1] < 0 or time_range[0] > last_key:
+                    continue
+                node += 1
+                vehicle_id, vehicle_type, _ = vehicles.entry_info(entry)
+                if only_vants == 1 and vehicle_type != "VANT":
+                    continue
+                positions = [position for position in vehicles.entry_positions(entry) if 0 <= position[0] <= last_key]
+                if not positions:
+                    continue
+                nodes.append((node, vehicle_id, vehicle_type))
+
+                times, lon, lat = (np.array(column, dtype=np.float64) for column in zip(*positions))
+                x, y = project(lat, lon)
+                seconds = self.sample_seconds(times)
+                speeds = np.hypot(np.diff(x), np.diff(y)) / np.diff(seconds)
+                x_text, y_text = format_meters(x), format_meters(y)
+                writer.write_initial_position(node, x_text[0], y_text[0])
+                writer.write_setdests(
+                    node, list(zip(format_seconds(seconds[:-1].tolist()), x_text[1:], y_text[1:], format_meters(speeds)))
+                )
+
+        if nodes_path is not None:
+            with open(nodes_path, "w", newline="", encoding="utf-8") as nodes_file:
+                csv_writer = csv.writer(nodes_file)
+                csv_writer.writerow(["node", "id", "type"])
+                csv_writer.writerows(nodes)
+
+    def export_to_arrays(self, directory: str):
+        """
+        Exporta as amostras de todos os veículos como um pacote de arrays NumPy (ver write_array_bundle),
+        que pode ser aberto instantaneamente com np.load(..., mmap_mode="r") ou load_array_bundle, sem parsear o XML.
+
+        Cada linha é uma amostra, ordenada por veículo e, dentro de cada veículo, por tempo. O meta.json
+        traz as tabelas dos códigos: "ids" e "kinds" (ID e tag de cada índice de veículo), "types" (nome
+        de cada código de tipo) e "vehicle_types" (código do tipo de cada veículo). As coordenadas são as
+        geográficas e os tempos, em segundos, são os da exportação XML (ver sample_seconds).
+
+        Parâmetros:
+        - directory (str): Diretório de saída.
+        """
+        if self.following:
+            self.follow_trace()
+        vehicles = self.vehicleList
+        entries = vehicles.entries()
+        infos = [vehicles.entry_info(entry) for entry in entries]
+        types = list(dict.fromkeys(vehicle_type for _, vehicle_type, _ in infos))
+        type_codes = {vehicle_type: code for code, vehicle_type in enumerate(types)}
+        vehicle_types = [type_codes[vehicle_type] for _, vehicle_type, _ in infos]
+        last_key = self.last_sample_key()
+
+        def chunks():
+            for index, entry in enumerate(entries):
+                samples = vehicles.entry_samples(entry, last_key)
+                size = len(samples["time"])
+                samples["time"] = self.sample_seconds(samples["time"])
+                samples["vehicle"] = np.full(size, index, dtype=np.int32)
+                samples["type"] = np.full(size, vehicle_types[index], dtype=np.int32)
+                yield samples
+
+        # Os arquivos são criados com o tamanho final, então as amostras são contadas antes
+        rows = sum(len(vehicles.entry_samples(entry, last_key)["time"]) for entry in entries)
+        write_array_bundle(
+            directory,
+            rows,
+            chunks(),
+            {
+                "ids": [vehicle_id for vehicle_id, _, _ in infos],
+                "kinds": [kind for _, _, kind in infos],
+                "types": types,
+                "vehicle_types": vehicle_types,
+            },
+        )
+
+    def timestep_elements(self, time_key: int, entries: Optional[List[Entry]] = None) -> List[Tuple[str, Dict[str, str]]]:
+        """
+        Retorna os elementos do FCD de todos os veículos presentes em um intervalo de tempo.
+
+        Parâmetros:
+        - time_key (int): Intervalo de tempo.
+        - entries (Optional[List[Entry]]): Entradas consideradas (ex.: só os drones). Se None, todos os veículos ativos.
+
+        Retorna:
+        - List[Tuple[str, Dict[str, str]]]: Elementos como (tag, atributos), na ordem dos veículos da simulação.
+        """
+        elements = []
+        vehicles = self.vehicleList
+        if entries is None:
+            entries = vehicles.active_entries(time_key)
+        for entry in entries:
+            timestep_vehicle = vehicles.entry_timestep(entry, time_key)
+            if timestep_vehicle is not None:
+                vehicle_id, vehicle_type, kind = vehicles.entry_info(entry)
+                attributes = {
+                    "id": vehicle_id,
+                    "x": str(timestep_vehicle.x()),
+                    "y": str(timestep_vehicle.y()),
+                    "angle": str(timestep_vehicle.angle()),
+                    "type": vehicle_type,
+                    "speed": str(timestep_vehicle.speed()),
+                    "pos": str(timestep_vehicle.pos()),
+                    "lane": timestep_vehicle.lane(),
+                    "slope": str(timestep_vehicle.slope()),
+                }
+                if kind != "vehicle":
+                    # Pessoas e contêineres têm aresta em vez de faixa e só têm tipo se declarado
+                    attributes["edge"] = attributes.pop("lane")
+                    attributes["slope"] = attributes.pop("slope")
+                    if attributes["type"] == kind:
+                        del attributes["type"]
+                elements.append((kind, attributes))
+        return elements
+
+    def follow_trace(self, new_xml_path: Optional[str] = None):
+        """
+        Acompanha o arquivo de traços enquanto o SUMO ainda o escreve (modo follow).
+
+        A cada lote de timesteps recebido, os veículos são adicionados, as trajetórias dos drones
+        são refeitas até o novo total de intervalos de tempo e, se new_xml_path for informado, os
+        timesteps do lote são gravados no XML de saída, que pode ser lido por outro processo
+        (ex.: o ns-3) enquanto ainda cresce. Um drone seguidor só aparece nos timesteps já
+        exportados a partir do momento em que o veículo seguido surge no arquivo.
+
+        Como em export_timesteps_to_xml, a saída usa a raiz do arquivo de origem e os elementos não
+        carregados na simulação (ex.: pessoas e contêineres) são copiados como estão no arquivo.
+
+        Parâmetros:
+        - new_xml_path (Optional[str]): Caminho do XML de saída. Se None, apenas carrega os traços.
+        """
+        exporting = new_xml_path is not None
+        writer: Optional[TraceWriter] = None
+        # Timesteps recebidos e ainda não exportados, com os elementos não carregados na simulação
+        pending: List[Tuple[str, int, List[Tuple[str, Dict[str, str]]]]] = []
+
+        def export_pending():
+            nonlocal writer
+            self.refresh_drones()
+            if exporting:
+                if writer is None:
+                    # A raiz só é lida quando o arquivo de origem já existe (ver follow_timesteps)
+                    root_tag = read_root_tag(self.base.trace_path) if os.path.exists(self.base.trace_path) else "<fcd-export>"
+                    writer = TraceWriter(new_xml_path, root_tag)
+                for time_instant, time_key, others in pending:
+                    writer.write_timestep(time_instant, others + self.timestep_elements(time_key - 1))
+                writer.flush()
+            pending.clear()
+
+        anchored = self.base.begin is None  # Sem begin, a grade começa em 0
+        kinds, bbox = self.base.kinds, self.base.bbox
+        try:
+            # Na exportação todos os elementos são lidos; os não carregados são apenas copiados
+            timesteps = follow_timesteps(
+                self.base.trace_path, self.poll_interval, self.idle_timeout, self.base.begin, self.base.end,
+                None if exporting else bbox, None if exporting else kinds,
+            )
+            try:
+                for timestep in timesteps:
+                    if timestep is None:
+                        export_pending()  # Dados disponíveis esgotados: exporta o lote recebido
+                        continue
+                    timeInstant, elements = timestep
+                    others: List[Tuple[str, Dict[str, str]]] = []
+                    if exporting:
+                        others = [(tag, data) for tag, data in elements if tag not in kinds]
+                        elements = [
+                            (tag, data) for tag, data in elements
+                            if tag in kinds and (bbox is None or in_bbox(data, bbox))
+                        ]
+                    if not anchored:
+                        # A grade começa no primeiro timestep recebido (ver TraceBase)
+                        self.base.time_grid.origin = float(timeInstant)
+                        anchored = True
+                    timeKey = self.base.time_grid.key(timeInstant)
+                    if timeKey is None:
+                        continue  # Passo descartado pela dizimação
+                    self.add_timestep_elements(timeKey, elements)
+                    self.timestep_total = timeKey
+                    pending.append((timeInstant, timeKey, others))
+            except TimeoutError as error:
+                print(f"Stopped following the trace: {error}")
+            export_pending()
+        finally:
+            if writer is not None:
+                writer.close()
+        self.following = False
+
+    def add_drone(self, drone_id: str, build_drone: Callable[[int], Vehicle]):
+        """
+        Adiciona um drone à simulação. A função que gera o drone é guardada para que a sua
+        trajetória possa ser estendida quando o total de intervalos de tempo mudar (ver refresh_drones).
+
+        Parâmetros:
+        - drone_id (str): ID do drone.
+        - build_drone (Callable[[int], Vehicle]): Função que gera o drone até um total de intervalos de tempo
+          (ex.: DroneBuilder.build, que continua do último intervalo gerado).
+        """
+        self.droneBuilders[drone_id] = build_drone
+        self.vehicleList[drone_id] = build_drone(self.timestep_total)
+
+    def refresh_drones(self):
+        """
+        Estende a trajetória de todos os drones até o total atual de intervalos de tempo. Cada
+        drone continua do último intervalo que gerou, sem refazer os anteriores.
+        """
+        for drone_id, build_drone in self.droneBuilders.items():
+            self.vehicleList[drone_id] = build_drone(self.timestep_total)
 
     def create_drone_angular(
         self, start_point: Tuple[float, float], max_length: float, start_angle: int = 0, max_turns: int = 3, angle_alpha: int = 30, max_speed: float = 10
@@ -199,17 +800,19 @@ class Simulation:
             angle_list.append(180 + start_angle + angle_alpha)
             distance_list.append(max_length)
 
-        drone = create_drone_generic_pattern(
-            self.timestep_total,
-            f"drone{self.droneNumber}",
-            start_point,
-            distance_list,
-            angle_list,
-            max_speed,
+        drone_id = f"drone{self.droneNumber}"
+        self.add_drone(
+            drone_id,
+            PatternDroneBuilder(
+                drone_id,
+                start_point,
+                distance_list,
+                angle_list,
+                max_speed,
+                self.base.time_grid.sample_interval(),
+            ).build,
         )
 
-        self.vehicleList[f"drone{self.droneNumber}"] = drone
-
     def create_drone_static(self, point: Tuple[float, float]):
         """
         Cria um drone estacionário em um ponto específico.
@@ -219,11 +822,8 @@ class Simulation:
         """
         self.droneNumber += 1
 
-        drone = create_drone_static_point(
-            self.timestep_total, f"drone{self.droneNumber}", point
-        )
-
-        self.vehicleList[f"drone{self.droneNumber}"] = drone
+        drone_id = f"drone{self.droneNumber}"
+        self.add_drone(drone_id, StaticDroneBuilder(drone_id, point).build)
 
     def create_drone_following(self, vehicle_id: str, offset_distance: float, max_speed: float = 10):
         """
@@ -237,22 +837,24 @@ class Simulation:
         Lança:
         - ValueError: Se o ID do veículo não for encontrado.
         """
-        if vehicle_id not in self.vehicleList.keys():
+        # No modo follow o veículo pode ainda não ter aparecido no arquivo
+        if vehicle_id not in self.vehicleList.keys() and not self.following:
             raise ValueError("ID not found in simulation.")
-        vehicle = self.vehicleList[vehicle_id]
 
         self.droneNumber += 1
 
-        drone = create_drone_following_object(
-            self.timestep_total,
-            f"drone{self.droneNumber}",
-            vehicle,
-            offset_distance,
-            max_speed=max_speed,
+        drone_id = f"drone{self.droneNumber}"
+        self.add_drone(
+            drone_id,
+            FollowingDroneBuilder(
+                drone_id,
+                lambda: self.vehicleList.get(vehicle_id, Vehicle(vehicle_id, "")),
+                offset_distance,
+                max_speed=max_speed,
+                sample_interval=self.base.time_grid.sample_interval(),
+            ).build,
         )
 
-        self.vehicleList[f"drone{self.droneNumber}"] = drone
-
     def create_drone_tractor(
         self,
         start_point: Tuple[float, float],
@@ -307,17 +909,19 @@ class Simulation:
             angle_list.append(180 + start_angle)
             distance_list.append(width_between_tracks)
 
-        drone = create_drone_generic_pattern(
-            self.timestep_total,
-            f"drone{self.droneNumber}",
-            start_point,
-            distance_list,
-            angle_list,
-            max_speed,
+        drone_id = f"drone{self.droneNumber}"
+        self.add_drone(
+            drone_id,
+            PatternDroneBuilder(
+                drone_id,
+                start_point,
+                distance_list,
+                angle_list,
+                max_speed,
+                self.base.time_grid.sample_interval(),
+            ).build,
         )
 
-        self.vehicleList[f"drone{self.droneNumber}"] = drone
-
     def create_drone_circular(self, center: Tuple[float, float], radius_meters: float, max_speed: float = 10, start_angle: int = 0):
         """
         Cria um drone com um padrão de movimento circular.
@@ -330,6 +934,7 @@ class Simulation:
         """
         self.droneNumber += 1
         omega = max_speed / radius_meters  # Velocidade angular em radianos por segundo
+        sample_interval = self.base.time_grid.sample_interval()  # Segundos entre amostras
 
         # Calcula a posição inicial com base no ângulo inicial
         start_point = (
@@ -342,24 +947,26 @@ class Simulation:
         angle_list = []
 
         # Número de passos para completar um círculo
-        steps_per_circle = int((2 * math.pi) / omega)
+        steps_per_circle = int((2 * math.pi) / (omega * sample_interval))
 
         for i in range(steps_per_circle):
-            theta_i = math.radians(start_angle) + omega * i  # Ângulo atual em radianos
+            theta_i = math.radians(start_angle) + omega * sample_interval * i  # Ângulo atual em radianos
             angle_list.append(math.degrees(theta_i))  # Armazena ângulos em graus
-            distance_list.append(max_speed)  # Distância percorrida em cada passo
-
-        drone = create_drone_generic_pattern(
-            self.timestep_total,
-            f"drone{self.droneNumber}",
-            start_point,
-            distance_list,
-            angle_list,
-            max_speed,
+            distance_list.append(max_speed * sample_interval)  # Distância percorrida em cada passo
+
+        drone_id = f"drone{self.droneNumber}"
+        self.add_drone(
+            drone_id,
+            PatternDroneBuilder(
+                drone_id,
+                start_point,
+                distance_list,
+                angle_list,
+                max_speed,
+                sample_interval,
+            ).build,
         )
 
-        self.vehicleList[f"drone{self.droneNumber}"] = drone
-
     def create_drone_square(
         self, center_point: Tuple[float, float], side_length: float, angle_degrees: int = 90, max_speed: float = 10
     ):
@@ -400,17 +1007,19 @@ class Simulation:
             ),
         )
 
-        drone = create_drone_generic_pattern(
-            self.timestep_total,
-            f"drone{self.droneNumber}",
-            start_point,
-            distance_list,
-            angle_list,
-            max_speed,
+        drone_id = f"drone{self.droneNumber}"
+        self.add_drone(
+            drone_id,
+            PatternDroneBuilder(
+                drone_id,
+                start_point,
+                distance_list,
+                angle_list,
+                max_speed,
+                self.base.time_grid.sample_interval(),
+            ).build,
         )
 
-        self.vehicleList[f"drone{self.droneNumber}"] = drone
-
     def create_drone_generic(
         self, start_point: Tuple[float, float], distance_lists: List[float], angles_list: List[float], max_speed: float = 10
     ):
@@ -425,17 +1034,19 @@ class Simulation:
         """
         self.droneNumber += 1
 
-        drone = create_drone_generic_pattern(
-            self.timestep_total,
-            f"drone{self.droneNumber}",
-            start_point,
-            distance_lists,
-            angles_list,
-            max_speed,
+        drone_id = f"drone{self.droneNumber}"
+        self.add_drone(
+            drone_id,
+            PatternDroneBuilder(
+                drone_id,
+                start_point,
+                distance_lists,
+                angles_list,
+                max_speed,
+                self.base.time_grid.sample_interval(),
+            ).build,
         )
 
-        self.vehicleList[f"drone{self.droneNumber}"] = drone
-
     def addVehicle(self, vehicle: Vehicle):
         """
         Adiciona um veículo à simulação.
@@ -446,13 +1057,13 @@ class Simulation:
         Lança:
         - ValueError: Se o ID do veículo já existir.
         """
-        if vehicle.id() in self.vehicleList.keys():
+        if vehicle.key() in self.vehicleList.keys():
             raise ValueError("ID already exists.")
         else:
-            self.vehicleList[vehicle.id()] = vehicle
+            self.vehicleList[vehicle.key()] = vehicle
             if vehicle.type() not in self.typeList:
                 self.typeList[vehicle.type()] = vehicle.type()
-
+    
     def removeVehicle(self, vehicleId: str):
         """
         Remove um veículo da simulação.
@@ -467,7 +1078,8 @@ class Simulation:
             raise ValueError("ID doesn't exists.")
         else:
             del self.vehicleList[vehicleId]
-
+            self.droneBuilders.pop(vehicleId, None)
+    
     def changeLegend(self, oldLegend: str, newLegend: str):
         """
         Altera a legenda de um tipo de veículo.
@@ -533,15 +1145,34 @@ class Simulation:
         """
         names = list(self.typeList.keys())
         vector_coordinates = [[] for _ in names]
-        for vehicle_id in self.vehicleList.keys():
-            coordinates = []
-            vehicle_object = self.vehicleList[vehicle_id]
-            for i in range(int(float(self.timestep_total) + 1)):
-                timestep = vehicle_object.get_timestep(i)
-                if timestep is None:
-                    coordinates.append((0, 0))
-                else:
-                    coordinates.append((timestep.x(), timestep.y()))
-            index_in_vector_coordinates = names.index(vehicle_object.type())
+        total = int(float(self.timestep_total))
+        vehicles = self.vehicleList
+        for entry in vehicles.entries():
+            coordinates = [(0, 0)] * (total + 1)
+            # Só as amostras do veículo são percorridas, lidas diretamente das colunas quando possível
+            for time, x, y in vehicles.entry_positions(entry):
+                if 0 <= time <= total:
+                    coordinates[time] = (x, y)
+            index_in_vector_coordinates = names.index(vehicles.entry_info(entry)[1])
             vector_coordinates[index_in_vector_coordinates].append(coordinates)
-        return vector_coordinates
\ No newline at end of file
+        return vector_coordinates
+
+
+# Simulação e conversão da exportação em paralelo atual, herdadas pelos processos criados com fork
+_export_simulation: Optional[Simulation] = None
+_export_convert: Optional[Callable] = None
+
+
+def _export_range(job: Tuple[str, int, int]):
+    """
+    Tarefa executada em cada processo: grava num fragmento os timesteps de um intervalo de bytes do arquivo de origem.
+
+    Parâmetros:
+    - job (Tuple[str, int, int]): Caminho do fragmento, byte inicial e byte final do intervalo.
+    """
+    part_path, start, end = job
+    simulation = _export_simulation
+    timesteps = iter_timesteps_in_range(simulation.base.trace_path, start, end, kinds=None)
+    with TraceWriter(part_path, fragment=True) as writer:
+        for time_instant, elements in simulation.export_timesteps(timesteps, _export_convert):
+            writer.write_timestep(time_instant, elements)
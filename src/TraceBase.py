@@ -0,0 +1,304 @@
+import multiprocessing
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+from src.FleetStore import SAMPLE_COLUMNS, FleetStore
+from src.Vehicle import ELEMENT_KINDS
+from src.utils.traceReader import (
+    BoundingBox,
+    TimeGrid,
+    detect_step_length,
+    first_timestep_time,
+    is_compressed,
+    iter_timesteps,
+    merge_timesteps,
+    shard_prefix,
+)
+from src.utils.traceCache import load_trace_cache, save_trace_cache
+from src.utils.fcdScanner import FastScanError, scan_fcd_columns
+from src.utils.traceColumns import read_columns_parallel, timesteps_to_columns
+
+
+class TraceBase:
+    """
+    Traços do SUMO carregados de um ou mais arquivos, compartilhados (e nunca alterados) pelas simulações.
+
+    Cada Simulation criada a partir de uma base guarda apenas as suas alterações (drones adicionados,
+    veículos removidos, legendas; ver VehicleMap), de modo que vários cenários sobre o mesmo tráfego
+    não precisam reler nem copiar os veículos. Os arrays do FleetStore ficam somente leitura e os
+    índices compartilhados são construídos no carregamento, para que processos criados com fork
+    (ver run_scenarios) compartilhem a base por cópia na escrita.
+    """
+
+    def __init__(
+        self,
+        trace_path: Union[str, List[str]],
+        use_cache: bool = True,
+        workers: int = 1,
+        begin: Optional[float] = None,
+        end: Optional[float] = None,
+        bbox: Optional[BoundingBox] = None,
+        fast_scan: bool = False,
+        step_length: Optional[float] = None,
+        decimate: int = 1,
+        include_persons: bool = False,
+        follow: bool = False,
+        precision: str = "float64",
+    ):
+        """
+        Carrega os traços da simulação.
+
+        No modo follow nada é carregado: o arquivo é lido por cada simulação em follow_trace.
+
+        Parâmetros:
+        - trace_path (Union[str, List[str]]): Caminho do arquivo XML contendo os traços da simulação, ou
+          lista de arquivos gerados por várias instâncias do SUMO, mesclados por timestep (ver read_xml_merged).
+        - use_cache (bool): Se True, usa (e mantém atualizado) o cache binário do arquivo de traços.
+        - workers (int): Número de processos usados para ler o XML. Se 1, a leitura é sequencial.
+        - begin (Optional[float]): Tempo inicial da janela lida do arquivo. Se None, lê desde o início.
+        - end (Optional[float]): Tempo final da janela lida do arquivo. Se None, lê até o fim.
+        - bbox (Optional[BoundingBox]): Caixa (lon mínima, lat mínima, lon máxima, lat máxima) dos veículos lidos.
+        - fast_scan (bool): Se True, tenta primeiro o leitor rápido do formato regular do fcd-export.
+        - step_length (Optional[float]): Passo da simulação do SUMO em segundos. Se None, é detectado no arquivo.
+        - decimate (int): Mantém apenas um a cada `decimate` passos do arquivo.
+        - include_persons (bool): Se True, também carrega os elementos <person> e <container> do arquivo.
+        - follow (bool): Se True, o arquivo ainda está sendo escrito pelo SUMO e é lido incrementalmente
+          por Simulation.follow_trace, em vez de ser carregado agora. Nesse modo step_length padrão é 1 segundo.
+        - precision (str): Precisão das trajetórias lidas do arquivo ("float64" ou "float32"; ver FleetStore).
+
+        Lança:
+        - ValueError: Se o modo follow for usado com vários arquivos.
+        """
+        self.trace_paths: List[str] = [trace_path] if isinstance(trace_path, str) else list(trace_path)
+        self.trace_path: str = self.trace_paths[0]  # Caminho do arquivo XML (o primeiro, se houver vários)
+        self.fleet: Optional[FleetStore] = None  # Amostras dos veículos lidos do arquivo, em colunas
+        self.precision: str = precision  # Precisão das amostras guardadas no FleetStore
+        self.types: List[str] = []  # Tipos dos veículos lidos, na ordem em que aparecem
+        self.timestep_total: int = 0  # Total de intervalos de tempo
+        # Tempos e chaves dos timesteps lidos ao mesclar vários arquivos (usados na exportação)
+        self.merged_timesteps: List[Tuple[str, int]] = []
+        self.use_cache: bool = use_cache  # Define se o cache binário deve ser usado
+        self.workers: int = workers  # Número de processos para a leitura do XML
+        self.begin: Optional[float] = begin  # Início da janela de tempo lida
+        self.end: Optional[float] = end  # Fim da janela de tempo lida
+        self.bbox: Optional[BoundingBox] = bbox  # Caixa delimitadora dos veículos lidos
+        self.fast_scan: bool = fast_scan  # Define se o leitor rápido deve ser tentado
+        self.follow: bool = follow  # Define se o arquivo ainda está sendo escrito (modo follow)
+        if step_length is None:
+            # No modo follow o arquivo pode ainda não ter dois timesteps
+            step_length = 1.0 if follow else detect_step_length(self.trace_path)
+        self.step_length: float = step_length  # Passo da simulação do SUMO, em segundos
+        self.decimate: int = decimate  # Mantém um a cada `decimate` passos
+        # A grade começa no primeiro timestep lido (o primeiro a partir de begin), para que um begin
+        # fora da grade do arquivo não desloque os passos. No modo follow o arquivo pode ainda não ter
+        # esse timestep, então a origem é ajustada ao recebê-lo (ver Simulation.follow_trace).
+        origin = 0.0
+        if begin is not None:
+            origin = begin
+            if not follow:
+                first_times = [first_timestep_time(path, begin) for path in self.trace_paths]
+                first_times = [time for time in first_times if time is not None]
+                if first_times:
+                    origin = min(first_times)
+        self.time_grid: TimeGrid = TimeGrid(origin, step_length, decimate)
+        # Tags dos elementos do FCD carregados em cada timestep
+        self.kinds: Tuple[str, ...] = ELEMENT_KINDS if include_persons else ("vehicle",)
+        if follow and len(self.trace_paths) > 1:
+            raise ValueError("Follow mode reads a single trace file.")
+        if len(self.trace_paths) > 1:
+            self.read_xml_merged(self.trace_paths)  # Mescla os arquivos (sem cache)
+        elif not follow:
+            self.load_trace(self.trace_path)  # Lê o arquivo XML (ou o seu cache)
+        if self.fleet is not None:
+            self.freeze()
+
+    def load_trace(self, trace_path: str):
+        """
+        Carrega os traços da simulação, usando o cache binário ao lado do arquivo quando ele
+        estiver atualizado. Caso contrário, lê o XML e regrava o cache.
+
+        Parâmetros:
+        - trace_path (str): Caminho do arquivo XML.
+        """
+        # Opções de leitura que invalidam o cache
+        options = {
+            "begin": self.begin,
+            "end": self.end,
+            "bbox": self.bbox,
+            "step_length": self.step_length,
+            "decimate": self.decimate,
+            "kinds": list(self.kinds),
+            "precision": self.precision,
+        }
+        if self.use_cache:
+            cached = load_trace_cache(trace_path, options)
+            if cached is not None:
+                columns, meta = cached
+                self.add_columns(columns)
+                self.timestep_total = meta["timestep_total"]
+                return
+
+        # Arquivos compactados não permitem acesso por posição, então são lidos sequencialmente
+        if self.fast_scan and self.read_xml_fast(trace_path):
+            pass
+        elif self.workers > 1 and not is_compressed(trace_path):
+            self.read_xml_parallel(trace_path, self.workers)
+        else:
+            self.read_xml(trace_path)
+        if self.use_cache:
+            save_trace_cache(
+                trace_path,
+                options,
+                self.fleet.to_columns(),
+                {"timestep_total": self.timestep_total},
+            )
+
+    def read_xml(self, trace_path: str):
+        """
+        Lê o arquivo XML e popula a lista de veículos.
+        A leitura é feita em streaming, um timestep por vez, sem carregar a árvore XML inteira,
+        e as amostras vão direto para a representação colunar.
+        Pessoas e contêineres (se carregados) usam a aresta no lugar da faixa.
+
+        Parâmetros:
+        - trace_path (str): Caminho do arquivo XML.
+        """
+        timesteps = iter_timesteps(trace_path, self.begin, self.end, self.bbox, self.kinds)
+        self.add_loaded_columns(*timesteps_to_columns(timesteps, self.time_grid))
+
+    def read_xml_merged(self, trace_paths: List[str]):
+        """
+        Lê vários arquivos XML de traços, gerados por instâncias diferentes do SUMO, mesclando-os
+        por timestep em streaming, sem gravar um arquivo mesclado intermediário.
+
+        Os IDs dos elementos de cada arquivo recebem o prefixo do arquivo (ver shard_prefix),
+        de modo que IDs repetidos entre arquivos não colidem.
+
+        Parâmetros:
+        - trace_paths (List[str]): Caminhos dos arquivos XML.
+        """
+        streams = [iter_timesteps(path, self.begin, self.end, self.bbox, self.kinds) for path in trace_paths]
+        prefixes = [shard_prefix(index) for index in range(len(trace_paths))]
+
+        def timesteps():
+            for timeInstant, elements in merge_timesteps(streams, prefixes):
+                timeKey = self.time_grid.key(timeInstant)
+                if timeKey is not None:
+                    self.merged_timesteps.append((timeInstant, timeKey))
+                yield timeInstant, elements
+
+        self.add_loaded_columns(*timesteps_to_columns(timesteps(), self.time_grid))
+
+    def read_xml_fast(self, trace_path: str) -> bool:
+        """
+        Lê o arquivo XML com o leitor rápido, que converte as linhas do fcd-export diretamente em colunas.
+
+        Parâmetros:
+        - trace_path (str): Caminho do arquivo XML.
+
+        Retorna:
+        - bool: True se o arquivo foi lido; False se ele tiver linhas fora do formato esperado
+          (nesse caso nada é adicionado e o parser genérico deve ser usado).
+        """
+        try:
+            columns, last_time = scan_fcd_columns(
+                trace_path, self.begin, self.end, self.bbox, self.time_grid, self.kinds
+            )
+        except FastScanError as error:
+            print(f"Fast scanner fell back to the XML parser: {error}")
+            return False
+        self.add_loaded_columns(columns, last_time)
+        return True
+
+    def read_xml_parallel(self, trace_path: str, workers: int):
+        """
+        Lê o arquivo XML em paralelo, dividindo-o nas fronteiras dos timesteps entre vários processos.
+
+        Parâmetros:
+        - trace_path (str): Caminho do arquivo XML.
+        - workers (int): Número de processos.
+        """
+        columns, last_time = read_columns_parallel(
+            trace_path, workers, self.begin, self.end, self.bbox, self.time_grid, self.kinds
+        )
+        self.add_loaded_columns(columns, last_time)
+
+    def add_loaded_columns(self, columns: Dict, last_time: Optional[str]):
+        """
+        Adiciona à base as colunas lidas do arquivo e atualiza o total de intervalos de tempo.
+
+        Parâmetros:
+        - columns (Dict[str, np.ndarray]): Dicionário de colunas.
+        - last_time (Optional[str]): Tempo do último timestep lido, ou None se nenhum foi lido.
+        """
+        self.add_columns(columns)
+        if last_time is not None:
+            self.timestep_total = self.time_grid.key(last_time) - 1
+        self.timestep_total += 1
+
+    def add_columns(self, columns: Dict):
+        """
+        Guarda os veículos de uma representação colunar (ver src.utils.traceColumns) num FleetStore.
+
+        Parâmetros:
+        - columns (Dict[str, np.ndarray]): Dicionário de colunas.
+        """
+        self.fleet = FleetStore(columns, self.precision)
+        self.types = list(dict.fromkeys(self.fleet.types))
+
+    def freeze(self):
+        """
+        Torna os arrays do FleetStore somente leitura e constrói os índices compartilhados
+        (chaves e veículos ativos), para que não sejam construídos de novo em cada processo.
+        """
+        for name in SAMPLE_COLUMNS:
+            getattr(self.fleet, name).setflags(write=False)
+        self.fleet.key_index()
+        self.fleet.active_index()
+
+
+# Base e cenários da execução atual de run_scenarios, herdados pelos processos criados com fork
+_scenario_base: Optional[TraceBase] = None
+_scenarios: List[Callable[[TraceBase], Any]] = []
+
+
+def _run_scenario(index: int) -> Any:
+    """
+    Tarefa executada em cada processo: roda um cenário sobre a base herdada do processo pai.
+
+    Parâmetros:
+    - index (int): Índice do cenário.
+
+    Retorna:
+    - Any: Resultado do cenário.
+    """
+    return _scenarios[index](_scenario_base)
+
+
+def run_scenarios(base: TraceBase, scenarios: List[Callable[[TraceBase], Any]], workers: int = 1) -> List[Any]:
+    """
+    Roda vários cenários sobre os mesmos traços carregados.
+
+    Cada cenário recebe a base e normalmente cria a sua própria Simulation sobre ela (ex.:
+    lambda base: Simulation(base).create_drone_static(point)). Com workers > 1 os cenários
+    rodam em processos criados com fork, que herdam a base sem copiá-la nem serializá-la:
+    como a base não é alterada, as suas páginas de memória continuam compartilhadas e a
+    memória não cresce com o número de cenários. Apenas os resultados são serializados, então
+    os cenários podem ser funções locais ou lambdas. Onde fork não existe (ex.: Windows), os
+    cenários rodam em sequência no processo atual.
+
+    Parâmetros:
+    - base (TraceBase): Traços carregados.
+    - scenarios (List[Callable[[TraceBase], Any]]): Funções que rodam cada cenário.
+    - workers (int): Número de processos.
+
+    Retorna:
+    - List[Any]: Resultado de cada cenário, na ordem recebida.
+    """
+    global _scenario_base, _scenarios
+    if workers <= 1 or len(scenarios) <= 1 or "fork" not in multiprocessing.get_all_start_methods():
+        return [scenario(base) for scenario in scenarios]
+    _scenario_base, _scenarios = base, list(scenarios)
+    try:
+        with multiprocessing.get_context("fork").Pool(min(workers, len(scenarios))) as pool:
+            return pool.map(_run_scenario, range(len(scenarios)), chunksize=1)
+    finally:
+        _scenario_base, _scenarios = None, []
@@ -1,4 +1,31 @@
-from typing import Dict, Optional
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Sequence, Tuple, Union
+from src.utils.symbolTable import SymbolTable
+
+if TYPE_CHECKING:
+    from src.FleetStore import FleetStore
+
+# Tipos de elemento do FCD do SUMO que podem ser carregados na simulação
+ELEMENT_KINDS = ("vehicle", "person", "container")
+
+
+def vehicle_key(kind: str, id: str) -> str:
+    """
+    Retorna a chave de um elemento do FCD no dicionário de veículos da simulação.
+
+    Veículos usam o próprio ID; pessoas e contêineres recebem o tipo do elemento como prefixo
+    (ex.: "person:0"), já que o SUMO permite IDs repetidos entre tipos de elemento diferentes.
+
+    Parâmetros:
+    - kind (str): Tipo do elemento ("vehicle", "person" ou "container").
+    - id (str): ID do elemento no arquivo FCD.
+
+    Retorna:
+    - str: Chave do elemento.
+    """
+    if kind == "vehicle":
+        return id
+    return f"{kind}:{id}"
+
 
 class Vehicle:
     """
@@ -7,20 +34,53 @@ class Vehicle:
     Atributos:
     - _id (str): Identificador único do veículo.
     - _type (str): Tipo do veículo.
+    - _kind (str): Tipo do elemento no FCD ("vehicle", "person" ou "container").
     - timesteps (Dict[int, Timestep]): Dicionário que armazena objetos Timestep, indexados pelo tempo (como inteiros).
+    - _store (Optional[FleetStore]): Armazenamento colunar com as amostras do veículo, se ele for uma visão sobre um.
+    - _index (int): Índice do veículo no armazenamento colunar.
+    - _lanes (Optional[SymbolTable]): Tabela de faixas dos Timesteps adicionados por add_timestep.
+    - _on_detach (Optional[Callable[[Vehicle], None]]): Chamada quando a visão deixa de usar o armazenamento colunar.
+
+    Veículos lidos de um arquivo de traços são visões sobre um FleetStore; os demais (ex.: drones)
+    guardam os seus Timesteps no dicionário `timesteps`.
     """
 
-    def __init__(self, id: str, type: str) -> None:
+    # Sem __dict__ por instância
+    __slots__ = ("_id", "_type", "_kind", "timesteps", "_store", "_index", "_lanes", "_on_detach")
+
+    def __init__(
+        self,
+        id: str,
+        type: str,
+        kind: str = "vehicle",
+        store: Optional['FleetStore'] = None,
+        index: int = -1,
+        lanes: Optional[SymbolTable] = None,
+        on_detach: Optional[Callable[['Vehicle'], None]] = None,
+    ) -> None:
         """
         Inicializa uma nova instância da classe Vehicle com o ID e tipo especificados.
 
         Parâmetros:
         - id (str): Identificador único do veículo.
         - type (str): Tipo do veículo.
-        """
+        - kind (str): Tipo do elemento no FCD ("vehicle", "person" ou "container").
+        - store (Optional[FleetStore]): Armazenamento colunar com as amostras do veículo. Se None, usa o dicionário.
+        - index (int): Índice do veículo no armazenamento colunar.
+        - lanes (Optional[SymbolTable]): Tabela de faixas compartilhada com outros veículos (ex.: a da simulação).
+          Se None, o veículo cria a sua própria tabela ao receber o primeiro Timestep.
+        - on_detach (Optional[Callable[[Vehicle], None]]): Função chamada quando uma visão passa a usar o
+          dicionário (ver add_timestep), para que o dono da visão (ex.: VehicleMap) deixe de ler o armazenamento.
+        """
+        # Nas visões, o ID e o tipo são as strings das tabelas do FleetStore, sem cópias
         self._id: str = id
         self._type: str = type
+        self._kind: str = kind
         self.timesteps: Dict[int, 'Timestep'] = {}
+        self._store: Optional['FleetStore'] = store
+        self._index: int = index
+        self._lanes: Optional[SymbolTable] = lanes
+        self._on_detach: Optional[Callable[['Vehicle'], None]] = on_detach
 
     def add_timestep(self, time: str, x: str, y: str, angle: str, speed: str, pos: str, lane: str, slope: str) -> None:
         """
@@ -37,6 +97,8 @@ class Vehicle:
         - slope (str): Inclinação da via ou do veículo.
         """
         time_int: int = int(float(time))
+        if self._lanes is None:
+            self._lanes = SymbolTable()
         timestep: 'Timestep' = Timestep(
             time_int,
             float(x),
@@ -44,9 +106,16 @@ class Vehicle:
             float(angle),
             float(speed),
             float(pos),
-            lane,
+            self._lanes.code(lane),
             float(slope),
+            self._lanes,
         )
+        if self._store is not None:
+            # Amostras adicionadas depois da leitura: o veículo passa a usar o dicionário
+            self.timesteps = {existing.time(): existing for existing in self.all_timesteps()}
+            self._store = None
+            if self._on_detach is not None:
+                self._on_detach(self)
         self.timesteps[timestep.time()] = timestep  # Adiciona um timestep indexado pelo tempo
 
     def get_timestep(self, time: int) -> Optional['Timestep']:
@@ -59,8 +128,35 @@ class Vehicle:
         Retorna:
         - Optional[Timestep]: Objeto Timestep ou None.
         """
+        if self._store is not None:
+            row = self._store.row(self._index, time)
+            return None if row is None else self._store.timestep(row)
         return self.timesteps.get(time)
 
+    def all_timesteps(self) -> List['Timestep']:
+        """
+        Retorna todos os Timesteps do veículo, em ordem de inserção (ordem de tempo, para veículos lidos do arquivo).
+
+        Retorna:
+        - List[Timestep]: Lista de objetos Timestep.
+        """
+        if self._store is not None:
+            return [self._store.timestep(row) for row in self._store.rows(self._index)]
+        return list(self.timesteps.values())
+
+    def time_range(self) -> Optional[Tuple[int, int]]:
+        """
+        Retorna o período de presença do veículo: os tempos da sua primeira e da sua última amostra.
+
+        Retorna:
+        - Optional[Tuple[int, int]]: Tempos (primeiro, último), ou None se o veículo não tiver amostras.
+        """
+        if self._store is not None:
+            return self._store.time_range(self._index)
+        if not self.timesteps:
+            return None
+        return min(self.timesteps), max(self.timesteps)
+
     def get_timestep_dict(self, time: int) -> Optional[dict]:
         """
         Retorna uma representação em dicionário do Timestep para um determinado tempo, se existir; caso contrário, retorna None.
@@ -71,8 +167,8 @@ class Vehicle:
         Retorna:
         - Optional[dict]: Dicionário com os dados do timestep ou None.
         """
-        if time in self.timesteps:
-            timestep: 'Timestep' = self.timesteps[time]
+        timestep: Optional['Timestep'] = self.get_timestep(time)
+        if timestep is not None:
             return {
                 "id": self.id(),
                 "x": timestep.x(),
@@ -92,8 +188,8 @@ class Vehicle:
         Parâmetros:
         - time (int): Tempo do timestep.
         """
-        if time in self.timesteps:
-            timestep: 'Timestep' = self.timesteps[time]
+        timestep: Optional['Timestep'] = self.get_timestep(time)
+        if timestep is not None:
             print({
                 "id": self.id(),
                 "x": timestep.x(),
@@ -115,6 +211,8 @@ class Vehicle:
         Retorna:
         - bool: True se o timestep existir; False caso contrário.
         """
+        if self._store is not None:
+            return self._store.row(self._index, time) is not None
         return time in self.timesteps
 
     def id(self) -> str:
@@ -135,6 +233,24 @@ class Vehicle:
         """
         return self._type
 
+    def kind(self) -> str:
+        """
+        Retorna o tipo do elemento no FCD ("vehicle", "person" ou "container").
+
+        Retorna:
+        - str: Tipo do elemento.
+        """
+        return self._kind
+
+    def key(self) -> str:
+        """
+        Retorna a chave do veículo no dicionário de veículos da simulação (ver vehicle_key).
+
+        Retorna:
+        - str: Chave do veículo.
+        """
+        return vehicle_key(self._kind, self._id)
+
 
 class Timestep:
     """
@@ -147,14 +263,33 @@ class Timestep:
     - _angle (float): Ângulo de orientação do veículo.
     - _speed (float): Velocidade do veículo.
     - _pos (float): Indicador de posição do veículo.
-    - _lane (str): Faixa em que o veículo está.
+    - _lane (int): Código da faixa em que o veículo está, em `_lanes`.
     - _slope (float): Inclinação da via ou do veículo.
+    - _lanes (Sequence[str]): Tabela de faixas (a de um FleetStore ou a SymbolTable de quem criou o Timestep).
     """
 
-    def __init__(self, time: int, x: float, y: float, angle: float, speed: float, pos: float, lane: str, slope: float) -> None:
+    # Sem __dict__ por instância: cada amostra carregada é um Timestep
+    __slots__ = ("_time", "_x", "_y", "_angle", "_speed", "_pos", "_lane", "_slope", "_lanes")
+
+    def __init__(
+        self,
+        time: int,
+        x: float,
+        y: float,
+        angle: float,
+        speed: float,
+        pos: float,
+        lane: Union[int, str],
+        slope: float,
+        lanes: Optional[Sequence[str]] = None,
+    ) -> None:
         """
         Inicializa um Timestep com detalhes de posição, orientação e movimento.
 
+        Por compatibilidade com a assinatura antiga, `lane` também pode ser o nome da faixa: ele é
+        codificado em `lanes`, se for uma SymbolTable, ou em uma tabela própria de um símbolo, se
+        `lanes` for omitido.
+
         Parâmetros:
         - time (int): Momento do timestep.
         - x (float): Coordenada x da posição do veículo.
@@ -162,17 +297,32 @@ class Timestep:
         - angle (float): Ângulo de orientação do veículo.
         - speed (float): Velocidade do veículo.
         - pos (float): Indicador de posição do veículo.
-        - lane (str): Faixa em que o veículo está.
+        - lane (Union[int, str]): Código da faixa em que o veículo está, em `lanes`, ou o nome da faixa.
         - slope (float): Inclinação da via ou do veículo.
-        """
+        - lanes (Optional[Sequence[str]]): Tabela de faixas; a string só é decodificada em lane().
+
+        Lança:
+        - TypeError: Se `lane` for um código sem `lanes`, ou um nome com uma tabela que não é SymbolTable.
+        """
+        if isinstance(lane, str):
+            if lanes is None:
+                lanes = (lane,)
+                lane = 0
+            elif isinstance(lanes, SymbolTable):
+                lane = lanes.code(lane)
+            else:
+                raise TypeError("A lane name can only be encoded into a SymbolTable; pass the lane code instead.")
+        elif lanes is None:
+            raise TypeError("A lane code requires the lanes table it refers to.")
         self._time: int = time
         self._x: float = x
         self._y: float = y
         self._angle: float = angle
         self._speed: float = speed
         self._pos: float = pos
-        self._lane: str = lane
+        self._lane: int = lane
         self._slope: float = slope
+        self._lanes: Sequence[str] = lanes
 
     def time(self) -> int:
         """
@@ -235,7 +385,7 @@ class Timestep:
         Retorna:
         - str: Faixa do veículo.
         """
-        return self._lane
+        return self._lanes[self._lane]
 
     def slope(self) -> float:
         """
@@ -0,0 +1,281 @@
+import numpy as np
+from typing import Dict, Iterator, List, MutableMapping, Optional, Set, Tuple, Union
+from src.FleetStore import FleetStore
+from src.Vehicle import Timestep, Vehicle
+from src.utils.activeIndex import ActiveIndex
+
+# Entrada do mapa: índice de um veículo no FleetStore (ainda não materializado ou não alterado), ou o próprio Vehicle
+Entry = Union[int, Vehicle]
+
+
+class VehicleMap(MutableMapping[str, Vehicle]):
+    """
+    Dicionário de veículos da simulação, sobreposto aos veículos de um FleetStore compartilhado.
+
+    Os veículos do FleetStore (a base, ver TraceBase) nunca são alterados: ficam apenas como
+    índices até serem acessados individualmente (ex.: getVehicleById, drone seguidor), quando a
+    visão Vehicle é criada e guardada no mapa. As alterações da simulação (veículos adicionados,
+    substituídos ou removidos) ficam na sobreposição, de modo que várias simulações podem usar a
+    mesma base. A ordem de iteração é a mesma de um dicionário comum com as mesmas inserções.
+
+    Consumidores em massa (exportação, vídeo) usam entries(), active_entries() e os métodos entry_*,
+    que leem as amostras do FleetStore sem criar um Vehicle por veículo.
+    """
+
+    def __init__(self, store: Optional[FleetStore] = None) -> None:
+        """
+        Cria o mapa com os veículos de um FleetStore, sem materializá-los.
+
+        Parâmetros:
+        - store (Optional[FleetStore]): Armazenamento colunar com os veículos da base. Se None, o mapa começa vazio.
+        """
+        self.store: Optional[FleetStore] = store
+        self._base: Dict[str, int] = store.key_index() if store is not None else {}  # Compartilhado com a base
+        self._views: Dict[str, Vehicle] = {}  # Visões já materializadas e veículos que substituem os da base
+        self._replaced: Set[str] = set()  # Chaves da base cujo veículo foi substituído
+        self._removed: Set[str] = set()  # Chaves da base removidas
+        self._hidden: Set[int] = set()  # Índices dos veículos da base removidos ou substituídos
+        self._added: Dict[str, Vehicle] = {}  # Veículos que não estão na base, em ordem de inserção
+        self._overlay_index: Optional[Tuple[List[Tuple[int, Vehicle]], ActiveIndex]] = None
+
+    def _in_base(self, key: str) -> bool:
+        return key in self._base and key not in self._removed
+
+    def __getitem__(self, key: str) -> Vehicle:
+        vehicle = self._added.get(key)
+        if vehicle is not None:
+            return vehicle
+        if not self._in_base(key):
+            raise KeyError(key)
+        vehicle = self._views.get(key)
+        if vehicle is None:
+            index = self._base[key]
+            store = self.store
+            vehicle = Vehicle(
+                store.ids[index], store.types[index], store.kinds[index], store=store, index=index, on_detach=self._detach
+            )
+            self._views[key] = vehicle
+        return vehicle
+
+    def _detach(self, vehicle: Vehicle) -> None:
+        """
+        Chamada quando uma visão materializada deixa de usar o FleetStore (ex.: getVehicleById(id).add_timestep):
+        a partir daí o veículo substitui o da base, e as entradas passam a ser o próprio Vehicle.
+
+        Parâmetros:
+        - vehicle (Vehicle): Visão que passou a usar o dicionário de Timesteps.
+        """
+        key = vehicle.key()
+        if self._views.get(key) is vehicle and self._in_base(key):
+            self._replaced.add(key)
+            self._hidden.add(self._base[key])
+            self.invalidate()
+
+    def __setitem__(self, key: str, vehicle: Vehicle) -> None:
+        if self._in_base(key):
+            # Substitui o veículo da base mantendo a sua posição, como num dicionário comum
+            self._views[key] = vehicle
+            self._replaced.add(key)
+            self._hidden.add(self._base[key])
+        else:
+            self._added[key] = vehicle
+        self.invalidate()
+
+    def __delitem__(self, key: str) -> None:
+        if key in self._added:
+            del self._added[key]
+        elif self._in_base(key):
+            self._removed.add(key)
+            self._replaced.discard(key)
+            self._views.pop(key, None)
+            self._hidden.add(self._base[key])
+        else:
+            raise KeyError(key)
+        self.invalidate()
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._added or self._in_base(key)
+
+    def __iter__(self) -> Iterator[str]:
+        if self._removed:
+            yield from (key for key in self._base if key not in self._removed)
+        else:
+            yield from self._base
+        yield from self._added
+
+    def __len__(self) -> int:
+        return len(self._base) - len(self._removed) + len(self._added)
+
+    def invalidate(self) -> None:
+        """
+        Descarta o índice de veículos ativos da sobreposição. Deve ser chamado quando as amostras
+        de um veículo adicionado mudam sem que ele seja atribuído de novo ao mapa (ex.: add_timestep).
+        """
+        self._overlay_index = None
+
+    def entries(self) -> List[Entry]:
+        """
+        Retorna as entradas do mapa, na ordem dos veículos, sem materializá-las.
+
+        Retorna:
+        - List[Entry]: Índices no FleetStore ou objetos Vehicle.
+        """
+        entries: List[Entry] = []
+        if self._hidden:
+            for key, index in self._base.items():
+                if index not in self._hidden:
+                    entries.append(index)
+                elif key in self._replaced:
+                    entries.append(self._views[key])
+        else:
+            entries.extend(range(len(self._base)))
+        entries.extend(self._added.values())
+        return entries
+
+    def active_entries(self, time: int) -> List[Entry]:
+        """
+        Retorna as entradas dos veículos ativos em um intervalo de tempo, isto é, cujo período de
+        presença (ver Vehicle.time_range) contém o intervalo, na ordem dos veículos.
+
+        Os veículos da base usam o índice compartilhado do FleetStore; os da sobreposição usam um
+        índice próprio, construído na primeira consulta depois de qualquer mudança.
+
+        Parâmetros:
+        - time (int): Intervalo de tempo.
+
+        Retorna:
+        - List[Entry]: Entradas dos veículos ativos.
+        """
+        entries: List[Entry] = []
+        if self.store is not None:
+            entries = self.store.active_index().active(time)
+            if self._hidden:
+                entries = [index for index in entries if index not in self._hidden]
+        if self._overlay_index is None:
+            # Posição de cada veículo da sobreposição na ordem do mapa: substituídos no lugar do original, adicionados no fim
+            positions = [(self._base[key], self._views[key]) for key in self._replaced]
+            positions.extend(enumerate(self._added.values(), len(self._base)))
+            positions.sort(key=lambda position: position[0])
+            self._overlay_index = (positions, ActiveIndex([vehicle.time_range() for _, vehicle in positions]))
+        positions, overlay_index = self._overlay_index
+        overlay = [positions[index] for index in overlay_index.active(time)]
+        if self._replaced:
+            # Intercala os veículos substituídos na posição dos originais
+            merged = [(index, index) for index in entries] + overlay
+            merged.sort(key=lambda position: position[0])
+            return [entry for _, entry in merged]
+        return entries + [vehicle for _, vehicle in overlay]
+
+    def entry_info(self, entry: Entry) -> Tuple[str, str, str]:
+        """
+        Retorna o ID, o tipo e a tag de uma entrada.
+
+        Parâmetros:
+        - entry (Entry): Entrada do mapa.
+
+        Retorna:
+        - Tuple[str, str, str]: ID, tipo e tag ("vehicle", "person" ou "container").
+        """
+        if isinstance(entry, int):
+            return self.store.ids[entry], self.store.types[entry], self.store.kinds[entry]
+        return entry.id(), entry.type(), entry.kind()
+
+    def entry_time_range(self, entry: Entry) -> Optional[Tuple[int, int]]:
+        """
+        Retorna o período de presença de uma entrada (ver Vehicle.time_range).
+
+        Parâmetros:
+        - entry (Entry): Entrada do mapa.
+
+        Retorna:
+        - Optional[Tuple[int, int]]: Tempos (primeiro, último), ou None se não houver amostras.
+        """
+        if isinstance(entry, int):
+            return self.store.time_range(entry)
+        return entry.time_range()
+
+    def entry_timestep(self, entry: Entry, time: int) -> Optional[Timestep]:
+        """
+        Retorna o Timestep de uma entrada em um determinado tempo (ver Vehicle.get_timestep).
+
+        Parâmetros:
+        - entry (Entry): Entrada do mapa.
+        - time (int): Tempo do timestep.
+
+        Retorna:
+        - Optional[Timestep]: Objeto Timestep ou None.
+        """
+        if isinstance(entry, int):
+            row = self.store.row(entry, time)
+            return None if row is None else self.store.timestep(row)
+        return entry.get_timestep(time)
+
+    def entry_positions(self, entry: Entry) -> List[Tuple[int, float, float]]:
+        """
+        Retorna as posições de uma entrada em todas as suas amostras.
+
+        Parâmetros:
+        - entry (Entry): Entrada do mapa.
+
+        Retorna:
+        - List[Tuple[int, float, float]]: Tuplas (tempo, x, y), em ordem de tempo.
+        """
+        if isinstance(entry, int):
+            return self.store.positions(entry)
+        # Os Timesteps de um Vehicle estão em ordem de inserção (ex.: o início do drone seguidor é preenchido depois)
+        return sorted((timestep.time(), timestep.x(), timestep.y()) for timestep in entry.all_timesteps())
+
+    def entry_min_position(self, entry: Entry, last_time: int) -> Tuple[float, float]:
+        """
+        Retorna as menores coordenadas x e y de uma entrada entre os tempos 0 e last_time.
+
+        Parâmetros:
+        - entry (Entry): Entrada do mapa.
+        - last_time (int): Último tempo considerado.
+
+        Retorna:
+        - Tuple[float, float]: Menores x e y (inf se não houver amostras).
+        """
+        if isinstance(entry, int):
+            time_range = self.store.time_range(entry)
+            if time_range is None or time_range[1] <= last_time:
+                # Todas as amostras estão no intervalo: usa os mínimos pré-calculados do FleetStore
+                min_x, min_y = self.store.min_positions()
+                return min_x[entry], min_y[entry]
+            samples = self.entry_samples(entry, last_time)
+            if not len(samples["x"]):
+                return float("inf"), float("inf")
+            return float(samples["x"].min()), float(samples["y"].min())
+        positions = [(x, y) for time, x, y in self.entry_positions(entry) if 0 <= time <= last_time]
+        return min((x for x, _ in positions), default=float("inf")), min((y for _, y in positions), default=float("inf"))
+
+    def entry_samples(self, entry: Entry, last_time: int) -> Dict[str, np.ndarray]:
+        """
+        Retorna o tempo, a posição, a velocidade e o ângulo de uma entrada em todas as suas amostras
+        entre os tempos 0 e last_time, como arrays (ver FleetStore.samples).
+
+        Parâmetros:
+        - entry (Entry): Entrada do mapa.
+        - last_time (int): Último tempo considerado.
+
+        Retorna:
+        - Dict[str, np.ndarray]: Colunas "time", "x", "y", "speed" e "angle", em ordem de tempo.
+        """
+        if isinstance(entry, int):
+            samples = self.store.samples(entry)
+            times = samples["time"]
+            if len(times) and times[-1] > last_time:
+                # As amostras do FleetStore estão em ordem de tempo e começam depois de 0
+                stop = int(np.searchsorted(times, last_time, side="right"))
+                samples = {name: values[:stop] for name, values in samples.items()}
+            return samples
+        timesteps = sorted(
+            (timestep for timestep in entry.all_timesteps() if 0 <= timestep.time() <= last_time), key=Timestep.time
+        )
+        return {
+            "time": np.array([timestep.time() for timestep in timesteps], dtype=np.int64),
+            "x": np.array([timestep.x() for timestep in timesteps], dtype=np.float64),
+            "y": np.array([timestep.y() for timestep in timesteps], dtype=np.float64),
+            "speed": np.array([timestep.speed() for timestep in timesteps], dtype=np.float64),
+            "angle": np.array([timestep.angle() for timestep in timesteps], dtype=np.float64),
+        }
@@ -1,5 +1,7 @@
 import math
-from typing import List, Tuple, Optional
+from abc import ABC, abstractmethod
+from itertools import islice
+from typing import Callable, Iterator, List, Tuple, Optional
 from src.Vehicle import Vehicle
 
 # Raio da Terra em metros
@@ -74,11 +76,100 @@ def limit_speed(start_point: Tuple[float, float], end_point: Tuple[float, float]
         return end_point
 
 
+class DroneFollower:
+    """
+    Estado do cálculo das posições de um drone seguidor (ver generate_drone_coordinates), que pode
+    ser continuado quando novas posições do veículo seguido forem conhecidas.
+    """
+
+    def __init__(self, offset_distance: float, max_speed: float, smoothing_factor: float = 0.4, sample_interval: float = 1.0) -> None:
+        """
+        Inicializa o cálculo.
+
+        Parâmetros:
+        - offset_distance (float): Distância entre o veículo e o drone em metros.
+        - max_speed (float): Velocidade máxima do drone em metros por segundo.
+        - smoothing_factor (float): Fator de suavização para movimentos suaves. Valor entre 0 e 1.
+        - sample_interval (float): Intervalo entre amostras, em segundos.
+        """
+        self.offset_distance: float = offset_distance
+        self.max_speed: float = max_speed
+        self.smoothing_factor: float = smoothing_factor
+        self.sample_interval: float = sample_interval
+        self.drone_coordinates: List[Tuple[float, float, float]] = []  # Posições já calculadas
+        self.first_non_zero_coordinate: bool = False
+        self.previous_time: int = 0
+
+    def next_coordinate(
+        self, vehicle_coordinates: List[Tuple[float, float]], i: int, commit: bool = True
+    ) -> Tuple[float, float, float]:
+        """
+        Calcula a posição do drone no índice i, que deve ser o seguinte ao da última posição calculada.
+
+        A direção do veículo usa a posição seguinte (i + 1), se já conhecida, ou a anterior; por isso a
+        posição calculada sem a seguinte é provisória e deve ser calculada com commit=False.
+
+        Parâmetros:
+        - vehicle_coordinates (List[Tuple[float, float]]): Coordenadas (latitude, longitude) do veículo conhecidas até agora.
+        - i (int): Índice da posição.
+        - commit (bool): Se False, a posição não é guardada e o estado não muda.
+
+        Retorna:
+        - Tuple[float, float, float]: Posição (latitude, longitude, velocidade) do drone.
+        """
+        vehicle_position = vehicle_coordinates[i]
+        first_non_zero_coordinate = self.first_non_zero_coordinate
+        previous_time = self.previous_time
+
+        if vehicle_position != (0, 0) and not first_non_zero_coordinate:
+            first_non_zero_coordinate = True
+            coordinate = (vehicle_position[0], vehicle_position[1], 0)
+            previous_time = i
+        elif vehicle_position == (0, 0):
+            coordinate = (0, 0, 0)
+        else:
+            if i < len(vehicle_coordinates) - 1:
+                angle = calculate_angle(vehicle_coordinates[i], vehicle_coordinates[i + 1])
+            else:
+                angle = calculate_angle(vehicle_coordinates[i - 1], vehicle_coordinates[i])
+
+            if angle is None and i > 0:
+                coordinate = self.drone_coordinates[-1]
+            else:
+                offset = (self.offset_distance / earth_radius) * (180 / math.pi)
+                lat = vehicle_position[0] - offset * math.cos(angle)
+                lon = vehicle_position[1] - offset / math.cos(math.radians(vehicle_position[0])) * math.sin(angle)
+
+                current_lat, current_lon, _ = self.drone_coordinates[-1]
+                smoothed_lat = current_lat + self.smoothing_factor * (lat - current_lat)
+                smoothed_lon = current_lon + self.smoothing_factor * (lon - current_lon)
+
+                next_drone_position = (smoothed_lat, smoothed_lon)
+                limited_drone_position = limit_speed(
+                    (current_lat, current_lon), next_drone_position, self.max_speed * self.sample_interval
+                )
+
+                # Calcula a velocidade
+                distance = haversine_distance(current_lat, current_lon, limited_drone_position[0], limited_drone_position[1])
+                speed = distance / ((i - previous_time) * self.sample_interval)
+                speed = round(speed, 2)
+
+                coordinate = (limited_drone_position[0], limited_drone_position[1], speed)
+                previous_time = i
+
+        if commit:
+            self.drone_coordinates.append(coordinate)
+            self.first_non_zero_coordinate = first_non_zero_coordinate
+            self.previous_time = previous_time
+        return coordinate
+
+
 def generate_drone_coordinates(
     vehicle_coordinates: List[Tuple[float, float]],
     offset_distance: float,
     max_speed: float,
-    smoothing_factor: float = 0.4
+    smoothing_factor: float = 0.4,
+    sample_interval: float = 1.0
 ) -> List[Tuple[float, float, float]]:
     """
     Gera coordenadas para o drone com base nas coordenadas do veículo e na distância de offset.
@@ -88,54 +179,15 @@ def generate_drone_coordinates(
     - offset_distance (float): Distância entre o veículo e o drone em metros.
     - max_speed (float): Velocidade máxima do drone em metros por segundo.
     - smoothing_factor (float): Fator de suavização para movimentos suaves. Valor entre 0 e 1.
+    - sample_interval (float): Intervalo entre amostras, em segundos.
 
     Retorna:
     - List[Tuple[float, float, float]]: Lista de coordenadas (latitude, longitude, velocidade) para o drone.
     """
-    drone_coordinates: List[Tuple[float, float, float]] = []
-    first_non_zero_coordinate: bool = False
-    previous_time: int = 0
-
-    for i, vehicle_position in enumerate(vehicle_coordinates):
-        current_time = i
-
-        if vehicle_position != (0, 0) and not first_non_zero_coordinate:
-            first_non_zero_coordinate = True
-            drone_coordinates.append((vehicle_position[0], vehicle_position[1], 0))
-            previous_time = current_time
-            continue
-
-        if vehicle_position == (0, 0):
-            drone_coordinates.append((0, 0, 0))
-            continue
-
-        if i < len(vehicle_coordinates) - 1:
-            angle = calculate_angle(vehicle_coordinates[i], vehicle_coordinates[i + 1])
-        else:
-            angle = calculate_angle(vehicle_coordinates[i - 1], vehicle_coordinates[i])
-
-        if angle is None and i > 0:
-            drone_coordinates.append(drone_coordinates[-1])
-        else:
-            lat = vehicle_position[0] - (offset_distance / earth_radius) * (180 / math.pi) * math.cos(angle)
-            lon = vehicle_position[1] - (offset_distance / earth_radius) * (180 / math.pi) / math.cos(math.radians(vehicle_position[0])) * math.sin(angle)
-
-            current_lat, current_lon, _ = drone_coordinates[-1]
-            smoothed_lat = current_lat + smoothing_factor * (lat - current_lat)
-            smoothed_lon = current_lon + smoothing_factor * (lon - current_lon)
-
-            next_drone_position = (smoothed_lat, smoothed_lon)
-            limited_drone_position = limit_speed((current_lat, current_lon), next_drone_position, max_speed)
-
-            # Calcula a velocidade
-            distance = haversine_distance(current_lat, current_lon, limited_drone_position[0], limited_drone_position[1])
-            speed = distance / (current_time - previous_time)
-            speed = round(speed, 2)
-
-            drone_coordinates.append((limited_drone_position[0], limited_drone_position[1], speed))
-            previous_time = current_time
-
-    return drone_coordinates
+    follower = DroneFollower(offset_distance, max_speed, smoothing_factor, sample_interval)
+    for i in range(len(vehicle_coordinates)):
+        follower.next_coordinate(vehicle_coordinates, i)
+    return follower.drone_coordinates
 
 
 def generate_drone_coordinates_static(point: Tuple[float, float], num_samples: int) -> List[Tuple[float, float, float]]:
@@ -158,48 +210,45 @@ def generate_drone_coordinates_static(point: Tuple[float, float], num_samples: i
     return coordinates
 
 
-def generate_generic_pattern(
+def iter_generic_pattern(
     start_point: Tuple[float, float],
     distance_lists: List[float],
     angles_list: List[float],
-    num_samples: int,
-    max_speed: float
-) -> List[Tuple[float, float, float]]:
+    max_speed: float,
+    sample_interval: float = 1.0
+) -> Iterator[Tuple[float, float, float]]:
     """
-    Gera coordenadas para um padrão de mobilidade genérico.
+    Gera, sem fim, as coordenadas de um padrão de mobilidade genérico, uma amostra por vez.
 
     Parâmetros:
     - start_point (Tuple[float, float]): Coordenadas iniciais (latitude, longitude).
     - distance_lists (List[float]): Lista de distâncias a serem percorridas em cada estado.
     - angles_list (List[float]): Lista de ângulos de movimento para cada estado.
-    - num_samples (int): Número de amostras a serem geradas.
     - max_speed (float): Velocidade máxima do drone em metros por segundo.
+    - sample_interval (float): Intervalo entre amostras, em segundos.
 
     Retorna:
-    - List[Tuple[float, float, float]]: Lista de coordenadas (latitude, longitude, velocidade) para o padrão de mobilidade.
+    - Iterator[Tuple[float, float, float]]: Coordenadas (latitude, longitude, velocidade) de cada amostra.
     """
-    coordinates: List[Tuple[float, float, float]] = []
     lat, lon = start_point
-    distance_per_sample: float = max_speed  # Distância coberta por amostra
+    distance_per_sample: float = max_speed * sample_interval  # Distância coberta por amostra
 
     distance_degrees: float = distance_per_sample / earth_radius * (180 / math.pi)
 
-    coordinates.append((lat, lon, 0))
+    yield (lat, lon, 0)
     turn: int = 0
     states_number: int = len(distance_lists)
     distance_to_cover: float = meters_to_geo(distance_lists[turn]) / math.sqrt(2)
     angle_of_movement: float = angles_list[turn]
     distance_covered: float = 0
-    i: int = 0
 
-    while i < num_samples:
+    while True:
         while distance_covered + distance_degrees <= distance_to_cover:
             rad = math.radians(angle_of_movement)
             lat += distance_degrees * math.cos(rad)
             lon += distance_degrees * math.sin(rad)
-            coordinates.append((lat, lon, max_speed))
+            yield (lat, lon, max_speed)
             distance_covered += distance_degrees
-            i += 1
 
         lack_distance: float = distance_to_cover - distance_covered
         if lack_distance > 0:
@@ -216,17 +265,176 @@ def generate_generic_pattern(
             lat += acumulated * math.cos(rad)
             lon += acumulated * math.sin(rad)
             distance_covered += acumulated
-            coordinates.append((lat, lon, max_speed))
-            i += 1
+            yield (lat, lon, max_speed)
         else:
             turn += 1
             turn %= states_number
             distance_to_cover = meters_to_geo(distance_lists[turn])
             angle_of_movement = angles_list[turn]
-            rad = math.radians(angle_of_movement)
             distance_covered = 0
 
-    return coordinates
+
+def generate_generic_pattern(
+    start_point: Tuple[float, float],
+    distance_lists: List[float],
+    angles_list: List[float],
+    num_samples: int,
+    max_speed: float,
+    sample_interval: float = 1.0
+) -> List[Tuple[float, float, float]]:
+    """
+    Gera coordenadas para um padrão de mobilidade genérico.
+
+    Parâmetros:
+    - start_point (Tuple[float, float]): Coordenadas iniciais (latitude, longitude).
+    - distance_lists (List[float]): Lista de distâncias a serem percorridas em cada estado.
+    - angles_list (List[float]): Lista de ângulos de movimento para cada estado.
+    - num_samples (int): Número de amostras a serem geradas.
+    - max_speed (float): Velocidade máxima do drone em metros por segundo.
+    - sample_interval (float): Intervalo entre amostras, em segundos.
+
+    Retorna:
+    - List[Tuple[float, float, float]]: Lista de coordenadas (latitude, longitude, velocidade) para o padrão de mobilidade.
+    """
+    return list(islice(iter_generic_pattern(start_point, distance_lists, angles_list, max_speed, sample_interval), num_samples + 1))
+
+
+class DroneBuilder(ABC):
+    """
+    Gera a trajetória de um drone de forma incremental: build(timesteps) estende o mesmo drone até
+    o total de intervalos de tempo recebido, calculando apenas os intervalos novos. No modo follow
+    (ver Simulation.refresh_drones), o trabalho total fica proporcional à duração do traço.
+    """
+
+    def __init__(self, drone_id: str) -> None:
+        """
+        Cria o drone, ainda sem amostras.
+
+        Parâmetros:
+        - drone_id (str): Identificador do drone.
+        """
+        self.drone: Vehicle = Vehicle(drone_id, "VANT")
+        self.generated: int = 0  # Intervalos de tempo já gerados (definitivamente)
+
+    @abstractmethod
+    def build(self, timesteps: int) -> Vehicle:
+        """
+        Estende a trajetória do drone até um total de intervalos de tempo (que não deve diminuir entre chamadas).
+
+        Parâmetros:
+        - timesteps (int): Número de intervalos de tempo.
+
+        Retorna:
+        - Vehicle: O drone, com as amostras até o total recebido.
+        """
+
+    def add_coordinate(self, time: int, coordinate: Tuple[float, float, float]) -> bool:
+        """
+        Adiciona uma posição ao drone, se ela for válida.
+
+        Parâmetros:
+        - time (int): Intervalo de tempo.
+        - coordinate (Tuple[float, float, float]): Posição (latitude, longitude, velocidade).
+
+        Retorna:
+        - bool: True se a posição foi adicionada.
+        """
+        x_current, y_current, speed = coordinate
+        if (x_current, y_current) == (0, 0):
+            return False
+        self.drone.add_timestep(time, x_current, y_current, "0", round(speed, 2), "0", "0", "0")
+        return True
+
+
+class StaticDroneBuilder(DroneBuilder):
+    """
+    Drone estacionário em um ponto (ver create_drone_static_point).
+    """
+
+    def __init__(self, drone_id: str, point: Tuple[float, float]) -> None:
+        super().__init__(drone_id)
+        self.point: Tuple[float, float] = point
+
+    def build(self, timesteps: int) -> Vehicle:
+        coordinates = generate_drone_coordinates_static(self.point, timesteps - self.generated)
+        for time, coordinate in enumerate(coordinates, self.generated):
+            self.add_coordinate(time, coordinate)
+        self.generated = max(self.generated, timesteps)
+        return self.drone
+
+
+class PatternDroneBuilder(DroneBuilder):
+    """
+    Drone com um padrão de mobilidade genérico (ver create_drone_generic_pattern).
+    """
+
+    def __init__(
+        self,
+        drone_id: str,
+        start_point: Tuple[float, float],
+        distance_lists: List[float],
+        angles_list: List[float],
+        max_speed: float,
+        sample_interval: float = 1.0
+    ) -> None:
+        super().__init__(drone_id)
+        self._coordinates = iter_generic_pattern(start_point, distance_lists, angles_list, max_speed, sample_interval)
+
+    def build(self, timesteps: int) -> Vehicle:
+        for time in range(self.generated, timesteps):
+            self.add_coordinate(time, next(self._coordinates))
+        self.generated = max(self.generated, timesteps)
+        return self.drone
+
+
+class FollowingDroneBuilder(DroneBuilder):
+    """
+    Drone que segue um veículo (ver create_drone_following_object).
+
+    A posição do último intervalo depende da posição seguinte do veículo, ainda desconhecida, então
+    ela é gravada de forma provisória e recalculada na próxima chamada de build.
+    """
+
+    def __init__(
+        self,
+        drone_id: str,
+        get_vehicle: Callable[[], Vehicle],
+        offset_distance: float,
+        max_speed: float,
+        sample_interval: float = 1.0
+    ) -> None:
+        """
+        Parâmetros:
+        - drone_id (str): Identificador do drone.
+        - get_vehicle (Callable[[], Vehicle]): Função que retorna o veículo seguido (que pode surgir depois, no modo follow).
+        - offset_distance (float): Distância de offset entre o drone e o veículo.
+        - max_speed (float): Velocidade máxima do drone.
+        - sample_interval (float): Intervalo entre amostras, em segundos.
+        """
+        super().__init__(drone_id)
+        self.get_vehicle: Callable[[], Vehicle] = get_vehicle
+        self._follower = DroneFollower(offset_distance, max_speed, sample_interval=sample_interval)
+        self._vehicle_coordinates: List[Tuple[float, float]] = []
+        self._first: bool = True  # Nenhuma posição válida adicionada ainda
+
+    def _add(self, time: int, coordinate: Tuple[float, float, float], commit: bool) -> None:
+        if self.add_coordinate(time, coordinate) and self._first:
+            # Antes da primeira posição válida, o drone fica parado nela
+            for time_before in range(time):
+                self.add_coordinate(time_before, coordinate)
+            self._first = not commit
+
+    def build(self, timesteps: int) -> Vehicle:
+        vehicle = self.get_vehicle()
+        for time in range(len(self._vehicle_coordinates), timesteps + 1):
+            data = vehicle.get_timestep_dict(time)
+            self._vehicle_coordinates.append((data["x"], data["y"]) if data else (0, 0))
+
+        for time in range(self.generated, timesteps):
+            self._add(time, self._follower.next_coordinate(self._vehicle_coordinates, time), commit=True)
+        self._add(timesteps, self._follower.next_coordinate(self._vehicle_coordinates, timesteps, commit=False), commit=False)
+        self.generated = max(self.generated, timesteps)
+        return self.drone
 
 
 def create_drone_static_point(timesteps: int, drone_id: str, point: Tuple[float, float]) -> Vehicle:
@@ -241,16 +449,7 @@ def create_drone_static_point(timesteps: int, drone_id: str, point: Tuple[float,
     Retorna:
     - Vehicle: Objeto do drone com as coordenadas definidas.
     """
-    drone_coordinates = generate_drone_coordinates_static(point, timesteps)
-    drone = Vehicle(drone_id, "VANT")
-
-    for time in range(timesteps):
-        x_current, y_current, speed = drone_coordinates[time]
-
-        if (x_current, y_current) != (0, 0):
-            drone.add_timestep(time, x_current, y_current, "0", round(speed, 2), "0", "0", "0")
-
-    return drone
+    return StaticDroneBuilder(drone_id, point).build(timesteps)
 
 
 def create_drone_following_object(
@@ -258,7 +457,8 @@ def create_drone_following_object(
     drone_id: str,
     vehicle: Vehicle,
     offset_distance: float,
-    max_speed: float
+    max_speed: float,
+    sample_interval: float = 1.0
 ) -> Vehicle:
     """
     Cria um drone que segue um objeto móvel.
@@ -269,29 +469,12 @@ def create_drone_following_object(
     - vehicle (Vehicle): Objeto do veículo a ser seguido.
     - offset_distance (float): Distância de offset entre o drone e o veículo.
     - max_speed (float): Velocidade máxima do drone.
+    - sample_interval (float): Intervalo entre amostras, em segundos.
 
     Retorna:
     - Vehicle: Objeto do drone com as coordenadas definidas.
     """
-    vehicle_data = [vehicle.get_timestep_dict(i) for i in range(timesteps + 1)]
-    coordinates = [(data["x"], data["y"]) if data else (0, 0) for data in vehicle_data]
-
-    drone_coordinates = generate_drone_coordinates(coordinates, offset_distance, max_speed)
-    drone = Vehicle(drone_id, "VANT")
-
-    first = True
-
-    for time in range(timesteps + 1):
-        x_current, y_current, speed = drone_coordinates[time]
-
-        if (x_current, y_current) != (0, 0):
-            drone.add_timestep(time, x_current, y_current, "0", round(speed, 2), "0", "0", "0")
-            if first:
-                for timeIn in range(time):
-                    drone.add_timestep(timeIn, x_current, y_current, "0", round(speed, 2), "0", "0", "0")
-                first = False
-
-    return drone
+    return FollowingDroneBuilder(drone_id, lambda: vehicle, offset_distance, max_speed, sample_interval).build(timesteps)
 
 
 def create_drone_generic_pattern(
@@ -300,7 +483,8 @@ def create_drone_generic_pattern(
     start_point: Tuple[float, float],
     distance_lists: List[float],
     angles_list: List[float],
-    max_speed: float
+    max_speed: float,
+    sample_interval: float = 1.0
 ) -> Vehicle:
     """
     Cria um drone com um padrão de mobilidade genérico.
@@ -312,20 +496,12 @@ def create_drone_generic_pattern(
     - distance_lists (List[float]): Lista de distâncias a serem percorridas em cada estado.
     - angles_list (List[float]): Lista de ângulos de movimento para cada estado.
     - max_speed (float): Velocidade máxima do drone.
+    - sample_interval (float): Intervalo entre amostras, em segundos.
 
     Retorna:
     - Vehicle: Objeto do drone com as coordenadas definidas.
     """
-    drone_coordinates = generate_generic_pattern(start_point, distance_lists, angles_list, timesteps, max_speed)
-    drone = Vehicle(drone_id, "VANT")
-
-    for time in range(timesteps):
-        x_current, y_current, speed = drone_coordinates[time]
-
-        if (x_current, y_current) != (0, 0):
-            drone.add_timestep(time, x_current, y_current, "0", round(speed, 2), "0", "0", "0")
-
-    return drone
+    return PatternDroneBuilder(drone_id, start_point, distance_lists, angles_list, max_speed, sample_interval).build(timesteps)
 
 
 def meters_to_geo(a: float) -> float:
@@ -0,0 +1,55 @@
+import numpy as np
+from typing import List, Optional, Sequence, Tuple
+
+
+class ActiveIndex:
+    """
+    Índice dos veículos ativos em cada intervalo de tempo.
+
+    Cada veículo é registrado em todos os intervalos do seu período de presença [primeiro, último]
+    (ver Vehicle.time_range). O índice fica em layout CSR: as posições dos veículos ativos no
+    tempo t ocupam vehicle[offsets[t]:offsets[t + 1]], em ordem crescente.
+    Um veículo com lacunas na trajetória aparece também nos intervalos das lacunas, então quem
+    consulta o índice ainda deve tratar get_timestep retornando None.
+    """
+
+    def __init__(self, time_ranges: Sequence[Optional[Tuple[int, int]]]) -> None:
+        """
+        Constrói o índice a partir dos períodos de presença dos veículos.
+
+        Parâmetros:
+        - time_ranges (Sequence[Optional[Tuple[int, int]]]): Período de presença de cada veículo, ou None se não tiver amostras.
+        """
+        first, last = [], []
+        for time_range in time_ranges:
+            if time_range is None or time_range[1] < 0:
+                time_range = (0, -1)  # Sem amostras (ou só com tempos negativos): não aparece no índice
+            first.append(max(time_range[0], 0))
+            last.append(time_range[1])
+        first = np.array(first, dtype=np.int64)
+        counts = np.maximum(np.array(last, dtype=np.int64) - first + 1, 0)
+
+        # Uma entrada (tempo, veículo) por intervalo de presença de cada veículo
+        total = int(counts.sum())
+        starts = np.cumsum(counts) - counts
+        vehicle = np.repeat(np.arange(len(time_ranges), dtype=np.int32), counts)
+        time = np.repeat(first, counts) + (np.arange(total, dtype=np.int64) - np.repeat(starts, counts))
+        # Ordenação estável por tempo: dentro de cada tempo, os veículos seguem a ordem da lista
+        order = np.argsort(time, kind="stable")
+        self._vehicle: np.ndarray = vehicle[order]
+        size = int(time.max()) + 1 if total else 0
+        self._offsets: List[int] = [0] + np.cumsum(np.bincount(time, minlength=size)).tolist()
+
+    def active(self, time: int) -> List[int]:
+        """
+        Retorna os veículos ativos em um intervalo de tempo.
+
+        Parâmetros:
+        - time (int): Intervalo de tempo.
+
+        Retorna:
+        - List[int]: Posições (na lista de períodos recebida) dos veículos cujo período de presença contém o intervalo.
+        """
+        if time < 0 or time + 1 >= len(self._offsets):
+            return []
+        return self._vehicle[self._offsets[time]:self._offsets[time + 1]].tolist()
@@ -0,0 +1,82 @@
+import json
+import os
+import numpy as np
+from numpy.lib.format import open_memmap
+from typing import Any, Dict, Iterable, Tuple
+
+# Versão do formato do pacote de arrays; altere ao mudar as colunas gravadas
+BUNDLE_VERSION: int = 1
+
+# Colunas do pacote (uma amostra por linha) e os seus tipos
+BUNDLE_COLUMNS: Dict[str, np.dtype] = {
+    "time": np.dtype(np.float64),  # Tempo da amostra, em segundos
+    "vehicle": np.dtype(np.int32),  # Índice do veículo em meta["ids"]
+    "x": np.dtype(np.float64),
+    "y": np.dtype(np.float64),
+    "speed": np.dtype(np.float64),
+    "angle": np.dtype(np.float64),
+    "type": np.dtype(np.int32),  # Índice do tipo do veículo em meta["types"]
+}
+
+
+def write_array_bundle(
+    directory: str, rows: int, chunks: Iterable[Dict[str, np.ndarray]], meta: Dict[str, Any]
+) -> None:
+    """
+    Grava um pacote de arrays: um arquivo .npy por coluna (ver BUNDLE_COLUMNS) e o meta.json.
+
+    Os arquivos são criados já com o tamanho final e preenchidos bloco a bloco, então apenas um
+    bloco fica em memória de cada vez.
+
+    Parâmetros:
+    - directory (str): Diretório de saída (criado se não existir).
+    - rows (int): Total de linhas, isto é, a soma dos tamanhos dos blocos.
+    - chunks (Iterable[Dict[str, np.ndarray]]): Blocos de linhas consecutivas, com todas as colunas.
+    - meta (Dict[str, Any]): Metadados gravados no meta.json (ex.: tabelas de IDs e tipos).
+
+    Lança:
+    - ValueError: Se os blocos não somarem `rows` linhas.
+    """
+    os.makedirs(directory, exist_ok=True)
+    arrays = {
+        name: open_memmap(os.path.join(directory, name + ".npy"), mode="w+", dtype=dtype, shape=(rows,))
+        for name, dtype in BUNDLE_COLUMNS.items()
+    }
+    position = 0
+    for chunk in chunks:
+        size = len(chunk["time"])
+        if position + size > rows:
+            raise ValueError("Array bundle chunks exceed the declared number of rows.")
+        for name, array in arrays.items():
+            array[position:position + size] = chunk[name]
+        position += size
+    if position != rows:
+        raise ValueError(f"Array bundle has {position} rows, expected {rows}.")
+    for array in arrays.values():
+        array.flush()
+    del arrays
+
+    meta = dict(meta)
+    meta.update({"version": BUNDLE_VERSION, "rows": rows, "columns": list(BUNDLE_COLUMNS)})
+    with open(os.path.join(directory, "meta.json"), "w") as meta_file:
+        json.dump(meta, meta_file)
+
+
+def load_array_bundle(directory: str, mmap_mode: str = "r") -> Tuple[Dict[str, np.ndarray], Dict[str, Any]]:
+    """
+    Abre um pacote de arrays gravado por write_array_bundle, sem ler as colunas para a memória.
+
+    Parâmetros:
+    - directory (str): Diretório do pacote.
+    - mmap_mode (str): Modo do mmap (ver np.load); None lê as colunas inteiras.
+
+    Retorna:
+    - Tuple[Dict[str, np.ndarray], Dict[str, Any]]: Colunas e metadados.
+    """
+    with open(os.path.join(directory, "meta.json")) as meta_file:
+        meta = json.load(meta_file)
+    columns = {
+        name: np.load(os.path.join(directory, name + ".npy"), mmap_mode=mmap_mode)
+        for name in meta["columns"]
+    }
+    return columns, meta
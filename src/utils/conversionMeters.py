@@ -1,7 +1,10 @@
 import xml.etree.ElementTree as ET
+import numpy as np
+from functools import lru_cache
 from math import cos, radians
-from pyproj import Proj, transform
-from typing import Tuple
+from pyproj import Transformer
+from typing import Callable, List, Optional, Tuple
+from src.utils.traceReader import Element, open_trace
 
 def longitude_to_utm_zone(longitude: float) -> int:
     """
@@ -15,6 +18,19 @@ def longitude_to_utm_zone(longitude: float) -> int:
     """
     return int((longitude + 180) / 6) + 1
 
+@lru_cache(maxsize=None)
+def utm_transformer(zone: int) -> Transformer:
+    """
+    Retorna o Transformer de WGS84 (longitude, latitude) para uma zona UTM, criado uma única vez por zona.
+    
+    Parâmetros:
+    - zone (int): Número da zona UTM.
+    
+    Retorna:
+    - Transformer: Transformação com eixos na ordem (x, y), isto é, (longitude, latitude) -> (Easting, Northing).
+    """
+    return Transformer.from_crs("EPSG:4326", {"proj": "utm", "zone": zone, "datum": "WGS84"}, always_xy=True)
+
 def latlon_to_utm(lat: float, lon: float) -> Tuple[float, float]:
     """
     Converte latitude e longitude para coordenadas UTM.
@@ -26,10 +42,30 @@ def latlon_to_utm(lat: float, lon: float) -> Tuple[float, float]:
     Retorna:
     - Tuple[float, float]: Coordenadas UTM (Easting, Northing).
     """
-    zone = longitude_to_utm_zone(lon)
-    wgs84 = Proj(proj='latlong', datum='WGS84')
-    utm = Proj(proj='utm', zone=zone, datum='WGS84')
-    x, y = transform(wgs84, utm, lon, lat)
+    return utm_transformer(longitude_to_utm_zone(lon)).transform(lon, lat)
+
+def latlon_to_utm_array(lat: np.ndarray, lon: np.ndarray, zone: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converte arrays de latitudes e longitudes para coordenadas UTM, projetando cada zona de uma vez.
+    
+    Parâmetros:
+    - lat (np.ndarray): Latitudes em graus decimais.
+    - lon (np.ndarray): Longitudes em graus decimais.
+    - zone (Optional[int]): Zona UTM usada para todos os pontos. Se None, cada ponto usa a zona da sua longitude.
+    
+    Retorna:
+    - Tuple[np.ndarray, np.ndarray]: Coordenadas UTM (Easting, Northing) de cada ponto.
+    """
+    lat = np.asarray(lat, dtype=np.float64)
+    lon = np.asarray(lon, dtype=np.float64)
+    if zone is not None:
+        return utm_transformer(zone).transform(lon, lat)
+    x = np.empty_like(lon)
+    y = np.empty_like(lat)
+    zones = ((lon + 180) / 6).astype(np.int64) + 1
+    for zone in np.unique(zones).tolist():
+        mask = zones == zone
+        x[mask], y[mask] = utm_transformer(zone).transform(lon[mask], lat[mask])
     return x, y
 
 def latlon_to_xy(lat: float, lon: float, min_lat: float, min_lon: float) -> Tuple[float, float]:
@@ -52,39 +88,94 @@ def latlon_to_xy(lat: float, lon: float, min_lat: float, min_lon: float) -> Tupl
     y = R * dLat
     return x, y
 
-def convert_coordinates(input_xml_path: str, output_xml_path: str) -> None:
+def latlon_to_xy_array(lat: np.ndarray, lon: np.ndarray, min_lat: float, min_lon: float) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Converte arrays de latitudes e longitudes para coordenadas Cartesianas (x, y), com a mesma
+    aproximação (e os mesmos resultados, ponto a ponto) de latlon_to_xy.
+    
+    Parâmetros:
+    - lat (np.ndarray): Latitudes em graus decimais.
+    - lon (np.ndarray): Longitudes em graus decimais.
+    - min_lat (float): Latitude mínima de referência.
+    - min_lon (float): Longitude mínima de referência.
+    
+    Retorna:
+    - Tuple[np.ndarray, np.ndarray]: Coordenadas Cartesianas em metros.
+    """
+    R = 6378137  # Raio da Terra em metros
+    dLat = np.radians(np.asarray(lat, dtype=np.float64) - min_lat)
+    dLon = np.radians(np.asarray(lon, dtype=np.float64) - min_lon)
+    x = R * dLon * cos(radians(min_lat))
+    y = R * dLat
+    return x, y
+
+def format_meters(values: np.ndarray) -> List[str]:
+    """
+    Formata coordenadas em metros com duas casas decimais, como na exportação (str(round(valor, 2))).
+    
+    Parâmetros:
+    - values (np.ndarray): Coordenadas em metros.
+    
+    Retorna:
+    - List[str]: Coordenadas formatadas.
+    """
+    # round do Python (e não np.round) para manter exatamente o arredondamento de latlon_to_xy
+    return [str(round(value, 2)) for value in values.tolist()]
+
+def project_elements(
+    elements: List[Element], project: Callable[[np.ndarray, np.ndarray], Tuple[np.ndarray, np.ndarray]]
+) -> List[Element]:
+    """
+    Projeta as coordenadas dos elementos <vehicle> de um timestep, todas em uma única chamada.
+    
+    Parâmetros:
+    - elements (List[Element]): Elementos do timestep como (tag, atributos).
+    - project (Callable): Função que recebe arrays de latitudes e longitudes e retorna arrays de x e y em metros.
+    
+    Retorna:
+    - List[Element]: Elementos com x e y em metros (os atributos originais não são alterados).
+    """
+    indices = [index for index, (tag, _) in enumerate(elements) if tag == "vehicle"]
+    if not indices:
+        return elements
+    lon = np.array([elements[index][1]["x"] for index in indices], dtype=np.float64)
+    lat = np.array([elements[index][1]["y"] for index in indices], dtype=np.float64)
+    x_m, y_m = project(lat, lon)
+    converted = list(elements)
+    for index, x, y in zip(indices, format_meters(x_m), format_meters(y_m)):
+        tag, attributes = elements[index]
+        converted[index] = (tag, dict(attributes, x=x, y=y))
+    return converted
+
+def convert_coordinates(input_xml_path: str, output_xml_path: str, utm: bool = False) -> None:
     """
     Converte coordenadas de latitude e longitude em um arquivo XML para coordenadas Cartesianas.
     
     Parâmetros:
-    - input_xml_path (str): Caminho do arquivo XML de entrada.
+    - input_xml_path (str): Caminho do arquivo XML de entrada (opcionalmente compactado).
     - output_xml_path (str): Caminho do arquivo XML de saída.
+    - utm (bool): Se True, converte para coordenadas UTM na zona da menor longitude, em vez de usar os valores mínimos como origem.
     """
-    tree = ET.parse(input_xml_path)
+    with open_trace(input_xml_path) as input_file:
+        tree = ET.parse(input_file)
     root = tree.getroot()
 
     # Gerenciamento de namespaces para garantir a saída correta
     namespaces = {'xsi': 'http://www.w3.org/2001/XMLSchema-instance'}
     ET.register_namespace('xsi', namespaces['xsi'])
 
-    # Inicializa os valores mínimos de latitude e longitude
-    min_lat = float('inf')
-    min_lon = float('inf')
-    for vehicle in root.findall('.//vehicle', namespaces):
-        x = float(vehicle.get('x'))
-        y = float(vehicle.get('y'))
-        if x < min_lon:
-            min_lon = x
-        if y < min_lat:
-            min_lat = y
-
-    # Converte as coordenadas e atualiza os atributos
-    for vehicle in root.findall('.//vehicle', namespaces):
-        x = float(vehicle.get('x'))
-        y = float(vehicle.get('y'))
-        x_m, y_m = latlon_to_xy(y, x, min_lat, min_lon)
-        vehicle.set('x', str(round(x_m, 2)))
-        vehicle.set('y', str(round(y_m, 2)))
+    # Coordenadas de todos os veículos, convertidas de uma vez a partir dos valores mínimos (ou da zona UTM)
+    vehicles = root.findall('.//vehicle', namespaces)
+    if vehicles:
+        lon = np.array([vehicle.get('x') for vehicle in vehicles], dtype=np.float64)
+        lat = np.array([vehicle.get('y') for vehicle in vehicles], dtype=np.float64)
+        if utm:
+            x_m, y_m = latlon_to_utm_array(lat, lon, longitude_to_utm_zone(float(lon.min())))
+        else:
+            x_m, y_m = latlon_to_xy_array(lat, lon, float(lat.min()), float(lon.min()))
+        for vehicle, x, y in zip(vehicles, format_meters(x_m), format_meters(y_m)):
+            vehicle.set('x', x)
+            vehicle.set('y', y)
 
     # Salva o XML modificado com declaração e codificação corretas
     tree.write(output_xml_path, xml_declaration=True, encoding='utf-8', default_namespace=None)
@@ -0,0 +1,186 @@
+import re
+import numpy as np
+from array import array
+from typing import Dict, List, Optional, Tuple
+from src.utils.traceReader import BoundingBox, TimeGrid, open_trace
+
+# Linha de veículo no formato exato gerado pelo fcd-export do SUMO (um elemento por linha,
+# atributos em ordem fixa e sem entidades XML)
+_VEHICLE_LINE = re.compile(
+    rb'<vehicle id="([^"&<]*)" x="([^"]*)" y="([^"]*)" angle="([^"]*)" type="([^"&<]*)" '
+    rb'speed="([^"]*)" pos="([^"]*)" lane="([^"&<]*)" slope="([^"]*)"/>$'
+)
+# Linha de pessoa ou contêiner: mesmos atributos, sem tipo e com a aresta no lugar da faixa
+_PERSON_LINE = re.compile(
+    rb'<(person|container) id="([^"&<]*)" x="([^"]*)" y="([^"]*)" angle="([^"]*)" '
+    rb'speed="([^"]*)" pos="([^"]*)" edge="([^"&<]*)" slope="([^"]*)"/>$'
+)
+_TIMESTEP_LINE = re.compile(rb'<timestep time="([^"]*)"(/?)>$')
+
+# Quantidade de linhas acumuladas antes de converter os valores para float
+_FLUSH_ROWS: int = 1 << 16
+
+
+class FastScanError(ValueError):
+    """
+    Exceção lançada quando o arquivo possui alguma linha fora do formato esperado pelo leitor rápido.
+    """
+
+
+def scan_fcd_columns(
+    trace_path: str,
+    begin: Optional[float] = None,
+    end: Optional[float] = None,
+    bbox: Optional[BoundingBox] = None,
+    time_grid: Optional[TimeGrid] = None,
+    kinds: Tuple[str, ...] = ("vehicle",),
+) -> Tuple[Dict[str, np.ndarray], Optional[str]]:
+    """
+    Lê um arquivo FCD do SUMO linha a linha com expressões regulares, diretamente para a
+    representação colunar (ver src.utils.traceColumns), sem construir elementos XML.
+
+    Só aceita o formato regular do fcd-export: um <vehicle .../> por linha com os atributos
+    id, x, y, angle, type, speed, pos, lane e slope nessa ordem, e <person .../>/<container .../>
+    com id, x, y, angle, speed, pos, edge e slope. Qualquer outra linha dentro da raiz lança
+    FastScanError, para que o chamador use o parser genérico.
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo XML de traços (opcionalmente compactado).
+    - begin (Optional[float]): Tempo inicial da janela de leitura.
+    - end (Optional[float]): Tempo final da janela de leitura.
+    - bbox (Optional[BoundingBox]): Caixa delimitadora (lon mínima, lat mínima, lon máxima, lat máxima).
+    - time_grid (Optional[TimeGrid]): Grade de tempo da simulação. Se None, usa passos de 1 segundo.
+    - kinds (Tuple[str, ...]): Tags dos elementos lidos; as demais linhas de uma só tag são ignoradas.
+
+    Retorna:
+    - Tuple[Dict[str, np.ndarray], Optional[str]]: Colunas do arquivo e o tempo do último timestep mantido.
+
+    Lança:
+    - FastScanError: Se alguma linha não estiver no formato esperado.
+    """
+    time_grid = time_grid or TimeGrid()
+    id_index: Dict[Tuple[bytes, bytes], int] = {}  # (tag, ID) -> índice
+    lane_index: Dict[bytes, int] = {}
+    types: List[bytes] = []
+    time, vehicle, lane = array("q"), array("i"), array("i")
+    values = [array("d") for _ in range(6)]  # x, y, angle, speed, pos, slope
+    pending: List[Tuple[bytes, ...]] = []  # Valores ainda em texto
+    read_vehicles = "vehicle" in kinds
+    read_persons = tuple(b"<" + kind.encode() for kind in kinds if kind != "vehicle")
+
+    def append(tag: bytes, element_id: bytes, element_type: bytes, lane_id: bytes, numbers: Tuple[bytes, ...]):
+        index = id_index.get((tag, element_id))
+        if index is None:
+            index = id_index[(tag, element_id)] = len(id_index)
+            types.append(element_type)
+        time.append(key)
+        vehicle.append(index)
+        lane.append(lane_index.setdefault(lane_id, len(lane_index)))
+        pending.append(numbers)
+        if len(pending) >= _FLUSH_ROWS:
+            flush()
+
+    def flush():
+        if pending:
+            try:
+                for column, texts in zip(values, zip(*pending)):
+                    column.extend(map(float, texts))
+            except ValueError as error:
+                # Valores fora do formato numérico simples (entidades XML, por exemplo)
+                raise FastScanError(f"Unsupported numeric value: {error}") from error
+            pending.clear()
+
+    last_time = None
+    key = 0
+    inside_root = False  # Ignora o cabeçalho (declaração e comentário de configuração)
+    skipping = False  # Timestep fora da janela ou descartado pela dizimação
+    with open_trace(trace_path) as trace_file:
+        for line_number, line in enumerate(trace_file, start=1):
+            line = line.strip()
+            if not inside_root:
+                inside_root = line.startswith(b"<fcd-export")
+                continue
+            if line.startswith(b"<vehicle"):
+                if skipping or not read_vehicles:
+                    continue
+                match = _VEHICLE_LINE.match(line)
+                if match is None:
+                    raise FastScanError(f"Unsupported vehicle line {line_number}.")
+                vehicle_id, x, y, angle, vehicle_type, speed, pos, lane_id, slope = match.groups()
+                append(b"vehicle", vehicle_id, vehicle_type, lane_id, (x, y, angle, speed, pos, slope))
+            elif read_persons and line.startswith(read_persons):
+                if skipping:
+                    continue
+                match = _PERSON_LINE.match(line)
+                if match is None:
+                    raise FastScanError(f"Unsupported line {line_number}.")
+                tag, element_id, x, y, angle, speed, pos, edge, slope = match.groups()
+                # Sem atributo "type", o tipo é a própria tag (ver element_type)
+                append(tag, element_id, tag, edge, (x, y, angle, speed, pos, slope))
+            elif line.startswith(b"<timestep"):
+                match = _TIMESTEP_LINE.match(line)
+                if match is None:
+                    raise FastScanError(f"Unsupported timestep line {line_number}.")
+                time_instant = match.group(1).decode()
+                if end is not None and float(time_instant) > end:
+                    break
+                key = time_grid.key(time_instant)
+                skipping = key is None or (begin is not None and float(time_instant) < begin)
+                if not skipping:
+                    last_time = time_instant
+            elif line.startswith((b"<person", b"<container")):
+                if not line.endswith(b"/>"):
+                    raise FastScanError(f"Unsupported line {line_number}.")
+            elif line.startswith(b"</fcd-export"):
+                break
+            elif line and line != b"</timestep>":
+                raise FastScanError(f"Unsupported line {line_number}.")
+    if not inside_root:
+        raise FastScanError("Root element <fcd-export> not found.")
+    flush()
+
+    columns = {
+        "time": np.array(time, dtype=np.int64),
+        "vehicle": np.array(vehicle, dtype=np.int32),
+        "lane": np.array(lane, dtype=np.int32),
+        "ids": np.array([element_id.decode() for _, element_id in id_index], dtype=str),
+        "types": np.array([element_type.decode() for element_type in types], dtype=str),
+        "kinds": np.array([tag.decode() for tag, _ in id_index], dtype=str),
+        "lanes": np.array([lane_id.decode() for lane_id in lane_index], dtype=str),
+    }
+    for name, column in zip(("x", "y", "angle", "speed", "pos", "slope"), values):
+        columns[name] = np.array(column, dtype=np.float64)
+
+    if bbox is not None:
+        inside = (
+            (columns["x"] >= bbox[0]) & (columns["x"] <= bbox[2])
+            & (columns["y"] >= bbox[1]) & (columns["y"] <= bbox[3])
+        )
+        columns = _select_rows(columns, inside)
+    return columns, last_time
+
+
+def _select_rows(columns: Dict[str, np.ndarray], mask: np.ndarray) -> Dict[str, np.ndarray]:
+    """
+    Mantém apenas as amostras selecionadas por uma máscara, descartando da tabela de IDs
+    os veículos que ficaram sem amostras.
+
+    Parâmetros:
+    - columns (Dict[str, np.ndarray]): Dicionário de colunas.
+    - mask (np.ndarray): Máscara booleana das amostras mantidas.
+
+    Retorna:
+    - Dict[str, np.ndarray]: Colunas filtradas.
+    """
+    selected = {name: values[mask] for name, values in columns.items() if name not in ("ids", "types", "kinds", "lanes")}
+    # Reindexa os veículos restantes mantendo a ordem da primeira aparição
+    used, first = np.unique(selected["vehicle"], return_index=True)
+    order = used[np.argsort(first)]
+    remap = np.full(len(columns["ids"]), -1, dtype=np.int32)
+    remap[order] = np.arange(len(order), dtype=np.int32)
+    selected["vehicle"] = remap[selected["vehicle"]]
+    selected["ids"] = columns["ids"][order]
+    selected["types"] = columns["types"][order]
+    selected["kinds"] = columns["kinds"][order]
+    selected["lanes"] = columns["lanes"]
+    return selected
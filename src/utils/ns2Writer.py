@@ -0,0 +1,73 @@
+from typing import List, Tuple
+
+# Buffer do arquivo de saída: as linhas são gravadas em blocos grandes
+_BUFFER_SIZE = 1 << 20
+
+
+def format_seconds(seconds: List[float]) -> List[str]:
+    """
+    Formata tempos em segundos sem os resíduos de ponto flutuante da multiplicação pelo passo (ex.: 0.30000000000000004).
+
+    Parâmetros:
+    - seconds (List[float]): Tempos em segundos.
+
+    Retorna:
+    - List[str]: Tempos formatados.
+    """
+    return [str(round(value, 6)) for value in seconds]
+
+
+class Ns2Writer:
+    """
+    Escreve um arquivo de mobilidade do ns-2 (TCL), lido no ns-3 pelo Ns2MobilityHelper.
+
+    Cada nó recebe a posição inicial ($node_(i) set X_/Y_/Z_) e, a cada amostra, um comando
+    $ns_ at t "$node_(i) setdest x y speed" em direção à amostra seguinte. As linhas são
+    gravadas assim que recebidas, sem montar o arquivo em memória.
+    """
+
+    def __init__(self, path: str) -> None:
+        """
+        Cria o arquivo de saída.
+
+        Parâmetros:
+        - path (str): Caminho do arquivo TCL de saída.
+        """
+        self._file = open(path, "w", encoding="utf-8", buffering=_BUFFER_SIZE)
+
+    def write_initial_position(self, node: int, x: str, y: str) -> None:
+        """
+        Grava a posição inicial de um nó.
+
+        Parâmetros:
+        - node (int): Número do nó.
+        - x (str): Coordenada x, em metros.
+        - y (str): Coordenada y, em metros.
+        """
+        self._file.write(f"$node_({node}) set X_ {x}\n$node_({node}) set Y_ {y}\n$node_({node}) set Z_ 0.0\n")
+
+    def write_setdests(self, node: int, moves: List[Tuple[str, str, str, str]]) -> None:
+        """
+        Grava os movimentos de um nó.
+
+        Parâmetros:
+        - node (int): Número do nó.
+        - moves (List[Tuple[str, str, str, str]]): Tuplas (tempo, x, y, velocidade) já formatadas:
+          a partir do tempo, o nó segue até (x, y) com a velocidade dada, em metros por segundo.
+        """
+        self._file.writelines(
+            f'$ns_ at {time} "$node_({node}) setdest {x} {y} {speed}"\n' for time, x, y, speed in moves
+        )
+
+    def close(self) -> None:
+        """
+        Fecha o arquivo.
+        """
+        if not self._file.closed:
+            self._file.close()
+
+    def __enter__(self) -> "Ns2Writer":
+        return self
+
+    def __exit__(self, *exc_info: Tuple) -> None:
+        self.close()
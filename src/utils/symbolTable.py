@@ -0,0 +1,97 @@
+from typing import Dict, Iterable, List
+
+
+class SymbolTable:
+    """
+    Tabela de símbolos (dictionary encoding): associa cada string distinta a um código inteiro pequeno.
+
+    Usada para que as faixas repetidas em milhões de amostras sejam guardadas uma única vez; as
+    amostras guardam apenas o código, e a string só é recuperada na exportação. Cada tabela pertence
+    a quem cria as amostras (uma simulação ou um veículo), e é liberada junto com ele.
+    """
+
+    __slots__ = ("_codes", "_symbols")
+
+    def __init__(self, symbols: Iterable[str] = ()) -> None:
+        """
+        Cria a tabela, opcionalmente com símbolos iniciais (que recebem os códigos 0, 1, ...).
+
+        Parâmetros:
+        - symbols (Iterable[str]): Símbolos iniciais.
+        """
+        self._codes: Dict[str, int] = {}
+        self._symbols: List[str] = []
+        for symbol in symbols:
+            self.code(symbol)
+
+    def code(self, symbol: str) -> int:
+        """
+        Retorna o código de um símbolo, adicionando-o à tabela se ainda não existir.
+
+        Parâmetros:
+        - symbol (str): Símbolo.
+
+        Retorna:
+        - int: Código do símbolo.
+        """
+        code = self._codes.get(symbol)
+        if code is None:
+            code = self._codes[symbol] = len(self._symbols)
+            self._symbols.append(symbol)
+        return code
+
+    def symbol(self, code: int) -> str:
+        """
+        Retorna o símbolo de um código.
+
+        Parâmetros:
+        - code (int): Código do símbolo.
+
+        Retorna:
+        - str: Símbolo.
+        """
+        return self._symbols[code]
+
+    def __getitem__(self, code: int) -> str:
+        """
+        Retorna o símbolo de um código, como em uma lista de símbolos (ver symbol).
+
+        Parâmetros:
+        - code (int): Código do símbolo.
+
+        Retorna:
+        - str: Símbolo.
+        """
+        return self._symbols[code]
+
+    def intern(self, symbol: str) -> str:
+        """
+        Retorna a instância única de um símbolo guardada na tabela, para que strings iguais
+        sejam o mesmo objeto em memória.
+
+        Parâmetros:
+        - symbol (str): Símbolo.
+
+        Retorna:
+        - str: Símbolo guardado na tabela.
+        """
+        return self._symbols[self.code(symbol)]
+
+    def symbols(self) -> List[str]:
+        """
+        Retorna todos os símbolos da tabela, na ordem dos códigos.
+
+        Retorna:
+        - List[str]: Símbolos.
+        """
+        return list(self._symbols)
+
+    def __len__(self) -> int:
+        """
+        Retorna o número de símbolos da tabela.
+
+        Retorna:
+        - int: Número de símbolos.
+        """
+        return len(self._symbols)
+
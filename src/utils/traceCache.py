@@ -0,0 +1,115 @@
+import hashlib
+import json
+import os
+import shutil
+import numpy as np
+from typing import Any, Dict, Optional, Tuple
+
+# Versão do formato do cache; altere ao mudar as colunas gravadas
+CACHE_VERSION: int = 3
+
+# Quantidade de bytes do início e do fim do arquivo usados na assinatura
+_SIGNATURE_BYTES: int = 1 << 16
+
+
+def cache_directory(trace_path: str) -> str:
+    """
+    Retorna o diretório do cache binário associado a um arquivo de traços.
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo XML de traços.
+
+    Retorna:
+    - str: Caminho do diretório de cache, ao lado do arquivo de traços.
+    """
+    return trace_path + ".cache"
+
+
+def trace_signature(trace_path: str) -> Dict[str, Any]:
+    """
+    Calcula a assinatura de um arquivo de traços: tamanho, data de modificação e
+    um hash do início e do fim do arquivo.
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo XML de traços.
+
+    Retorna:
+    - Dict[str, Any]: Assinatura do arquivo.
+    """
+    stat = os.stat(trace_path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(trace_path, "rb") as trace_file:
+        digest.update(trace_file.read(_SIGNATURE_BYTES))
+        if stat.st_size > _SIGNATURE_BYTES:
+            trace_file.seek(max(stat.st_size - _SIGNATURE_BYTES, _SIGNATURE_BYTES))
+            digest.update(trace_file.read())
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "hash": digest.hexdigest()}
+
+
+def load_trace_cache(trace_path: str, options: Dict[str, Any]) -> Optional[Tuple[Dict[str, np.ndarray], Dict[str, Any]]]:
+    """
+    Carrega o cache colunar de um arquivo de traços, se ele existir e estiver atualizado.
+
+    As colunas são abertas com mmap, portanto só são lidas do disco quando acessadas.
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo XML de traços.
+    - options (Dict[str, Any]): Opções de leitura que também precisam coincidir com as do cache.
+
+    Retorna:
+    - Optional[Tuple[Dict[str, np.ndarray], Dict[str, Any]]]: Colunas e metadados, ou None se o cache for inválido.
+    """
+    directory = cache_directory(trace_path)
+    try:
+        with open(os.path.join(directory, "meta.json")) as meta_file:
+            meta = json.load(meta_file)
+        if (
+            meta.get("version") != CACHE_VERSION
+            or meta.get("options") != json.loads(json.dumps(options))
+            or meta.get("source") != trace_signature(trace_path)
+        ):
+            return None
+        columns = {
+            name: np.load(os.path.join(directory, name + ".npy"), mmap_mode="r")
+            for name in meta["columns"]
+        }
+    except (OSError, ValueError, KeyError):
+        return None
+    return columns, meta
+
+
+def save_trace_cache(trace_path: str, options: Dict[str, Any], columns: Dict[str, np.ndarray], meta: Dict[str, Any]) -> None:
+    """
+    Grava o cache colunar de um arquivo de traços como um conjunto de arquivos .npy.
+
+    A gravação é feita num diretório temporário que só substitui o cache antigo no final,
+    então uma execução interrompida nunca deixa um cache parcial. Falhas de escrita
+    (por exemplo, diretório somente leitura) apenas desativam o cache.
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo XML de traços.
+    - options (Dict[str, Any]): Opções de leitura usadas para gerar as colunas.
+    - columns (Dict[str, np.ndarray]): Colunas a serem gravadas.
+    - meta (Dict[str, Any]): Metadados adicionais (por exemplo, timestep_total).
+    """
+    directory = cache_directory(trace_path)
+    temporary = directory + ".tmp"
+    try:
+        shutil.rmtree(temporary, ignore_errors=True)
+        os.makedirs(temporary)
+        for name, values in columns.items():
+            np.save(os.path.join(temporary, name + ".npy"), values)
+        meta = dict(meta)
+        meta.update({
+            "version": CACHE_VERSION,
+            "options": options,
+            "source": trace_signature(trace_path),
+            "columns": list(columns.keys()),
+        })
+        with open(os.path.join(temporary, "meta.json"), "w") as meta_file:
+            json.dump(meta, meta_file)
+        shutil.rmtree(directory, ignore_errors=True)
+        os.replace(temporary, directory)
+    except OSError as error:
+        shutil.rmtree(temporary, ignore_errors=True)
+        print(f"Could not write trace cache '{directory}': {error}")
@@ -0,0 +1,175 @@
+import numpy as np
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.utils.traceReader import (
+    BoundingBox,
+    Element,
+    element_lane,
+    element_type,
+    find_timestep_offsets,
+    iter_timesteps_in_range,
+    TimeGrid,
+    split_timestep_ranges,
+    trim_timestep_offsets,
+)
+
+# Colunas numéricas de cada amostra, na ordem dos atributos do FCD
+FLOAT_COLUMNS = ("x", "y", "angle", "speed", "pos", "slope")
+
+
+def timesteps_to_columns(
+    timesteps: Iterable[Tuple[str, List[Element]]], time_grid: Optional[TimeGrid] = None
+) -> Tuple[Dict[str, np.ndarray], Optional[str]]:
+    """
+    Converte um fluxo de timesteps (ver iter_timesteps) diretamente para a representação colunar.
+
+    Cada amostra vira uma linha: "time" e "vehicle" (índice em "ids") identificam a amostra,
+    as colunas de FLOAT_COLUMNS guardam os valores e "lane" é o índice da faixa em "lanes".
+    "ids", "types" e "kinds" guardam o ID, o tipo e a tag ("vehicle", "person", ...) de cada veículo.
+
+    Parâmetros:
+    - timesteps (Iterable[Tuple[str, List[Element]]]): Pares (tempo, elementos do timestep).
+    - time_grid (Optional[TimeGrid]): Grade de tempo da simulação. Se None, usa passos de 1 segundo.
+
+    Retorna:
+    - Tuple[Dict[str, np.ndarray], Optional[str]]: Colunas e o tempo do último timestep mantido (ou None).
+    """
+    time_grid = time_grid or TimeGrid()
+    id_index: Dict[Tuple[str, str], int] = {}  # (tag, ID) -> índice
+    lane_index: Dict[str, int] = {}
+    types: List[str] = []
+    time, vehicle, lane = array("q"), array("i"), array("i")
+    values = {name: array("d") for name in FLOAT_COLUMNS}
+    last_time = None
+    for time_instant, elements in timesteps:
+        key = time_grid.key(time_instant)
+        if key is None:
+            continue  # Passo descartado pela dizimação
+        last_time = time_instant
+        for tag, data in elements:
+            identity = (tag, data["id"])
+            index = id_index.get(identity)
+            if index is None:
+                index = id_index[identity] = len(id_index)
+                types.append(element_type(tag, data))
+            time.append(key)
+            vehicle.append(index)
+            for name in FLOAT_COLUMNS:
+                values[name].append(float(data[name]))
+            lane.append(lane_index.setdefault(element_lane(data), len(lane_index)))
+
+    columns = {
+        "time": np.array(time, dtype=np.int64),
+        "vehicle": np.array(vehicle, dtype=np.int32),
+        "lane": np.array(lane, dtype=np.int32),
+        "ids": np.array([element_id for _, element_id in id_index], dtype=str),
+        "types": np.array(types, dtype=str),
+        "kinds": np.array([tag for tag, _ in id_index], dtype=str),
+        "lanes": np.array(list(lane_index.keys()), dtype=str),
+    }
+    for name in FLOAT_COLUMNS:
+        columns[name] = np.array(values[name], dtype=np.float64)
+    return columns, last_time
+
+
+def concat_columns(parts: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """
+    Concatena representações colunares, unificando as tabelas de IDs e de faixas.
+
+    As partes devem estar em ordem de tempo; a ordem das amostras é preservada.
+
+    Parâmetros:
+    - parts (List[Dict[str, np.ndarray]]): Colunas de cada parte.
+
+    Retorna:
+    - Dict[str, np.ndarray]: Colunas concatenadas.
+    """
+    id_index: Dict[Tuple[str, str], int] = {}  # (tag, ID) -> índice
+    lane_index: Dict[str, int] = {}
+    types: List[str] = []
+    vehicle_parts, lane_parts = [], []
+    for part in parts:
+        vehicle_codes = []
+        for kind, vehicle_id, vehicle_type in zip(part["kinds"].tolist(), part["ids"].tolist(), part["types"].tolist()):
+            identity = (kind, vehicle_id)
+            if identity not in id_index:
+                id_index[identity] = len(id_index)
+                types.append(vehicle_type)
+            vehicle_codes.append(id_index[identity])
+        lane_codes = [lane_index.setdefault(lane, len(lane_index)) for lane in part["lanes"].tolist()]
+        vehicle_parts.append(np.array(vehicle_codes, dtype=np.int32)[part["vehicle"]])
+        lane_parts.append(np.array(lane_codes, dtype=np.int32)[part["lane"]])
+
+    columns = {
+        "time": np.concatenate([part["time"] for part in parts]) if parts else np.zeros(0, dtype=np.int64),
+        "vehicle": np.concatenate(vehicle_parts) if parts else np.zeros(0, dtype=np.int32),
+        "lane": np.concatenate(lane_parts) if parts else np.zeros(0, dtype=np.int32),
+        "ids": np.array([vehicle_id for _, vehicle_id in id_index], dtype=str),
+        "types": np.array(types, dtype=str),
+        "kinds": np.array([kind for kind, _ in id_index], dtype=str),
+        "lanes": np.array(list(lane_index.keys()), dtype=str),
+    }
+    for name in FLOAT_COLUMNS:
+        columns[name] = np.concatenate([part[name] for part in parts]) if parts else np.zeros(0)
+    return columns
+
+
+def _parse_range(
+    job: Tuple[str, int, int, Optional[BoundingBox], TimeGrid, Tuple[str, ...]]
+) -> Tuple[Dict[str, np.ndarray], Optional[str]]:
+    """
+    Tarefa executada em cada processo: parseia um intervalo de bytes do arquivo FCD.
+
+    Parâmetros:
+    - job (Tuple[str, int, int, Optional[BoundingBox], TimeGrid, Tuple[str, ...]]): Caminho do arquivo,
+      byte inicial, byte final, caixa delimitadora, grade de tempo e tags dos elementos lidos.
+
+    Retorna:
+    - Tuple[Dict[str, np.ndarray], Optional[str]]: Colunas do intervalo e o tempo do seu último timestep.
+    """
+    trace_path, start, end, bbox, time_grid, kinds = job
+    return timesteps_to_columns(iter_timesteps_in_range(trace_path, start, end, bbox, kinds), time_grid)
+
+
+def read_columns_parallel(
+    trace_path: str,
+    workers: int,
+    begin: Optional[float] = None,
+    end: Optional[float] = None,
+    bbox: Optional[BoundingBox] = None,
+    time_grid: Optional[TimeGrid] = None,
+    kinds: Tuple[str, ...] = ("vehicle",),
+) -> Tuple[Dict[str, np.ndarray], Optional[str]]:
+    """
+    Lê um arquivo FCD em paralelo: o arquivo é dividido em intervalos equilibrados nas fronteiras
+    dos timesteps, cada intervalo é parseado em um processo e os resultados são unidos em ordem de tempo.
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo XML de traços.
+    - workers (int): Número de processos.
+    - begin (Optional[float]): Tempo inicial da janela de leitura.
+    - end (Optional[float]): Tempo final da janela de leitura.
+    - bbox (Optional[BoundingBox]): Caixa delimitadora dos veículos.
+    - time_grid (Optional[TimeGrid]): Grade de tempo da simulação. Se None, usa passos de 1 segundo a partir de begin.
+    - kinds (Tuple[str, ...]): Tags dos elementos lidos em cada timestep.
+
+    Retorna:
+    - Tuple[Dict[str, np.ndarray], Optional[str]]: Colunas do arquivo e o tempo do último timestep mantido.
+    """
+    offsets, stop = find_timestep_offsets(trace_path)
+    # Apenas os bytes dos timesteps da janela são distribuídos entre os processos
+    offsets, stop = trim_timestep_offsets(trace_path, offsets, stop, begin, end)
+    # Mais intervalos que processos equilibram melhor a carga e limitam a memória de cada tarefa
+    ranges = split_timestep_ranges(offsets, stop, workers * 4)
+    time_grid = time_grid or TimeGrid(begin if begin is not None else 0.0)
+    jobs = [(trace_path, range_start, range_end, bbox, time_grid, kinds) for range_start, range_end in ranges]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_parse_range, jobs))
+
+    last_time = None
+    for _, part_last_time in results:
+        if part_last_time is not None:
+            last_time = part_last_time
+    return concat_columns([columns for columns, _ in results]), last_time
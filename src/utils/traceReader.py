@@ -0,0 +1,681 @@
+import bz2
+import gzip
+import heapq
+import lzma
+import math
+import os
+import re
+import time
+import xml.etree.ElementTree as ET
+from itertools import groupby
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Marcadores procurados na varredura de bytes do arquivo FCD
+_TIMESTEP_TAG: bytes = b"<timestep"
+_ROOT_END_TAG: bytes = b"</fcd-export"
+
+# Tamanho dos blocos lidos do disco durante a varredura
+_BLOCK_SIZE: int = 1 << 22
+
+# Tamanho dos pedaços entregues ao parser: com blocos inteiros, milhares de elementos ficam vivos
+# até serem consumidos e o coletor de lixo os percorre repetidamente
+_FEED_SIZE: int = 1 << 16
+
+# Atributo de tempo logo após um "<timestep"
+_TIME_PATTERN = re.compile(rb'time="([^"]*)"')
+_TIMESTEP_TIME_PATTERN = re.compile(rb'<timestep time="([^"]*)"')
+
+# Tolerância, em frações de passo, na conversão de tempos para chaves (ver TimeGrid.key)
+_GRID_TOLERANCE: float = 1e-6
+
+# Tag de abertura da raiz, procurada no início do arquivo depois de remover os comentários
+_ROOT_START_PATTERN = re.compile(rb"<fcd-export\b[^>]*>")
+_COMMENT_PATTERN = re.compile(rb"<!--.*?-->", re.DOTALL)
+
+# Caixa delimitadora (lon mínima, lat mínima, lon máxima, lat máxima)
+BoundingBox = Tuple[float, float, float, float]
+
+# Elemento de um timestep: tag ("vehicle", "person", ...) e atributos
+Element = Tuple[str, Dict[str, str]]
+
+# Assinaturas (magic numbers) dos formatos compactados aceitos
+_COMPRESSED_FORMATS = (
+    (b"\x1f\x8b", gzip.open),
+    (b"BZh", bz2.open),
+    (b"\xfd7zXZ\x00", lzma.open),
+)
+
+# Extensões de arquivos de traços compactados
+COMPRESSED_EXTENSIONS = (".gz", ".bz2", ".xz")
+
+
+def _header_opener(header: bytes):
+    """
+    Identifica, pelos primeiros bytes de um arquivo, a função que abre um traço compactado.
+
+    Parâmetros:
+    - header (bytes): Primeiros bytes do arquivo (ao menos 6, se houver).
+
+    Retorna:
+    - Função de abertura (gzip.open, bz2.open ou lzma.open), ou None se os bytes não forem de um arquivo compactado.
+    """
+    for magic, opener in _COMPRESSED_FORMATS:
+        if header.startswith(magic):
+            return opener
+    return None
+
+
+def _compressed_opener(trace_path: str):
+    """
+    Identifica, pelos primeiros bytes do arquivo, a função que abre um traço compactado.
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo de traços.
+
+    Retorna:
+    - Função de abertura (gzip.open, bz2.open ou lzma.open), ou None se o arquivo não estiver compactado.
+    """
+    with open(trace_path, "rb") as trace_file:
+        return _header_opener(trace_file.read(6))
+
+
+def is_compressed(trace_path: str) -> bool:
+    """
+    Verifica se um arquivo de traços está compactado (gzip, bzip2 ou xz).
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo de traços.
+
+    Retorna:
+    - bool: True se o arquivo estiver compactado.
+    """
+    return _compressed_opener(trace_path) is not None
+
+
+def open_trace(trace_path: str) -> BinaryIO:
+    """
+    Abre um arquivo de traços em modo binário, descompactando-o em streaming se necessário.
+
+    Nenhuma cópia descompactada é gravada em disco.
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo de traços (.xml, .xml.gz, .xml.bz2 ou .xml.xz).
+
+    Retorna:
+    - BinaryIO: Arquivo aberto para leitura.
+    """
+    opener = _compressed_opener(trace_path)
+    if opener is None:
+        return open(trace_path, "rb")
+    return opener(trace_path, "rb")
+
+
+def strip_trace_extension(trace_path: str) -> str:
+    """
+    Remove a extensão de um arquivo de traços, incluindo a de compactação (ex.: ".xml.gz").
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo de traços.
+
+    Retorna:
+    - str: Caminho sem as extensões.
+    """
+    base, extension = os.path.splitext(trace_path)
+    if extension.lower() in COMPRESSED_EXTENSIONS:
+        base = os.path.splitext(base)[0]
+    return base
+
+
+class TimeGrid:
+    """
+    Grade de tempo da simulação: converte os tempos do SUMO nas chaves inteiras dos timesteps,
+    respeitando o passo real da simulação (ex.: --step-length 0.1) e a dizimação configurada.
+
+    A origem deve ser o tempo de um timestep do arquivo (ver first_timestep_time): um passo
+    começa em cada múltiplo de step_length a partir dela.
+
+    Atributos:
+    - origin (float): Tempo correspondente ao primeiro timestep.
+    - step_length (float): Passo da simulação do SUMO, em segundos.
+    - decimate (int): Mantém apenas um a cada `decimate` passos.
+    """
+
+    def __init__(self, origin: float = 0.0, step_length: float = 1.0, decimate: int = 1) -> None:
+        """
+        Inicializa a grade de tempo.
+
+        Parâmetros:
+        - origin (float): Tempo correspondente ao primeiro timestep.
+        - step_length (float): Passo da simulação do SUMO, em segundos.
+        - decimate (int): Mantém apenas um a cada `decimate` passos.
+        """
+        self.origin: float = origin
+        self.step_length: float = step_length
+        self.decimate: int = decimate
+
+    def key(self, time_instant: str) -> Optional[int]:
+        """
+        Converte o tempo de um timestep do SUMO para a chave inteira usada nos veículos.
+
+        Parâmetros:
+        - time_instant (str): Atributo "time" do timestep.
+
+        Retorna:
+        - Optional[int]: Chave do timestep (a primeira amostra mantida tem chave 1),
+          ou None se o passo for descartado pela dizimação.
+        """
+        # Piso (e não round, que arredonda metades para o par e junta passos vizinhos), com uma
+        # tolerância para os erros de ponto flutuante de tempos que caem exatamente na grade
+        index = math.floor((float(time_instant) - self.origin) / self.step_length + _GRID_TOLERANCE)
+        if index % self.decimate != 0:
+            return None
+        return index // self.decimate + 1
+
+    def seconds(self, key: int) -> float:
+        """
+        Converte a chave de um timestep de volta para o tempo do SUMO (inverso de key).
+
+        Parâmetros:
+        - key (int): Chave do timestep.
+
+        Retorna:
+        - float: Tempo em segundos.
+        """
+        return self.origin + (key - 1) * self.sample_interval()
+
+    def sample_interval(self) -> float:
+        """
+        Retorna o intervalo, em segundos, entre duas amostras mantidas.
+
+        Retorna:
+        - float: Intervalo entre amostras.
+        """
+        return self.step_length * self.decimate
+
+
+def detect_step_length(trace_path: str, default: float = 1.0) -> float:
+    """
+    Detecta o passo da simulação a partir dos tempos dos dois primeiros timesteps do arquivo.
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo de traços (opcionalmente compactado).
+    - default (float): Passo usado se o arquivo tiver menos de dois timesteps.
+
+    Retorna:
+    - float: Passo da simulação, em segundos.
+    """
+    times: List[float] = []
+    buffer = b""
+    with open_trace(trace_path) as trace_file:
+        while len(times) < 2:
+            data = trace_file.read(_BLOCK_SIZE)
+            if not data:
+                break
+            buffer += data
+            times = [float(time) for time in _TIMESTEP_TIME_PATTERN.findall(buffer)[:2]]
+    if len(times) < 2 or times[1] <= times[0]:
+        return default
+    return round(times[1] - times[0], 9)
+
+
+def first_timestep_time(trace_path: str, begin: Optional[float] = None) -> Optional[float]:
+    """
+    Retorna o tempo do primeiro timestep do arquivo a partir de begin, lendo o arquivo só até ele.
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo de traços (opcionalmente compactado).
+    - begin (Optional[float]): Tempo mínimo. Se None, retorna o tempo do primeiro timestep.
+
+    Retorna:
+    - Optional[float]: Tempo do timestep, ou None se não houver timestep a partir de begin.
+    """
+    buffer = b""
+    with open_trace(trace_path) as trace_file:
+        while True:
+            data = trace_file.read(_BLOCK_SIZE)
+            if not data:
+                return None
+            buffer += data
+            for match in _TIMESTEP_TIME_PATTERN.finditer(buffer):
+                time = float(match.group(1))
+                if begin is None or time >= begin:
+                    return time
+            # Mantém o final do bloco para encontrar um timestep dividido entre leituras
+            buffer = buffer[-256:]
+
+
+def element_type(tag: str, data: Dict[str, str]) -> str:
+    """
+    Retorna o tipo de um elemento do FCD. Pessoas e contêineres sem atributo "type"
+    usam a própria tag como tipo.
+
+    Parâmetros:
+    - tag (str): Tag do elemento ("vehicle", "person" ou "container").
+    - data (Dict[str, str]): Atributos do elemento.
+
+    Retorna:
+    - str: Tipo do elemento.
+    """
+    return data.get("type", tag)
+
+
+def element_lane(data: Dict[str, str]) -> str:
+    """
+    Retorna a faixa de um elemento do FCD (ou a aresta, no caso de pessoas e contêineres).
+
+    Parâmetros:
+    - data (Dict[str, str]): Atributos do elemento.
+
+    Retorna:
+    - str: Faixa ou aresta do elemento.
+    """
+    return data.get("lane", data.get("edge", ""))
+
+
+def in_bbox(vehicle_data: Dict[str, str], bbox: BoundingBox) -> bool:
+    """
+    Verifica se a posição de um elemento do FCD está dentro da caixa delimitadora.
+
+    Parâmetros:
+    - vehicle_data (Dict[str, str]): Atributos do elemento.
+    - bbox (BoundingBox): Caixa delimitadora (lon mínima, lat mínima, lon máxima, lat máxima).
+
+    Retorna:
+    - bool: True se o elemento estiver dentro da caixa.
+    """
+    x = float(vehicle_data["x"])
+    y = float(vehicle_data["y"])
+    return bbox[0] <= x <= bbox[2] and bbox[1] <= y <= bbox[3]
+
+
+def _iter_parsed_timesteps(
+    events: Iterable[Tuple[str, ET.Element]],
+    begin: Optional[float] = None,
+    end: Optional[float] = None,
+    bbox: Optional[BoundingBox] = None,
+    kinds: Optional[Tuple[str, ...]] = ("vehicle",),
+) -> Iterator[Tuple[str, List[Element]]]:
+    """
+    Converte eventos de parsing ("start"/"end") em pares (tempo, elementos), limpando
+    cada <timestep> assim que ele é consumido.
+
+    Timesteps fora da janela [begin, end] e veículos fora de bbox são descartados aqui,
+    antes de qualquer objeto da simulação ser criado. A leitura termina no primeiro
+    timestep posterior a end.
+
+    Parâmetros:
+    - events (Iterable[Tuple[str, ET.Element]]): Eventos gerados por iterparse ou XMLPullParser.
+    - begin (Optional[float]): Tempo inicial da janela. Se None, não há limite inferior.
+    - end (Optional[float]): Tempo final da janela. Se None, não há limite superior.
+    - bbox (Optional[BoundingBox]): Caixa delimitadora dos veículos. Se None, mantém todos.
+    - kinds (Optional[Tuple[str, ...]]): Tags dos elementos lidos em cada timestep (ex.: "vehicle", "person",
+      "container"). Se None, lê todos os elementos.
+
+    Retorna:
+    - Iterator[Tuple[str, List[Element]]]: Pares (tempo, elementos do timestep como (tag, atributos)).
+    """
+    root = None
+    for event, element in events:
+        if element is None:
+            yield None  # Fim dos dados disponíveis até o momento (ver follow_timesteps)
+            continue
+        if event == "start":
+            if root is None:
+                root = element  # Elemento raiz <fcd-export>
+            continue
+        if element.tag == "timestep":
+            time_instant = element.attrib["time"]
+            if end is not None and float(time_instant) > end:
+                break
+            if begin is None or float(time_instant) >= begin:
+                elements = [(child.tag, child.attrib) for child in element if kinds is None or child.tag in kinds]
+                if bbox is not None:
+                    elements = [(tag, data) for tag, data in elements if in_bbox(data, bbox)]
+                yield time_instant, elements
+            # Descarta o timestep já processado (e a referência a ele na raiz)
+            element.clear()
+            root.clear()
+
+
+def iter_timesteps(
+    trace_path: str,
+    begin: Optional[float] = None,
+    end: Optional[float] = None,
+    bbox: Optional[BoundingBox] = None,
+    kinds: Optional[Tuple[str, ...]] = ("vehicle",),
+) -> Iterator[Tuple[str, List[Element]]]:
+    """
+    Percorre um arquivo FCD do SUMO de forma incremental, timestep a timestep.
+
+    Usa `iterparse` e limpa cada elemento <timestep> assim que ele é consumido,
+    de modo que a árvore XML completa nunca fica em memória. Arquivos compactados
+    (gzip, bzip2 ou xz) são descompactados em streaming.
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo XML de traços (opcionalmente compactado).
+    - begin (Optional[float]): Tempo inicial da janela de leitura.
+    - end (Optional[float]): Tempo final da janela de leitura.
+    - bbox (Optional[BoundingBox]): Caixa delimitadora (lon mínima, lat mínima, lon máxima, lat máxima).
+    - kinds (Optional[Tuple[str, ...]]): Tags dos elementos lidos em cada timestep. Por padrão, apenas veículos;
+      se None, todos os elementos.
+
+    Retorna:
+    - Iterator[Tuple[str, List[Element]]]: Pares (tempo, elementos do timestep como (tag, atributos)).
+    """
+    with open_trace(trace_path) as trace_file:
+        events = ET.iterparse(trace_file, events=("start", "end"))
+        yield from _iter_parsed_timesteps(events, begin, end, bbox, kinds)
+
+
+def read_root_tag(trace_path: str) -> str:
+    """
+    Retorna a tag de abertura da raiz <fcd-export> de um arquivo FCD exatamente como está no arquivo,
+    com as declarações de namespace, para que ela possa ser copiada na exportação.
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo XML de traços (opcionalmente compactado).
+
+    Retorna:
+    - str: Tag de abertura da raiz, ou "<fcd-export>" se ela não for encontrada no início do arquivo.
+    """
+    head = b""
+    with open_trace(trace_path) as trace_file:
+        while len(head) < _BLOCK_SIZE:
+            data = trace_file.read(1 << 16)
+            if not data:
+                break
+            head += data
+            match = _ROOT_START_PATTERN.search(_COMMENT_PATTERN.sub(b"", head))
+            if match is not None:
+                return match.group(0).decode("utf-8")
+    return "<fcd-export>"
+
+
+def iter_timesteps_in_range(
+    trace_path: str,
+    start: int,
+    end: int,
+    bbox: Optional[BoundingBox] = None,
+    kinds: Optional[Tuple[str, ...]] = ("vehicle",),
+) -> Iterator[Tuple[str, List[Element]]]:
+    """
+    Percorre apenas os timesteps contidos no intervalo de bytes [start, end) do arquivo FCD.
+
+    O intervalo deve começar em um "<timestep" e terminar no início de outro timestep
+    (ou do fechamento da raiz); ele é envolvido numa raiz artificial para ser parseado isoladamente.
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo XML de traços.
+    - start (int): Byte inicial do intervalo.
+    - end (int): Byte final (exclusivo) do intervalo.
+    - bbox (Optional[BoundingBox]): Caixa delimitadora dos veículos.
+    - kinds (Optional[Tuple[str, ...]]): Tags dos elementos lidos em cada timestep. Se None, todos os elementos.
+
+    Retorna:
+    - Iterator[Tuple[str, List[Element]]]: Pares (tempo, elementos do timestep como (tag, atributos)).
+    """
+    def events() -> Iterator[Tuple[str, ET.Element]]:
+        parser = ET.XMLPullParser(events=("start", "end"))
+        parser.feed(b"<fcd-export>")
+        with open(trace_path, "rb") as trace_file:
+            trace_file.seek(start)
+            remaining = end - start
+            while remaining > 0:
+                data = trace_file.read(min(_BLOCK_SIZE, remaining))
+                if not data:
+                    break
+                remaining -= len(data)
+                for offset in range(0, len(data), _FEED_SIZE):
+                    parser.feed(data[offset:offset + _FEED_SIZE])
+                    yield from parser.read_events()
+        parser.feed(b"</fcd-export>")
+        yield from parser.read_events()
+        parser.close()
+
+    return _iter_parsed_timesteps(events(), bbox=bbox, kinds=kinds)
+
+
+def shard_prefix(index: int) -> str:
+    """
+    Retorna o prefixo adicionado aos IDs dos elementos de um arquivo de traços ao mesclar vários arquivos.
+
+    Parâmetros:
+    - index (int): Posição do arquivo na lista de arquivos mesclados.
+
+    Retorna:
+    - str: Prefixo dos IDs (ex.: "0_", "1_").
+    """
+    return f"{index}_"
+
+
+def merge_timesteps(
+    streams: List[Iterable[Tuple[str, List[Element]]]], prefixes: List[str]
+) -> Iterator[Tuple[str, List[Element]]]:
+    """
+    Mescla, em streaming, fluxos de timesteps (ver iter_timesteps) de vários arquivos FCD
+    gerados por instâncias diferentes do SUMO (por exemplo, uma por região).
+
+    Os fluxos são combinados com uma mesclagem k-way pelo tempo; timesteps com o mesmo tempo
+    viram um único timestep com os elementos de todos os arquivos, na ordem dos fluxos.
+    Para evitar colisões, o ID de cada elemento recebe o prefixo do seu arquivo.
+
+    Parâmetros:
+    - streams (List[Iterable[Tuple[str, List[Element]]]]): Fluxos de timesteps, cada um em ordem de tempo.
+    - prefixes (List[str]): Prefixo dos IDs de cada fluxo.
+
+    Retorna:
+    - Iterator[Tuple[str, List[Element]]]: Pares (tempo, elementos do timestep) em ordem de tempo.
+    """
+    def prefixed(index: int, stream: Iterable[Tuple[str, List[Element]]]):
+        prefix = prefixes[index]
+        for time_instant, elements in stream:
+            # Copia os atributos: o elemento original é limpo quando o fluxo avança
+            elements = [(tag, dict(data, id=prefix + data["id"])) for tag, data in elements]
+            yield float(time_instant), index, time_instant, elements
+
+    merged = heapq.merge(
+        *(prefixed(index, stream) for index, stream in enumerate(streams)), key=lambda item: (item[0], item[1])
+    )
+    for _, group in groupby(merged, key=lambda item: item[0]):
+        group = list(group)
+        yield group[0][2], [element for item in group for element in item[3]]
+
+
+def follow_timesteps(
+    trace_path: str,
+    poll_interval: float = 1.0,
+    idle_timeout: Optional[float] = 60.0,
+    begin: Optional[float] = None,
+    end: Optional[float] = None,
+    bbox: Optional[BoundingBox] = None,
+    kinds: Tuple[str, ...] = ("vehicle",),
+) -> Iterator[Optional[Tuple[str, List[Element]]]]:
+    """
+    Acompanha um arquivo FCD que ainda está sendo escrito pelo SUMO (como `tail -f`),
+    produzindo cada timestep assim que o seu elemento é fechado no arquivo.
+
+    Sempre que os dados disponíveis no arquivo se esgotam, produz None antes de esperar
+    por mais dados, para que o chamador possa processar o lote de timesteps já recebido.
+    O acompanhamento termina no fechamento da raiz </fcd-export> ou no primeiro timestep
+    posterior a end. Arquivos compactados não podem ser acompanhados.
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo XML de traços (pode ainda não existir).
+    - poll_interval (float): Intervalo, em segundos, entre verificações de novos dados.
+    - idle_timeout (Optional[float]): Tempo máximo, em segundos, sem novos dados. Se None, espera indefinidamente.
+    - begin (Optional[float]): Tempo inicial da janela de leitura.
+    - end (Optional[float]): Tempo final da janela de leitura.
+    - bbox (Optional[BoundingBox]): Caixa delimitadora dos veículos.
+    - kinds (Tuple[str, ...]): Tags dos elementos lidos em cada timestep.
+
+    Retorna:
+    - Iterator[Optional[Tuple[str, List[Element]]]]: Pares (tempo, elementos do timestep), intercalados com None.
+
+    Lança:
+    - ValueError: Se o arquivo for compactado.
+    - TimeoutError: Se o arquivo ficar idle_timeout segundos sem crescer antes de terminar.
+    """
+    # A compactação é detectada pelo conteúdo, como em open_trace; se o arquivo ainda não
+    # existir, ela é verificada nos primeiros bytes lidos
+    if os.path.exists(trace_path) and is_compressed(trace_path):
+        raise ValueError("Compressed traces cannot be followed.")
+
+    def wait(idle: float) -> float:
+        if idle_timeout is not None and idle >= idle_timeout:
+            raise TimeoutError(f"Trace '{trace_path}' did not grow for {idle_timeout} s.")
+        time.sleep(poll_interval)
+        return idle + poll_interval
+
+    def events() -> Iterator[Tuple[str, Optional[ET.Element]]]:
+        idle = 0.0
+        while not os.path.exists(trace_path):
+            idle = wait(idle)
+        parser = ET.XMLPullParser(events=("start", "end"))
+        root = None
+        received = False  # Há eventos desde o último marcador de fim dos dados
+        started = False  # Os primeiros bytes do arquivo já foram verificados
+        with open(trace_path, "rb") as trace_file:
+            while True:
+                data = trace_file.read(_BLOCK_SIZE)
+                if not data:
+                    if received:
+                        yield "idle", None
+                        received = False
+                    idle = wait(idle)
+                    continue
+                idle = 0.0
+                if not started:
+                    if _header_opener(data) is not None:
+                        raise ValueError("Compressed traces cannot be followed.")
+                    started = True
+                parser.feed(data)
+                for event, element in parser.read_events():
+                    received = True
+                    if event == "end" and element is root:
+                        return  # Fechamento de </fcd-export>: o SUMO terminou a escrita
+                    if root is None:
+                        root = element
+                    yield event, element
+
+    return _iter_parsed_timesteps(events(), begin, end, bbox, kinds)
+
+
+def find_timestep_offsets(trace_path: str) -> Tuple[List[int], int]:
+    """
+    Varre o arquivo FCD em bytes e localiza o início de cada elemento <timestep>.
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo XML de traços.
+
+    Retorna:
+    - Tuple[List[int], int]: Posições de cada "<timestep" e a posição do fechamento da raiz
+      (ou o fim do arquivo, se ele não for encontrado).
+    """
+    offsets: List[int] = []
+    root_end = -1
+    overlap = len(_ROOT_END_TAG) - 1
+    with open(trace_path, "rb") as trace_file:
+        position = 0  # Posição absoluta do início de `buffer`
+        buffer = b""
+        while True:
+            data = trace_file.read(_BLOCK_SIZE)
+            if not data:
+                break
+            buffer += data
+            index = buffer.find(_TIMESTEP_TAG)
+            while index != -1:
+                offsets.append(position + index)
+                index = buffer.find(_TIMESTEP_TAG, index + 1)
+            index = buffer.rfind(_ROOT_END_TAG)
+            if index != -1:
+                root_end = position + index
+            # Mantém o final do bloco para encontrar marcadores divididos entre leituras
+            keep = min(overlap, len(buffer))
+            position += len(buffer) - keep
+            buffer = buffer[len(buffer) - keep:]
+    if root_end == -1:
+        root_end = os.path.getsize(trace_path)
+    # Um marcador só pode ser encontrado duas vezes se estiver inteiro na sobreposição
+    return sorted(set(offsets)), root_end
+
+
+def _read_time_at(trace_file, offset: int) -> float:
+    """
+    Lê o atributo de tempo do timestep que começa em uma posição do arquivo.
+
+    Parâmetros:
+    - trace_file: Arquivo FCD aberto em modo binário.
+    - offset (int): Posição de um "<timestep".
+
+    Retorna:
+    - float: Tempo do timestep.
+    """
+    trace_file.seek(offset)
+    match = _TIME_PATTERN.search(trace_file.read(256))
+    return float(match.group(1))
+
+
+def trim_timestep_offsets(
+    trace_path: str,
+    offsets: List[int],
+    end: int,
+    begin_time: Optional[float] = None,
+    end_time: Optional[float] = None,
+) -> Tuple[List[int], int]:
+    """
+    Restringe as posições dos timesteps à janela de tempo [begin_time, end_time].
+
+    Como os timesteps estão em ordem crescente de tempo, a janela é encontrada por busca
+    binária, lendo apenas o atributo de tempo de O(log T) timesteps.
+
+    Parâmetros:
+    - trace_path (str): Caminho do arquivo XML de traços.
+    - offsets (List[int]): Posições de cada "<timestep".
+    - end (int): Posição final do último timestep.
+    - begin_time (Optional[float]): Tempo inicial da janela.
+    - end_time (Optional[float]): Tempo final da janela.
+
+    Retorna:
+    - Tuple[List[int], int]: Posições dos timesteps da janela e a posição final do último deles.
+    """
+    def first_index(predicate) -> int:
+        low, high = 0, len(offsets)
+        while low < high:
+            middle = (low + high) // 2
+            if predicate(_read_time_at(trace_file, offsets[middle])):
+                high = middle
+            else:
+                low = middle + 1
+        return low
+
+    with open(trace_path, "rb") as trace_file:
+        first = 0 if begin_time is None else first_index(lambda time: time >= begin_time)
+        last = len(offsets) if end_time is None else first_index(lambda time: time > end_time)
+    if last < len(offsets):
+        end = offsets[last]
+    return offsets[first:last], end
+
+
+def split_timestep_ranges(offsets: List[int], end: int, chunks: int) -> List[Tuple[int, int]]:
+    """
+    Divide o arquivo em intervalos de bytes de tamanho equilibrado, sempre cortando no
+    início de um timestep.
+
+    Parâmetros:
+    - offsets (List[int]): Posições de cada "<timestep" (ver find_timestep_offsets).
+    - end (int): Posição final do último intervalo.
+    - chunks (int): Número desejado de intervalos.
+
+    Retorna:
+    - List[Tuple[int, int]]: Intervalos (início, fim) em ordem crescente.
+    """
+    if not offsets:
+        return []
+    start = offsets[0]
+    target = (end - start) / max(chunks, 1)
+    boundaries = [start]
+    for offset in offsets[1:]:
+        if offset - boundaries[-1] >= target:
+            boundaries.append(offset)
+    boundaries.append(end)
+    return list(zip(boundaries[:-1], boundaries[1:]))
@@ -0,0 +1,140 @@
+import re
+import shutil
+from typing import Dict, Iterable, Tuple
+from src.utils.traceReader import Element
+
+# Caracteres escapados nos valores de atributos, como no ElementTree
+_ATTRIBUTE_ESCAPES = (
+    ("&", "&amp;"),
+    ("<", "&lt;"),
+    (">", "&gt;"),
+    ('"', "&quot;"),
+    ("\r", "&#13;"),
+    ("\n", "&#10;"),
+    ("\t", "&#09;"),
+)
+_NEEDS_ESCAPE = re.compile('[&<>"\r\n\t]')
+
+# Buffer do arquivo de saída: os timesteps são gravados em blocos grandes
+_BUFFER_SIZE = 1 << 20
+
+
+def _escape_attribute(value: str) -> str:
+    """
+    Escapa o valor de um atributo XML.
+
+    Parâmetros:
+    - value (str): Valor do atributo.
+
+    Retorna:
+    - str: Valor escapado.
+    """
+    for character, entity in _ATTRIBUTE_ESCAPES:
+        if character in value:
+            value = value.replace(character, entity)
+    return value
+
+
+def format_element(tag: str, attributes: Dict[str, str]) -> str:
+    """
+    Formata um elemento vazio do FCD (ex.: <vehicle ... />) no mesmo estilo do ElementTree.
+
+    Parâmetros:
+    - tag (str): Tag do elemento.
+    - attributes (Dict[str, str]): Atributos do elemento, na ordem em que devem ser escritos.
+
+    Retorna:
+    - str: Elemento formatado.
+    """
+    if _NEEDS_ESCAPE.search("".join(attributes.values())) is None:
+        # Caso comum (valores numéricos, IDs e faixas): nada a escapar
+        text = " ".join([f'{name}="{value}"' for name, value in attributes.items()])
+    else:
+        text = " ".join([f'{name}="{_escape_attribute(value)}"' for name, value in attributes.items()])
+    return f"<{tag} {text} />"
+
+
+def format_time(seconds: float) -> str:
+    """
+    Formata o tempo de um timestep como no FCD do SUMO (duas casas decimais), usando mais casas
+    apenas se o passo da simulação exigir.
+
+    Parâmetros:
+    - seconds (float): Tempo em segundos.
+
+    Retorna:
+    - str: Tempo formatado (ex.: "12.00").
+    """
+    text = f"{seconds:.2f}"
+    if float(text) != round(seconds, 6):
+        text = str(round(seconds, 6))
+    return text
+
+
+class TraceWriter:
+    """
+    Escreve um arquivo FCD incrementalmente, um timestep por vez.
+
+    Cada timestep é gravado assim que é recebido e o arquivo pode ser lido (ou acompanhado)
+    por outro processo enquanto ainda está sendo escrito; o fechamento da raiz só é gravado em close().
+    Um fragmento (fragment=True) tem apenas os timesteps e é depois copiado para o arquivo completo
+    com append_part, como na exportação em paralelo.
+    """
+
+    def __init__(self, path: str, root_tag: str = "<fcd-export>", fragment: bool = False) -> None:
+        """
+        Cria o arquivo de saída e grava a declaração XML e a abertura da raiz <fcd-export>.
+
+        Parâmetros:
+        - path (str): Caminho do arquivo XML de saída.
+        - root_tag (str): Tag de abertura da raiz (ex.: a do arquivo de origem, ver read_root_tag).
+        - fragment (bool): Se True, não grava a declaração nem a abertura e o fechamento da raiz.
+        """
+        self._file = open(path, "w", encoding="utf-8", buffering=_BUFFER_SIZE)
+        self._fragment: bool = fragment
+        if not fragment:
+            self._file.write(f"<?xml version='1.0' encoding='utf-8'?>\n{root_tag}\n")
+
+    def write_timestep(self, time: str, elements: Iterable[Element]) -> None:
+        """
+        Grava um timestep completo.
+
+        Parâmetros:
+        - time (str): Tempo do timestep, como no arquivo de origem.
+        - elements (Iterable[Element]): Elementos do timestep como (tag, atributos).
+        """
+        lines = [f'    <timestep time="{_escape_attribute(time)}">\n']
+        lines.extend(f"        {format_element(tag, attributes)}\n" for tag, attributes in elements)
+        lines.append("    </timestep>\n")
+        self._file.writelines(lines)
+
+    def append_part(self, part_path: str) -> None:
+        """
+        Copia para o arquivo os timesteps de um fragmento (ver fragment), sem parseá-los.
+
+        Parâmetros:
+        - part_path (str): Caminho do fragmento.
+        """
+        with open(part_path, encoding="utf-8") as part_file:
+            shutil.copyfileobj(part_file, self._file, _BUFFER_SIZE)
+
+    def flush(self) -> None:
+        """
+        Envia ao sistema operacional os timesteps já gravados, tornando-os visíveis para outros processos.
+        """
+        self._file.flush()
+
+    def close(self) -> None:
+        """
+        Grava o fechamento da raiz (exceto em fragmentos) e fecha o arquivo.
+        """
+        if not self._file.closed:
+            if not self._fragment:
+                self._file.write("</fcd-export>\n")
+            self._file.close()
+
+    def __enter__(self) -> "TraceWriter":
+        return self
+
+    def __exit__(self, *exc_info: Tuple) -> None:
+        self.close()
@@ -0,0 +1,53 @@
+"""Gera arquivos FCD sintéticos, pequenos e determinísticos, para os testes."""
+import math
+import random
+
+# Raiz gravada pelo fcd-export do SUMO
+ROOT_TAG = (
+    '<fcd-export xmlns:xsi="http://www.w3.org/2001/XMLSchema-instance" '
+    'xsi:noNamespaceSchemaLocation="http://sumo.dlr.de/xsd/fcd_file.xsd">'
+)
+
+
+def write_fcd(
+    path: str, steps: int = 40, vehicles: int = 8, step_length: float = 1.0, seed: int = 0, persons: bool = False
+) -> None:
+    """
+    Grava um arquivo FCD com veículos andando em linha reta sobre uma área de alguns quilômetros,
+    com coordenadas geográficas de 6 casas decimais, como as do SUMO.
+
+    Parâmetros:
+    - path (str): Caminho do arquivo de saída.
+    - steps (int): Número de timesteps.
+    - vehicles (int): Número de veículos; cada um entra em um timestep diferente.
+    - step_length (float): Passo da simulação em segundos.
+    - seed (int): Semente das posições e direções.
+    - persons (bool): Se True, cada timestep também tem um <person> parado, com "edge" em vez de "lane".
+    """
+    rng = random.Random(seed)
+    starts = [(rng.uniform(-74.02, -73.94), rng.uniform(40.70, 40.78)) for _ in range(vehicles)]
+    headings = [rng.uniform(0.0, 360.0) for _ in range(vehicles)]
+    with open(path, "w", encoding="utf-8") as trace_file:
+        trace_file.write(f'<?xml version="1.0" encoding="UTF-8"?>\n\n{ROOT_TAG}\n')
+        for step in range(steps):
+            trace_file.write(f'    <timestep time="{step * step_length:.2f}">\n')
+            for index in range(vehicles):
+                age = step - index  # O veículo i aparece no timestep i
+                if age < 0:
+                    continue
+                angle = headings[index]
+                distance = 0.0001 * age
+                x = starts[index][0] + distance * math.sin(math.radians(angle))
+                y = starts[index][1] + distance * math.cos(math.radians(angle))
+                trace_file.write(
+                    f'        <vehicle id="{index}" x="{x:.6f}" y="{y:.6f}" angle="{angle:.2f}" type="myType" '
+                    f'speed="{8.5 if age else 0.0:.2f}" pos="{5.1 + 8.5 * age:.2f}" lane="edge{index % 3}_0" slope="0.00"/>\n'
+                )
+            if persons:
+                x, y = starts[0]
+                trace_file.write(
+                    f'        <person id="0" x="{x:.6f}" y="{y:.6f}" angle="90.000000" speed="0.000000" '
+                    f'pos="0.000000" edge="edge0" slope="0.000000"/>\n'
+                )
+            trace_file.write("    </timestep>\n")
+        trace_file.write("</fcd-export>\n")
@@ -0,0 +1,54 @@
+"""Testa que o pacote de arrays traz as mesmas amostras da exportação XML (ver export_to_arrays)."""
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+import numpy as np
+from src.Simulation import Simulation
+from src.utils.arrayBundle import load_array_bundle
+from tests.synthetic import write_fcd
+
+
+class ArrayExportTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.trace_path = os.path.join(self.directory.name, "trace.xml")
+        write_fcd(self.trace_path, persons=True)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assert_matches_xml(self, simulation: Simulation):
+        xml_path = os.path.join(self.directory.name, "trace.xml.out")
+        bundle_path = os.path.join(self.directory.name, "bundle")
+        simulation.export_timesteps_to_xml(xml_path, 1)
+        simulation.export_to_arrays(bundle_path)
+        expected = sorted(
+            (element.get("id"), float(timestep.get("time")), float(element.get("x")), float(element.get("y")))
+            for timestep in ET.parse(xml_path).getroot()
+            for element in timestep
+            if element.tag == "vehicle"
+        )
+        columns, meta = load_array_bundle(bundle_path)
+        ids = [meta["ids"][index] for index in columns["vehicle"].tolist()]
+        samples = list(zip(ids, columns["time"].tolist(), columns["x"].tolist(), columns["y"].tolist()))
+        self.assertEqual(sorted(samples), expected)
+        # Dentro de cada veículo, as linhas estão em ordem de tempo
+        for index in np.unique(columns["vehicle"]):
+            times = columns["time"][columns["vehicle"] == index]
+            self.assertTrue(np.all(np.diff(times) > 0), meta["ids"][index])
+
+    def test_samples_match_xml(self):
+        simulation = Simulation(self.trace_path, use_cache=False)
+        simulation.create_drone_static((-73.9, 40.79))
+        simulation.create_drone_following("3", 10)
+        self.assert_matches_xml(simulation)
+
+    def test_samples_match_xml_in_window(self):
+        simulation = Simulation(self.trace_path, use_cache=False, begin=5.0, end=30.0, decimate=2)
+        simulation.create_drone_following("3", 10)
+        self.assert_matches_xml(simulation)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,48 @@
+"""Testa que o leitor rápido volta para o parser genérico em arquivos fora do seu formato."""
+import os
+import tempfile
+import unittest
+from src.Simulation import Simulation
+from src.utils.fcdScanner import FastScanError, scan_fcd_columns
+from tests.synthetic import write_fcd
+
+
+class FastScanFallbackTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.trace_path = os.path.join(self.directory.name, "trace.xml")
+        write_fcd(self.trace_path)
+        # Um único valor numérico escrito com uma referência de caractere: XML válido, mas fora
+        # do formato que o leitor rápido converte diretamente
+        with open(self.trace_path, encoding="utf-8") as trace_file:
+            text = trace_file.read()
+        position = text.index('speed="8.50"')
+        text = text[:position] + 'speed="&#56;.50"' + text[position + len('speed="8.50"'):]
+        with open(self.trace_path, "w", encoding="utf-8") as trace_file:
+            trace_file.write(text)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_malformed_value_raises_fast_scan_error(self):
+        with self.assertRaises(FastScanError):
+            scan_fcd_columns(self.trace_path)
+
+    def test_fallback_to_generic_parser(self):
+        reference = Simulation(self.trace_path, use_cache=False)
+        fast = Simulation(self.trace_path, use_cache=False, fast_scan=True)
+        self.assertEqual(sorted(fast.vehicleList), sorted(reference.vehicleList))
+        for key in reference.vehicleList:
+            expected = [
+                (timestep.time(), timestep.x(), timestep.y(), timestep.speed())
+                for timestep in reference.vehicleList[key].all_timesteps()
+            ]
+            measured = [
+                (timestep.time(), timestep.x(), timestep.y(), timestep.speed())
+                for timestep in fast.vehicleList[key].all_timesteps()
+            ]
+            self.assertEqual(measured, expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+"""Testa a conversão para coordenadas Cartesianas feita durante a exportação XML (geo = 0)."""
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from src.Simulation import Simulation
+from src.utils.conversionMeters import convert_coordinates
+from tests.synthetic import write_fcd
+
+
+def read_timesteps(path: str):
+    """
+    Lê os timesteps de um XML exportado como pares (tempo, [(tag, atributos), ...]).
+    """
+    return [
+        (timestep.get("time"), [(element.tag, dict(element.attrib)) for element in timestep])
+        for timestep in ET.parse(path).getroot()
+    ]
+
+
+class CartesianExportTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.trace_path = os.path.join(self.directory.name, "trace.xml")
+        write_fcd(self.trace_path, persons=True)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assert_matches_convert_coordinates(self, simulation: Simulation):
+        fused_path = os.path.join(self.directory.name, "fused.xml")
+        geo_path = os.path.join(self.directory.name, "geo.xml")
+        converted_path = os.path.join(self.directory.name, "converted.xml")
+        simulation.export_timesteps_to_xml(fused_path, 0)
+        simulation.export_timesteps_to_xml(geo_path, 1)
+        convert_coordinates(geo_path, converted_path)
+        fused, converted = read_timesteps(fused_path), read_timesteps(converted_path)
+        self.assertTrue(fused)
+        self.assertEqual(fused, converted)
+
+    def test_origin_matches_convert_coordinates(self):
+        simulation = Simulation(self.trace_path, use_cache=False)
+        simulation.create_drone_static((-73.9, 40.79))
+        # O drone seguidor tem uma amostra além do último timestep exportado, fora da origem
+        simulation.create_drone_following("3", 10)
+        self.assert_matches_convert_coordinates(simulation)
+
+    def test_origin_ignores_samples_after_last_timestep(self):
+        simulation = Simulation(self.trace_path, use_cache=False, begin=5.0, end=30.0, decimate=2)
+        simulation.create_drone_static((-73.9, 40.79))
+        self.assert_matches_convert_coordinates(simulation)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+"""Testa que a exportação ns-2 segue as mesmas posições e tempos da exportação XML convertida para metros."""
+import csv
+import os
+import re
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from collections import defaultdict
+from src.Simulation import Simulation
+from src.utils.conversionMeters import convert_coordinates
+from tests.synthetic import write_fcd
+
+_INITIAL_PATTERN = re.compile(r"\$node_\((\d+)\) set ([XY])_ (\S+)")
+_SETDEST_PATTERN = re.compile(r'\$ns_ at (\S+) "\$node_\((\d+)\) setdest (\S+) (\S+) \S+"')
+
+
+class Ns2ExportTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.trace_path = os.path.join(self.directory.name, "trace.xml")
+        write_fcd(self.trace_path, persons=True)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def xml_positions(self, path: str):
+        """
+        Retorna as amostras (tempo, x, y) de cada veículo do XML exportado, em ordem de tempo.
+        """
+        positions = defaultdict(list)
+        for timestep in ET.parse(path).getroot():
+            for element in timestep:
+                if element.tag == "vehicle":
+                    positions[element.get("id")].append((float(timestep.get("time")), element.get("x"), element.get("y")))
+        return positions
+
+    def ns2_positions(self, ns2_path: str, nodes_path: str):
+        """
+        Retorna, por ID, a posição inicial e os movimentos (tempo, x, y) do arquivo ns-2.
+        """
+        with open(nodes_path, newline="") as nodes_file:
+            ids = {row["node"]: row["id"] for row in csv.DictReader(nodes_file)}
+        with open(ns2_path) as ns2_file:
+            text = ns2_file.read()
+        initial = defaultdict(dict)
+        for node, axis, value in _INITIAL_PATTERN.findall(text):
+            initial[ids[node]][axis] = value
+        moves = defaultdict(list)
+        for time, node, x, y in _SETDEST_PATTERN.findall(text):
+            moves[ids[node]].append((float(time), x, y))
+        return initial, moves
+
+    def assert_matches_xml(self, simulation: Simulation):
+        geo_path = os.path.join(self.directory.name, "trace1.xml")
+        xml_path = os.path.join(self.directory.name, "trace0.xml")
+        ns2_path = os.path.join(self.directory.name, "trace.tcl")
+        nodes_path = os.path.join(self.directory.name, "nodes.csv")
+        # A origem de referência é a calculada por convert_coordinates sobre o XML exportado
+        simulation.export_timesteps_to_xml(geo_path, 1)
+        convert_coordinates(geo_path, xml_path)
+        simulation.export_to_ns2(ns2_path, nodes_path, geo=0)
+        expected = self.xml_positions(xml_path)
+        initial, moves = self.ns2_positions(ns2_path, nodes_path)
+        self.assertEqual(set(initial), set(expected))
+        for vehicle_id, samples in expected.items():
+            with self.subTest(vehicle=vehicle_id):
+                _, x, y = samples[0]
+                self.assertEqual((initial[vehicle_id]["X"], initial[vehicle_id]["Y"]), (x, y))
+                # Cada setdest parte no tempo de uma amostra em direção à posição da seguinte
+                expected_moves = [(time, next_x, next_y) for (time, _, _), (_, next_x, next_y) in zip(samples, samples[1:])]
+                self.assertEqual(len(moves[vehicle_id]), len(expected_moves))
+                for (time, x, y), (expected_time, expected_x, expected_y) in zip(moves[vehicle_id], expected_moves):
+                    self.assertAlmostEqual(time, expected_time, places=6)
+                    self.assertEqual((x, y), (expected_x, expected_y))
+
+    def test_positions_match_xml(self):
+        simulation = Simulation(self.trace_path, use_cache=False)
+        simulation.create_drone_static((-73.9, 40.79))
+        simulation.create_drone_following("3", 10)
+        self.assert_matches_xml(simulation)
+
+    def test_positions_match_xml_in_window(self):
+        simulation = Simulation(self.trace_path, use_cache=False, begin=5.0, end=30.0, decimate=2)
+        simulation.create_drone_following("3", 10)
+        self.assert_matches_xml(simulation)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,47 @@
+"""Testa que a exportação XML em paralelo grava o mesmo arquivo que a exportação em sequência."""
+import multiprocessing
+import os
+import tempfile
+import unittest
+from src.Simulation import Simulation
+from tests.synthetic import write_fcd
+
+
+@unittest.skipUnless("fork" in multiprocessing.get_all_start_methods(), "parallel export needs fork")
+class ParallelExportTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.trace_path = os.path.join(self.directory.name, "trace.xml")
+        write_fcd(self.trace_path, persons=True)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def export(self, simulation: Simulation, geo: int, workers: int) -> bytes:
+        path = os.path.join(self.directory.name, f"geo{geo}_workers{workers}.xml")
+        simulation.export_timesteps_to_xml(path, geo, workers=workers)
+        with open(path, "rb") as export_file:
+            return export_file.read()
+
+    def assert_workers_match(self, **options):
+        simulation = Simulation(self.trace_path, use_cache=False, **options)
+        simulation.create_drone_circular((-73.98, 40.74), 40)
+        simulation.create_drone_following("3", 10)
+        for geo in (0, 1, 2):
+            with self.subTest(geo=geo, **options):
+                serial = self.export(simulation, geo, 1)
+                self.assertIn(b"<person ", serial)
+                self.assertIn(b'id="drone2"', serial)
+                self.assertEqual(self.export(simulation, geo, 3), serial)
+
+    def test_workers_match_serial(self):
+        self.assert_workers_match()
+
+    def test_workers_match_serial_in_window(self):
+        # A janela e a dizimação cortam os intervalos de bytes (ver trim_timestep_offsets)
+        self.assert_workers_match(begin=5.0, end=30.0, decimate=2)
+        self.assert_workers_match(begin=4.5, end=31.5, decimate=3)
+
+
+if __name__ == "__main__":
+    unittest.main()
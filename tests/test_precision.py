@@ -0,0 +1,75 @@
+"""Testa o erro de posição do modo de precisão float32 das trajetórias (ver FleetStore)."""
+import os
+import tempfile
+import unittest
+import numpy as np
+from src.FleetStore import FleetStore
+from src.Simulation import Simulation
+from src.creating_drones import earth_radius
+from src.utils.traceColumns import timesteps_to_columns
+from src.utils.traceReader import iter_timesteps
+from tests.synthetic import write_fcd
+
+# Erro máximo de posição aceito em float32, em metros
+MAX_POSITION_ERROR: float = 0.01
+
+
+def position_error(x: np.ndarray, y: np.ndarray, reference_x: np.ndarray, reference_y: np.ndarray) -> float:
+    """
+    Calcula o maior erro de posição, em metros, entre coordenadas geográficas e as de referência.
+
+    Parâmetros:
+    - x, y (np.ndarray): Longitudes e latitudes medidas.
+    - reference_x, reference_y (np.ndarray): Longitudes e latitudes de referência.
+
+    Retorna:
+    - float: Erro máximo em metros.
+    """
+    # Aproximação equiretangular, suficiente para distâncias milimétricas
+    dy = np.radians(y - reference_y) * earth_radius
+    dx = np.radians(x - reference_x) * earth_radius * np.cos(np.radians(reference_y))
+    return float(np.max(np.hypot(dx, dy)))
+
+
+class Float32PrecisionTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.trace_path = os.path.join(self.directory.name, "trace.xml")
+        write_fcd(self.trace_path)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_store_round_trip(self):
+        columns, _ = timesteps_to_columns(iter_timesteps(self.trace_path))
+        reference = FleetStore(columns, "float64")
+        compact = FleetStore(columns, "float32")
+        self.assertEqual(compact.x.dtype, np.float32)
+
+        raw_x = compact.origin[0] + compact.x.astype(np.float64)
+        raw_y = compact.origin[1] + compact.y.astype(np.float64)
+        self.assertLessEqual(position_error(raw_x, raw_y, reference.x, reference.y), MAX_POSITION_ERROR)
+
+        timesteps = [compact.timestep(row) for row in range(len(compact.time))]
+        decoded_x = np.array([timestep.x() for timestep in timesteps])
+        decoded_y = np.array([timestep.y() for timestep in timesteps])
+        self.assertLessEqual(position_error(decoded_x, decoded_y, reference.x, reference.y), MAX_POSITION_ERROR)
+
+    def test_simulation_round_trip(self):
+        reference = Simulation(self.trace_path, use_cache=False)
+        compact = Simulation(self.trace_path, use_cache=False, precision="float32")
+        expected, measured = [], []
+        for key in reference.vehicleList:
+            for timestep in reference.vehicleList[key].all_timesteps():
+                expected.append((timestep.x(), timestep.y()))
+                decoded = compact.vehicleList[key].get_timestep(timestep.time())
+                measured.append((decoded.x(), decoded.y()))
+        expected, measured = np.array(expected), np.array(measured)
+        self.assertTrue(len(expected))
+        self.assertLessEqual(
+            position_error(measured[:, 0], measured[:, 1], expected[:, 0], expected[:, 1]), MAX_POSITION_ERROR
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
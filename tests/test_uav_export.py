@@ -0,0 +1,56 @@
+"""Testa que a exportação apenas dos drones coincide com os drones da exportação completa."""
+import os
+import tempfile
+import unittest
+import xml.etree.ElementTree as ET
+from src.Simulation import Simulation
+from tests.synthetic import write_fcd
+
+
+def uav_timesteps(path: str):
+    """
+    Lê os timesteps de um XML exportado como pares (tempo, [atributos dos drones]), sem os timesteps vazios.
+    """
+    timesteps = []
+    for timestep in ET.parse(path).getroot():
+        uavs = [dict(element.attrib) for element in timestep if element.get("type") == "VANT"]
+        if uavs:
+            timesteps.append((timestep.get("time"), uavs))
+    return timesteps
+
+
+class UavExportTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.trace_path = os.path.join(self.directory.name, "trace.xml")
+        write_fcd(self.trace_path, persons=True)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def assert_matches_full_export(self, simulation: Simulation):
+        full_path = os.path.join(self.directory.name, "full.xml")
+        uav_path = os.path.join(self.directory.name, "uav.xml")
+        for geo in (0, 1, 2):
+            with self.subTest(geo=geo):
+                simulation.export_timesteps_to_xml(full_path, geo)
+                simulation.export_timesteps_to_xml(uav_path, geo, only_vants=1)
+                expected = uav_timesteps(full_path)
+                self.assertTrue(expected)
+                self.assertEqual(uav_timesteps(uav_path), expected)
+
+    def test_matches_full_export(self):
+        simulation = Simulation(self.trace_path, use_cache=False)
+        # O drone estático fica abaixo e à esquerda dos veículos: ele define a origem de geo = 0
+        simulation.create_drone_static((-74.05, 40.69))
+        simulation.create_drone_following("3", 10)
+        self.assert_matches_full_export(simulation)
+
+    def test_matches_full_export_in_window(self):
+        simulation = Simulation(self.trace_path, use_cache=False, begin=5.0, end=30.0, decimate=2)
+        simulation.create_drone_following("3", 10)
+        self.assert_matches_full_export(simulation)
+
+
+if __name__ == "__main__":
+    unittest.main()